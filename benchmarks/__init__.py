@@ -0,0 +1,2 @@
+# puts the bundled pgoapi (and POGOProtos) on the path for all benchmarks
+from library import api  # noqa: F401
@@ -0,0 +1,67 @@
+"""
+Replays a walking route through get_neighbors() and get_cell_ids(), computing every covering
+vs. going through the covering caches. Also reports by how many cells the cached coverings (computed
+for the center of the key cell) differ from the exact ones on average.
+
+The route is a JSON list of [lat, lng] pairs (e.g. logged positions of a run), a synthetic
+random walk with 5m steps is used if none is given.
+
+Run with: python -m benchmarks.bench_coverings [--route FILE]
+"""
+from __future__ import absolute_import, print_function
+
+import argparse
+import json
+import math
+import random
+import timeit
+
+from pgoapi.utilities import CoveringCache, _get_cell_ids
+
+from poketrainer.location import _get_neighbors
+
+
+def synthetic_route(steps=2000, step_meters=5.0, start=(40.7589, -73.9851)):
+    rand = random.Random(3)
+    lat, lng = start
+    bearing = 0.0
+    route = []
+    for _ in range(steps):
+        bearing += rand.uniform(-0.3, 0.3)
+        lat += step_meters * math.cos(bearing) / 111111.0
+        lng += step_meters * math.sin(bearing) / (111111.0 * math.cos(math.radians(lat)))
+        route.append((lat, lng))
+    return route
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--route', help='JSON file with a list of [lat, lng] positions')
+    args = parser.parse_args()
+
+    if args.route:
+        with open(args.route) as f:
+            route = [tuple(position[:2]) for position in json.load(f)]
+    else:
+        route = synthetic_route()
+    print('route of {0} positions'.format(len(route)))
+
+    for name, compute, arguments in (('get_neighbors', _get_neighbors, (15, 700)),
+                                     ('get_cell_ids', _get_cell_ids, (1000,))):
+        uncached = timeit.timeit(lambda: [compute(lat, lng, *arguments) for lat, lng in route], number=1)
+        exact = [set(compute(lat, lng, *arguments)) for lat, lng in route]
+        print('{0}: uncached {1:8.1f} us per poll, {2:.1f} cells'.format(
+            name, uncached / len(route) * 1e6, sum(len(cells) for cells in exact) / float(len(route))))
+
+        for key_level in (17, 19):
+            cache = CoveringCache(key_level=key_level)
+            coverings = []
+            cached = timeit.timeit(lambda: coverings.extend(cache.get(lat, lng, compute, *arguments) for lat, lng in route), number=1)
+            stats = cache.get_stats()
+            off = sum(len(set(covering) ^ cells) for covering, cells in zip(coverings, exact)) / float(len(route))
+            print('  key level {0}: {1:8.1f} us per poll, hit rate {2:.1%}, {3:.2f} cells off the exact covering'.format(
+                key_level, cached / len(route) * 1e6, stats['hit_rate'], off))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Per-loop fort selection for 1k and 10k known forts: flat_map + filtered_forts over every
+fort vs. FortIndex lookups (spinnable within proximity, and the 5 nearest).
+
+Run with: python -m benchmarks.bench_fort_index
+"""
+from __future__ import absolute_import, print_function
+
+import timeit
+
+from helper.utilities import flat_map
+from poketrainer.fort_index import FortIndex
+
+from .bench_geo import ORIGIN, filtered_forts, synthetic_forts
+
+PROXIMITY = 1000
+POSITION = (ORIGIN[0] + 0.002, ORIGIN[1] - 0.002)
+
+
+def as_map_cells(forts, index):
+    cells = {}
+    for fort in forts:
+        cells.setdefault(index._bucket(fort['latitude'], fort['longitude']), []).append(fort)
+    return [{'s2_cell_id': cell_id, 'forts': cell_forts} for cell_id, cell_forts in cells.items()]
+
+
+def main():
+    for count in (1000, 10000):
+        forts = synthetic_forts(count)
+        index = FortIndex()
+        map_cells = as_map_cells(forts, index)
+        seconds = timeit.timeit(lambda: index.update(map_cells), number=1)
+        print('{0} forts, indexed in {1:.2f} ms'.format(count, seconds * 1e3))
+        rounds = 20
+
+        def legacy():
+            return filtered_forts(ORIGIN, POSITION, flat_map(lambda c: c.get('forts', []), map_cells), PROXIMITY)
+
+        expected = legacy()
+        result = index.spinnable(POSITION, ORIGIN, PROXIMITY)
+        assert [f['id'] for f, _ in result] == [f['id'] for f, _ in expected], 'different forts selected'
+        nearest = index.nearest(POSITION, 5, spinnable=True)
+        assert [f['id'] for f, _ in nearest] == [f['id'] for f, _ in filtered_forts(ORIGIN, POSITION, forts, 0)[:5]]
+
+        for label, func in (('flat_map + filtered_forts', legacy),
+                            ('index spinnable', lambda: index.spinnable(POSITION, ORIGIN, PROXIMITY)),
+                            ('index 5 nearest', lambda: index.nearest(POSITION, 5, spinnable=True))):
+            seconds = timeit.timeit(func, number=rounds)
+            print('  {0:<26} {1:9.2f} ms'.format(label, seconds / rounds * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Fort filtering for 1k and 10k forts: the old per-fort geopy vincenty calls vs. the
+batched poketrainer.geo distances in haversine and vincenty mode, plus a distance matrix.
+
+Run with: python -m benchmarks.bench_geo
+"""
+from __future__ import absolute_import, print_function
+
+import random
+import time
+import timeit
+import warnings
+
+from geopy.distance import vincenty
+
+from poketrainer import geo
+
+ORIGIN = (40.7589, -73.9851)
+
+
+def synthetic_forts(count):
+    rand = random.Random(count)
+    return [{'id': '%032x.16' % rand.getrandbits(128), 'type': 1, 'enabled': True,
+             'latitude': ORIGIN[0] + rand.uniform(-0.05, 0.05), 'longitude': ORIGIN[1] + rand.uniform(-0.05, 0.05),
+             'cooldown_complete_timestamp_ms': 0} for _ in range(count)]
+
+
+def legacy_filtered_forts(starting_location, origin, forts, proximity, visited_forts={}, reverse=False):
+    """ filtered_forts as it was before the batched distances, one vincenty per fort and distance """
+    def is_active_pokestop(fort):
+        is_active_fort = fort.get('type', None) == 1 and ("enabled" in fort or 'lure_info' in fort) and fort.get(
+            'cooldown_complete_timestamp_ms', -1) < time.time() * 1000
+        return is_active_fort and fort['id'] not in visited_forts and vincenty(starting_location, (
+            fort['latitude'], fort['longitude'])).meters < proximity
+
+    forts = filter(lambda f: is_active_pokestop(f[0]),
+                   map(lambda x: (x, vincenty(origin, (x['latitude'], x['longitude'])).meters), forts))
+    return sorted(forts, key=lambda x: x[1], reverse=reverse)
+
+
+def filtered_forts(starting_location, origin, forts, proximity, visited_forts={}, reverse=False, distance_mode=geo.HAVERSINE):
+    """ the fort filtering of location.py with the batched distances, before the FortIndex replaced it """
+    now_ms = time.time() * 1000
+    forts = [fort for fort in forts if fort.get('type', None) == 1 and ("enabled" in fort or 'lure_info' in fort) and
+             fort.get('cooldown_complete_timestamp_ms', -1) < now_ms and fort['id'] not in visited_forts]
+    if not forts:
+        return []
+
+    points = [(fort['latitude'], fort['longitude']) for fort in forts]
+    distances = geo.distances_from(origin, points, distance_mode)
+    if proximity and proximity > 0:
+        in_proximity = geo.distances_from(starting_location, points, distance_mode) < proximity
+        forts = [(fort, float(d)) for fort, d, keep in zip(forts, distances, in_proximity) if keep]
+    else:
+        forts = [(fort, float(d)) for fort, d in zip(forts, distances)]
+    return sorted(forts, key=lambda x: x[1], reverse=reverse)
+
+
+def main():
+    warnings.simplefilter('ignore')
+    for count in (1000, 10000):
+        forts = synthetic_forts(count)
+        rounds = 3 if count > 1000 else 10
+        print('{0} forts'.format(count))
+
+        expected = legacy_filtered_forts(ORIGIN, ORIGIN, forts, 3000)
+        seconds = timeit.timeit(lambda: legacy_filtered_forts(ORIGIN, ORIGIN, forts, 3000), number=rounds)
+        print('  {0:<24} {1:9.2f} ms'.format('legacy vincenty', seconds / rounds * 1e3))
+
+        for mode in geo.DISTANCE_MODES:
+            result = filtered_forts(ORIGIN, ORIGIN, forts, 3000, distance_mode=mode)
+            same = len(set(f['id'] for f, _ in result) ^ set(f['id'] for f, _ in expected))
+            seconds = timeit.timeit(lambda: filtered_forts(ORIGIN, ORIGIN, forts, 3000, distance_mode=mode), number=rounds)
+            print('  {0:<24} {1:9.2f} ms, {2} forts filtered differently'.format('batched ' + mode, seconds / rounds * 1e3, same))
+
+        points = [(fort['latitude'], fort['longitude']) for fort in forts[:2000]]
+        seconds = timeit.timeit(lambda: geo.distance_matrix(points, mode=geo.HAVERSINE), number=1)
+        print('  {0:<24} {1:9.2f} ms'.format('%dx%d haversine matrix' % (len(points), len(points)), seconds * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+GET_INVENTORY payload and cost per heartbeat (parsing by RpcApi plus the Inventory update)
+for the full inventory of 1000 pokemon vs. deltas since the last timestamp: nothing changed,
+and a few changed items after a catch.
+
+Run with: python -m benchmarks.bench_inventory_delta
+"""
+from __future__ import absolute_import, print_function
+
+import logging
+import timeit
+
+from pgoapi.rpc_api import RpcApi
+from POGOProtos.Networking.Envelopes_pb2 import ResponseEnvelope
+from POGOProtos.Networking.Requests_pb2 import RequestType
+from POGOProtos.Networking.Responses_pb2 import GetInventoryResponse
+from poketrainer.inventory import Inventory
+
+from .bench_inventory_sync import FakeParent, FakeServer
+from .bench_protobuf_to_dict import synthetic_inventory
+from .bench_response_views import FakeHttpResponse
+
+REQUEST = [{RequestType.Value('GET_INVENTORY'): {'last_timestamp_ms': 1470000000000}}]
+ROUNDS = 20
+
+
+def envelope(inventory_response):
+    response = ResponseEnvelope(status_code=1, request_id=1)
+    response.returns.extend([inventory_response])
+    return FakeHttpResponse(response.SerializeToString())
+
+
+def delta(changed_pokemon=0, changed_items=0):
+    response = GetInventoryResponse(success=True)
+    response.inventory_delta.original_timestamp_ms = 1470000000000
+    response.inventory_delta.new_timestamp_ms = 1470000001000
+    for i in range(changed_pokemon):
+        data = response.inventory_delta.inventory_items.add().inventory_item_data.pokemon_data
+        data.id = 15000000000000000000 + i
+        data.pokemon_id = 16
+        data.cp = 100
+    for i in range(changed_items):
+        item = response.inventory_delta.inventory_items.add().inventory_item_data.item
+        item.item_id = i + 1
+        item.count = 10
+    return response.SerializeToString()
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    rpc = RpcApi(None)
+    full = envelope(synthetic_inventory())
+    full_items = len(rpc._parse_main_response(full, REQUEST)['responses']['GET_INVENTORY']['inventory_delta']['inventory_items'])
+
+    for label, http_response in (('full inventory', full),
+                                 ('delta, unchanged', envelope(delta())),
+                                 ('delta, after a catch', envelope(delta(changed_pokemon=1, changed_items=2)))):
+        inventory = Inventory(FakeParent(FakeServer()), [])
+        inventory.update_player_inventory(rpc._parse_main_response(full, REQUEST))
+        if http_response is full:
+            inventory.reset()
+
+        def heartbeat():
+            inventory.update_player_inventory(rpc._parse_main_response(http_response, REQUEST))
+            if http_response is full:
+                inventory.reset()
+
+        heartbeat()
+        assert len(inventory.inventory_items) >= full_items, 'items lost in the merge'
+        seconds = timeit.timeit(heartbeat, number=ROUNDS)
+        print('  {0:<22} {1:8d} bytes {2:9.2f} ms per heartbeat'.format(
+            label, len(http_response.content), seconds / ROUNDS * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Lookups on an inventory of 1000 pokemon, 9 eggs and 150 candy families: the scans over
+inventory_items (setup after a delta, hatched pokemon by id) and over the ItemId enum (item
+names in the log lines) vs. the store indexed by kind and key and the item name table.
+
+Run with: python -m benchmarks.bench_inventory_index
+"""
+from __future__ import absolute_import, print_function
+
+import logging
+import timeit
+
+from library.api.pgoapi.protos.POGOProtos.Inventory import \
+    Item_pb2 as Enum_Items
+from pgoapi.rpc_api import RpcApi
+from POGOProtos.Networking.Requests_pb2 import RequestType
+from poketrainer.inventory import Inventory
+from poketrainer.poke_utils import get_item_name
+from poketrainer.pokemon import Pokemon
+
+from .bench_inventory_delta import envelope
+from .bench_inventory_sync import FakeParent, FakeServer
+from .bench_protobuf_to_dict import synthetic_inventory
+
+REQUEST = [RequestType.Value('GET_INVENTORY')]
+ROUNDS = 20
+
+
+def legacy_get_item_name(s_item_id):
+    available_items = Enum_Items.ItemId.DESCRIPTOR.values_by_number.items()
+    for (item_id, item) in available_items:
+        if item_id == s_item_id:
+            return item.name.replace('ITEM_', '', 1)
+    return 'Unknown'
+
+
+def legacy_get_pokemon_by_long_id(pokemon_id, res):
+    for inventory_item in res:
+        pokemon_data = inventory_item['inventory_item_data'].get('pokemon_data', {})
+        if not pokemon_data.get('is_egg', False) and pokemon_data.get('id', 'NA') == pokemon_id:
+            return Pokemon(pokemon_data)
+    return None
+
+
+def legacy_setup(inventory_items):
+    """ the item counts, candy, eggs and incubators as Inventory.setup_inventory scanned them """
+    item_counts, pokemon_candy, eggs_available, incubators_available, incubators_busy = {}, {}, [], [], []
+    for inventory_item in inventory_items:
+        item = inventory_item['inventory_item_data'].get('item', {})
+        if 'item_id' in item:
+            item_counts[item['item_id']] = item.get('count', 0)
+        candy = inventory_item['inventory_item_data'].get('candy', {})
+        pokemon_candy[candy.get('family_id', -1)] = candy.get('candy', -1)
+        pokemon_data = inventory_item['inventory_item_data'].get('pokemon_data', {})
+        if pokemon_data.get('is_egg', False) and not pokemon_data.get('egg_incubator_id', False):
+            eggs_available.append(pokemon_data)
+        egg_incubators = inventory_item['inventory_item_data'].get('egg_incubators', {}).get('egg_incubator', [])
+        for incubator in egg_incubators:
+            if "pokemon_id" in incubator:
+                incubators_busy.append(incubator)
+            else:
+                incubators_available.append(incubator)
+    pokemon_candy.pop(-1, None)
+    return item_counts, pokemon_candy, eggs_available, incubators_available, incubators_busy
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    res = RpcApi(None)._parse_main_response(envelope(synthetic_inventory()), REQUEST)
+    inventory_items = res['responses']['GET_INVENTORY']['inventory_delta']['inventory_items']
+    inventory_items.extend({'inventory_item_data': {'pokemon_data': {'id': 20000000000000000000 + i, 'is_egg': True,
+                                                                     'egg_km_walked_target': 5.0}}} for i in range(9))
+    inventory_items.append({'inventory_item_data': {'egg_incubators': {'egg_incubator': [
+        {'id': 'EggIncubatorProto-1', 'item_id': 901}, {'id': 'EggIncubatorProto-2', 'item_id': 902, 'pokemon_id': 1}]}}})
+    inventory = Inventory(FakeParent(FakeServer()), [])
+    inventory.update_player_inventory(res)
+
+    assert legacy_setup(inventory_items) == (inventory.item_counts, dict(inventory.pokemon_candy), inventory.eggs_available,
+                                             inventory.incubators_available, inventory.incubators_busy), 'different state'
+    item_ids = list(Enum_Items.ItemId.DESCRIPTOR.values_by_number) * 10
+    assert [legacy_get_item_name(item_id) for item_id in item_ids] == [get_item_name(item_id) for item_id in item_ids]
+    pokemon_ids = [pokemon.id for pokemon in inventory.get_caught_pokemon()[::10]]
+    assert [legacy_get_pokemon_by_long_id(pokemon_id, inventory_items).id for pokemon_id in pokemon_ids] == \
+        [inventory.get_pokemon(pokemon_id).id for pokemon_id in pokemon_ids]
+    print('{0} inventory items'.format(len(inventory_items)))
+
+    for label, legacy, indexed in (
+            ('setup after a delta', lambda: legacy_setup(inventory_items), inventory.setup_inventory),
+            ('{0} item names'.format(len(item_ids)),
+             lambda: [legacy_get_item_name(item_id) for item_id in item_ids],
+             lambda: [get_item_name(item_id) for item_id in item_ids]),
+            ('{0} pokemon by id'.format(len(pokemon_ids)),
+             lambda: [legacy_get_pokemon_by_long_id(pokemon_id, inventory_items) for pokemon_id in pokemon_ids],
+             lambda: [inventory.get_pokemon(pokemon_id) for pokemon_id in pokemon_ids])):
+        legacy_seconds = timeit.timeit(legacy, number=ROUNDS) / ROUNDS
+        indexed_seconds = timeit.timeit(indexed, number=ROUNDS) / ROUNDS
+        print('  {0:<22} scan {1:8.3f} ms  indexed {2:8.3f} ms'.format(label, legacy_seconds * 1e3, indexed_seconds * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+GET_INVENTORY calls of a replayed one hour session: main loop steps every 10 seconds with
+encounters, catches and fort spins, the heartbeat's full inventory every 30 steps followed by
+the item cleanup. Counts the calls of the old refresh-before-every-encounter behaviour vs.
+Inventory applying local deltas and syncing only when stale or diverged.
+
+Run with: python -m benchmarks.bench_inventory_sync
+"""
+from __future__ import absolute_import, print_function
+
+import logging
+import random
+
+from library.api.pgoapi.protos.POGOProtos.Inventory import Item_pb2 as Item_Enums
+from poketrainer import inventory as inventory_module
+from poketrainer.inventory import Inventory
+from poketrainer.scheduler import ActionScheduler
+
+SESSION_SECONDS = 3600
+STEP_SECONDS = 10
+HEARTBEAT_INVENTORY_STEPS = 30  # see Poketrainer._heartbeat
+MIN_ITEMS = {Item_Enums.ITEM_POTION: 10, Item_Enums.ITEM_REVIVE: 10}
+
+
+class Clock(object):
+    now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeConfig(object):
+    inventory_resync_seconds = 300
+    max_batch_size = 10
+    min_items = MIN_ITEMS
+    score_method = 'CP'
+    score_settings = {}
+    log_colors = {'INVENTORY': 'white'}
+    ball_priorities = [50, 50, 50, False]
+
+
+class FakeRequest(object):
+
+    def __init__(self, server):
+        self.server = server
+        self.methods = []
+
+    def recycle_inventory_item(self, item_id, count):
+        self.methods.append((item_id, count))
+
+    def call(self):
+        sub_responses = []
+        for item_id, count in self.methods:
+            self.server.items[item_id] -= count
+            sub_responses.append({'result': 1, 'new_count': self.server.items[item_id]})
+        return {'responses': {}, 'sub_responses': sub_responses}
+
+
+class FakeServer(object):
+    """ the player's items as the game server knows them, and the api of the bot """
+
+    def __init__(self):
+        self.items = {Item_Enums.ITEM_POKE_BALL: 100, Item_Enums.ITEM_POTION: 10, Item_Enums.ITEM_REVIVE: 10}
+        self.inventory_calls = 0
+
+    def get_inventory(self, last_timestamp_ms=0):
+        self.inventory_calls += 1
+        items = [{'inventory_item_data': {'item': {'item_id': item_id, 'count': count}}}
+                 for item_id, count in self.items.items()]
+        return {'responses': {'GET_INVENTORY': {'inventory_delta': {'inventory_items': items}}}}
+
+    def create_request(self):
+        return FakeRequest(self)
+
+
+class FakePlayer(object):
+    max_item_storage = 350
+    km_walked = 0
+    level = 20
+
+
+class FakeParent(object):
+
+    def __init__(self, server):
+        self.api = server
+        self.config = FakeConfig()
+        self.scheduler = ActionScheduler()
+        self.player = FakePlayer()
+        self.player_stats = FakePlayer()
+
+
+def session(seed=7):
+    """ the replayed events: (step, encounters, catches, spun) """
+    rng = random.Random(seed)
+    for step in range(SESSION_SECONDS // STEP_SECONDS):
+        encounters = rng.choice((0, 0, 1, 1, 2, 3))
+        catches = sum(1 for _ in range(encounters) if rng.random() < 0.7)
+        yield step, encounters, catches, rng.random() < 0.5
+
+
+def replay():
+    clock = Clock()
+    inventory_module.time = clock
+    server = FakeServer()
+    inventory = Inventory(FakeParent(server), [])
+    logging.getLogger('poketrainer.inventory').setLevel(logging.WARNING)
+    legacy_calls = 0
+    for step, encounters, catches, spun in session():
+        clock.now = step * STEP_SECONDS
+        if step % HEARTBEAT_INVENTORY_STEPS == 0:
+            inventory.update_player_inventory(res=server.get_inventory())
+            inventory.cleanup_inventory()
+            inventory.sync(pokemon=True)  # release and evolve
+            legacy_calls += 2  # heartbeat + refresh after the cleanup
+        for encounter in range(encounters):
+            inventory.sync()
+            legacy_calls += 1
+            if encounter < catches:
+                inventory.take_pokeball()
+                server.items[Item_Enums.ITEM_POKE_BALL] -= 1
+                inventory.mark_changed(items=False)
+        if spun:
+            for item_id, count in ((Item_Enums.ITEM_POKE_BALL, 2), (Item_Enums.ITEM_POTION, 1)):
+                inventory.add_items(item_id, count)
+                server.items[item_id] += count
+    assert inventory.item_counts == server.items, 'local inventory diverged from the server'
+    return legacy_calls, server.inventory_calls, inventory.get_sync_stats()
+
+
+def main():
+    legacy_calls, calls, stats = replay()
+    print('GET_INVENTORY calls in one hour')
+    print('  refresh before every encounter  {0:5d}'.format(legacy_calls))
+    print('  local deltas                    {0:5d}  ({1} syncs skipped)'.format(calls, stats['skipped']))
+    print('  saved per hour                  {0:5d}'.format(legacy_calls - calls))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+The Pokemon objects a full heartbeat builds for an inventory of 1000 pokemon: evolve, release,
+the web listing and the LIST_POKEMON_BEFORE_CLEANUP log each rebuilding and sorting them vs.
+the inventory-versioned cache. Also the cost after a delta that changed one pokemon.
+
+Run with: python -m benchmarks.bench_pokemon_cache
+"""
+from __future__ import absolute_import, print_function
+
+import logging
+import timeit
+from collections import defaultdict
+
+from pgoapi.rpc_api import RpcApi
+from POGOProtos.Networking.Requests_pb2 import RequestType
+from poketrainer.inventory import Inventory
+from poketrainer.pokemon import Pokemon
+
+from .bench_inventory_delta import envelope
+from .bench_inventory_sync import FakeParent, FakeServer
+from .bench_protobuf_to_dict import synthetic_inventory
+
+REQUEST = [RequestType.Value('GET_INVENTORY')]
+ROUNDS = 5
+
+
+def legacy_caught_pokemon(inventory):
+    """ Inventory.get_caught_pokemon before the cache """
+    pokemon_list = sorted(map(lambda x: Pokemon(x['pokemon_data'], inventory._parent.player_stats.level,
+                                                inventory._parent.config.score_method,
+                                                inventory._parent.config.score_settings),
+                              filter(lambda x: 'pokemon_data' in x and not x['pokemon_data'].get("is_egg", False),
+                                     map(lambda x: x.get('inventory_item_data', {}), inventory.inventory_items))),
+                          key=lambda x: x.score, reverse=True)
+    return [pokemon for pokemon in pokemon_list if not pokemon.is_egg]
+
+
+def legacy_by_family(inventory):
+    pokemon_list = defaultdict(list)
+    for pokemon in legacy_caught_pokemon(inventory):
+        pokemon_list[pokemon.pokemon_id].append(pokemon)
+    return pokemon_list
+
+
+def heartbeat(caught_pokemon, by_family):
+    """ the consumers of one full heartbeat: log listing, evolve, release, web listing """
+    caught_pokemon()
+    by_family()
+    by_family()
+    caught_pokemon()
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    res = RpcApi(None)._parse_main_response(envelope(synthetic_inventory()), REQUEST)
+    inventory = Inventory(FakeParent(FakeServer()), [])
+    inventory.update_player_inventory(res)
+
+    legacy = legacy_caught_pokemon(inventory)
+    cached = inventory.get_caught_pokemon()
+    assert [(p.id, p.score) for p in legacy] == [(p.id, p.score) for p in cached], 'different pokemon or order'
+    print('{0} pokemon'.format(len(cached)))
+
+    def legacy_heartbeat():
+        heartbeat(lambda: legacy_caught_pokemon(inventory), lambda: legacy_by_family(inventory))
+
+    def cached_heartbeat():
+        heartbeat(inventory.get_caught_pokemon, inventory.get_caught_pokemon_by_family)
+
+    pokemon_item = next(item for item in inventory.inventory_items if 'pokemon_data' in item['inventory_item_data'])
+    changed = dict(pokemon_item['inventory_item_data']['pokemon_data'])
+
+    def delta_heartbeat():
+        changed['cp'] += 1
+        inventory.update_player_inventory({'responses': {'GET_INVENTORY': {'inventory_delta': {
+            'inventory_items': [{'inventory_item_data': {'pokemon_data': dict(changed)}}],
+            'new_timestamp_ms': inventory.last_timestamp_ms + 1}}}})
+        cached_heartbeat()
+
+    for label, func in (('rebuilt by every consumer', legacy_heartbeat),
+                        ('cached, unchanged', cached_heartbeat),
+                        ('cached, one pokemon changed', delta_heartbeat)):
+        seconds = timeit.timeit(func, number=ROUNDS)
+        print('  {0:<28} {1:9.2f} ms per heartbeat'.format(label, seconds / ROUNDS * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Memory of the Pokemon objects the inventory caches for 1000 pokemon, measured with tracemalloc,
+and the size of the caught pokemon JSON sent to the web: the __dict__ based Pokemon serialized
+with its raw pokemon_data vs. the slotted Pokemon and to_dict(). The pokemon_data dicts are
+shared with the inventory and allocated before the measurement.
+
+Run with: python -m benchmarks.bench_pokemon_memory
+"""
+from __future__ import absolute_import, print_function
+
+import gc
+import json
+import logging
+import tracemalloc
+
+from pgoapi.rpc_api import RpcApi
+from POGOProtos.Networking.Requests_pb2 import RequestType
+from poketrainer.poke_utils import json_default
+from poketrainer.pokemon import Pokemon
+
+from .bench_inventory_delta import envelope
+from .bench_protobuf_to_dict import synthetic_inventory
+
+REQUEST = [RequestType.Value('GET_INVENTORY')]
+PLAYER_LEVEL = 22
+
+# Pokemon before __slots__: the same methods on a class with a __dict__
+LegacyPokemon = type('LegacyPokemon', (object,), dict((name, value) for name, value in vars(Pokemon).items()
+                                                      if name not in Pokemon.__slots__ + ('__slots__',)))
+
+
+def allocated(build):
+    gc.collect()
+    tracemalloc.start()
+    objects = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return objects, size
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    res = RpcApi(None)._parse_main_response(envelope(synthetic_inventory()), REQUEST)
+    pokemon_data = [item['inventory_item_data']['pokemon_data']
+                    for item in res['responses']['GET_INVENTORY']['inventory_delta']['inventory_items']
+                    if 'pokemon_data' in item['inventory_item_data']]
+    # warm up the per species caches of the stat maths
+    [Pokemon(data, PLAYER_LEVEL) for data in pokemon_data]
+
+    legacy, legacy_size = allocated(lambda: [LegacyPokemon(data, PLAYER_LEVEL) for data in pokemon_data])
+    slotted, slotted_size = allocated(lambda: [Pokemon(data, PLAYER_LEVEL) for data in pokemon_data])
+    assert [p.__dict__ for p in legacy] == [p.to_dict(Pokemon.__slots__) for p in slotted], 'different attributes'
+
+    legacy_json = json.dumps(legacy, default=lambda o: o.decode('utf8') if isinstance(o, bytes) else o.__dict__)
+    slotted_json = json.dumps([pokemon.to_dict() for pokemon in slotted], default=json_default)
+    web_json = json.dumps([pokemon.to_dict(('id', 'pokemon_id', 'pokemon_type', 'cp')) for pokemon in slotted], default=json_default)
+
+    print('{0} pokemon'.format(len(pokemon_data)))
+    print('  {0:<22} {1:>13} {2:>14}'.format('', 'bytes/pokemon', 'JSON bytes/pokemon'))
+    print('  {0:<22} {1:13.0f} {2:14.0f}'.format('__dict__, raw data', legacy_size / len(legacy), len(legacy_json) / len(legacy)))
+    print('  {0:<22} {1:13.0f} {2:14.0f}'.format('__slots__, to_dict()', slotted_size / len(slotted), len(slotted_json) / len(slotted)))
+    print('  {0:<22} {1:>13} {2:14.0f}'.format('  pokemon page fields', '', len(web_json) / len(slotted)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+The level and CP maths of Pokemon() for an inventory of 1000 pokemon: the CPM increments
+walked with square roots for every level and CPM vs. the half level table, bisecting the
+increments and the per species worst/perfect IV CP.
+
+Run with: python -m benchmarks.bench_pokemon_stats
+"""
+from __future__ import absolute_import, print_function
+
+import logging
+import timeit
+from math import sqrt
+
+from pgoapi.rpc_api import RpcApi
+from POGOProtos.Networking.Requests_pb2 import RequestType
+from poketrainer.pokemon import (CPM_INCREMENTS, GAME_MASTER, MAX_LEVEL_CPM,
+                                 Pokemon, cpm_by_level, get_tcpm, iv_cp_range,
+                                 level_by_cpm)
+
+from .bench_inventory_delta import envelope
+from .bench_protobuf_to_dict import synthetic_inventory
+
+REQUEST = [RequestType.Value('GET_INVENTORY')]
+PLAYER_LEVEL = 22
+ROUNDS = 5
+
+
+def legacy_level_by_cpm(cpm_total):
+    """ Pokemon.get_level_by_cpm before the tables """
+    prev_max_level = 0
+    prev_max_level_cpm = 0
+    for cpm_increment in CPM_INCREMENTS:
+        max_level = cpm_increment['max_level']
+        cpm_sqrt_increase_per_level = cpm_increment['cpm_sqrt_increase_per_level']
+        if 'max_level_cpm' in cpm_increment:
+            max_level_cpm = cpm_increment['max_level_cpm']
+        else:
+            max_level_cpm = legacy_cpm_by_level(max_level)
+        if cpm_total <= max_level_cpm:
+            level_diff_prev_max_level = (pow(cpm_total, 2) - pow(prev_max_level_cpm, 2)) / cpm_sqrt_increase_per_level
+            return round(prev_max_level + level_diff_prev_max_level, 1)
+        prev_max_level = max_level
+        prev_max_level_cpm = max_level_cpm
+    return 0.0
+
+
+def legacy_cpm_by_level(level):
+    """ Pokemon.get_cpm_by_level before the tables """
+    prev_max_level = 0
+    prev_max_level_cpm = 0
+    for cpm_increment in CPM_INCREMENTS:
+        max_level = cpm_increment['max_level']
+        cpm_sqrt_increase_per_level = cpm_increment['cpm_sqrt_increase_per_level']
+        if level <= max_level:
+            return sqrt(pow(prev_max_level_cpm, 2) + cpm_sqrt_increase_per_level * (level - prev_max_level))
+        prev_max_level_cpm = sqrt(pow(prev_max_level_cpm, 2) + cpm_sqrt_increase_per_level * (max_level - prev_max_level))
+        prev_max_level = max_level
+    return 0.0
+
+
+def legacy_stats(pokemon):
+    """ the level and CP block of Pokemon.__init__ before the tables """
+    additional_data = GAME_MASTER.get(pokemon.pokemon_id)
+    cpm_total = get_tcpm(pokemon.cp_multiplier + pokemon.additional_cp_multiplier)
+    level_wild = legacy_level_by_cpm(pokemon.cp_multiplier)
+    level = legacy_level_by_cpm(cpm_total)
+    attack = float(additional_data.BaseAttack) if additional_data else 0.0
+    defense = float(additional_data.BaseDefense) if additional_data else 0.0
+    stamina = float(additional_data.BaseStamina) if additional_data else 0.0
+    max_cp = pokemon.calc_cp(legacy_cpm_by_level(PLAYER_LEVEL + 1.5), additional_data)
+    max_cp_absolute = pokemon.calc_cp(legacy_cpm_by_level(40), additional_data)
+    worst_iv_cp = (attack * sqrt(defense) * sqrt(stamina) * pow(legacy_cpm_by_level(40), 2)) / 10
+    perfect_iv_cp = ((attack + 15) * sqrt(defense + 15) * sqrt(stamina + 15) * pow(legacy_cpm_by_level(40), 2)) / 10
+    iv_normalized = 100 * (max_cp_absolute - worst_iv_cp) / (perfect_iv_cp - worst_iv_cp)
+    return level_wild, level, max_cp, max_cp_absolute, iv_normalized
+
+
+def stats(pokemon):
+    """ the same block with the tables """
+    additional_data = GAME_MASTER.get(pokemon.pokemon_id)
+    cpm_total = get_tcpm(pokemon.cp_multiplier + pokemon.additional_cp_multiplier)
+    level_wild = level_by_cpm(pokemon.cp_multiplier)
+    level = level_by_cpm(cpm_total)
+    max_cp = pokemon.calc_cp(cpm_by_level(PLAYER_LEVEL + 1.5), additional_data)
+    max_cp_absolute = pokemon.calc_cp(MAX_LEVEL_CPM, additional_data)
+    worst_iv_cp, perfect_iv_cp = iv_cp_range(pokemon.pokemon_id)
+    iv_normalized = 100 * (max_cp_absolute - worst_iv_cp) / (perfect_iv_cp - worst_iv_cp)
+    return level_wild, level, max_cp, max_cp_absolute, iv_normalized
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    res = RpcApi(None)._parse_main_response(envelope(synthetic_inventory()), REQUEST)
+    pokemon_data = [item['inventory_item_data']['pokemon_data']
+                    for item in res['responses']['GET_INVENTORY']['inventory_delta']['inventory_items']
+                    if 'pokemon_data' in item['inventory_item_data']]
+    pokemon_list = [Pokemon(data, PLAYER_LEVEL) for data in pokemon_data]
+
+    for pokemon in pokemon_list:
+        assert legacy_stats(pokemon) == stats(pokemon), 'different stats for {0}'.format(pokemon.pokemon_id)
+        assert stats(pokemon)[:4] == (pokemon.level_wild, pokemon.level, pokemon.max_cp, pokemon.max_cp_absolute)
+    print('{0} pokemon'.format(len(pokemon_list)))
+
+    for label, func in (('stats, legacy', lambda: [legacy_stats(pokemon) for pokemon in pokemon_list]),
+                        ('stats, tables', lambda: [stats(pokemon) for pokemon in pokemon_list]),
+                        ('Pokemon()', lambda: [Pokemon(data, PLAYER_LEVEL) for data in pokemon_data])):
+        seconds = timeit.timeit(func, number=ROUNDS)
+        print('  {0:<16} {1:9.2f} ms per inventory'.format(label, seconds / ROUNDS * 1e3))
+
+
+if __name__ == '__main__':
+    main()
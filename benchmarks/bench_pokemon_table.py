@@ -0,0 +1,68 @@
+"""
+Scoring and grouping an inventory of 1000 pokemon after it changed, as Evolve does it: a
+Pokemon object per pokemon, grouped by species and each group sorted by (cp, iv) vs. the
+PokemonTable computing every column and score method at once and sorting with one lexsort.
+
+Run with: python -m benchmarks.bench_pokemon_table
+"""
+from __future__ import absolute_import, print_function
+
+import logging
+import timeit
+from collections import defaultdict
+
+from pgoapi.rpc_api import RpcApi
+from POGOProtos.Networking.Requests_pb2 import RequestType
+from poketrainer.pokemon import Pokemon
+from poketrainer.pokemon_table import PokemonTable
+
+from .bench_inventory_delta import envelope
+from .bench_protobuf_to_dict import synthetic_inventory
+
+REQUEST = [RequestType.Value('GET_INVENTORY')]
+PLAYER_LEVEL = 22
+MIN_SIMILAR_POKEMON = 1
+ROUNDS = 5
+
+
+def legacy_candidates(pokemon_data):
+    """ the first evolve candidate of every species, from Pokemon objects """
+    pokemon_list = sorted([Pokemon(data, PLAYER_LEVEL) for data in pokemon_data], key=lambda x: x.score, reverse=True)
+    by_family = defaultdict(list)
+    for pokemon in pokemon_list:
+        by_family[pokemon.pokemon_id].append(pokemon)
+    candidates = {}
+    for pokemon_id, pokemons in by_family.items():
+        if len(pokemons) > MIN_SIMILAR_POKEMON:
+            candidates[pokemon_id] = sorted(pokemons, key=lambda x: (x.cp, x.iv), reverse=True)[MIN_SIMILAR_POKEMON]
+    return candidates
+
+
+def table_candidates(pokemon_data):
+    """ the same from the table, only the candidates are built """
+    table = PokemonTable(pokemon_data, PLAYER_LEVEL, pokemon_factory=lambda data: Pokemon(data, PLAYER_LEVEL))
+    return dict((pokemon_id, table.get(rows[MIN_SIMILAR_POKEMON]))
+                for pokemon_id, rows in table.by_species(('cp', 'iv', 'score')).items() if len(rows) > MIN_SIMILAR_POKEMON)
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    res = RpcApi(None)._parse_main_response(envelope(synthetic_inventory()), REQUEST)
+    pokemon_data = [item['inventory_item_data']['pokemon_data']
+                    for item in res['responses']['GET_INVENTORY']['inventory_delta']['inventory_items']
+                    if 'pokemon_data' in item['inventory_item_data']]
+
+    legacy = legacy_candidates(pokemon_data)
+    table = table_candidates(pokemon_data)
+    assert dict((k, p.id) for k, p in legacy.items()) == dict((k, p.id) for k, p in table.items()), 'different candidates'
+    print('{0} pokemon, {1} species with evolve candidates'.format(len(pokemon_data), len(table)))
+
+    for label, func in (('Pokemon objects', lambda: legacy_candidates(pokemon_data)),
+                        ('PokemonTable', lambda: table_candidates(pokemon_data)),
+                        ('  table only', lambda: PokemonTable(pokemon_data, PLAYER_LEVEL).by_species(('cp', 'iv', 'score')))):
+        seconds = timeit.timeit(func, number=ROUNDS)
+        print('  {0:<16} {1:9.2f} ms per inventory'.format(label, seconds / ROUNDS * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Conversion cost of GET_INVENTORY and GET_MAP_OBJECTS responses to dicts, with the old
+per-field adaptor walk vs. the per-descriptor compiled conversion plans.
+
+Both converters must produce identical dicts, the benchmark fails otherwise.
+By default synthetic payloads are used, recorded raw responses can be passed instead:
+
+Run with: python -m benchmarks.bench_protobuf_to_dict [--inventory FILE] [--map-objects FILE]
+"""
+from __future__ import absolute_import, print_function
+
+import argparse
+import logging
+import random
+import timeit
+
+import pgoapi.rpc_api  # noqa: F401 - puts POGOProtos on the path
+from google.protobuf.descriptor import FieldDescriptor
+from pgoapi.protobuf_to_dict import EXTENSION_CONTAINER, TYPE_CALLABLE_MAP, enum_label_name, protobuf_to_dict, repeated
+from POGOProtos.Networking.Responses_pb2 import GetInventoryResponse, GetMapObjectsResponse
+
+ROUNDS = 50
+
+
+def legacy_field_value_adaptor(pb, field, type_callable_map=TYPE_CALLABLE_MAP, use_enum_labels=False):
+    if field.type == FieldDescriptor.TYPE_MESSAGE:
+        return lambda pb: legacy_protobuf_to_dict(pb, type_callable_map=type_callable_map, use_enum_labels=use_enum_labels)
+
+    if use_enum_labels and field.type == FieldDescriptor.TYPE_ENUM:
+        return lambda value: enum_label_name(field, value)
+
+    return type_callable_map[field.type]
+
+
+def legacy_protobuf_to_dict(pb, type_callable_map=TYPE_CALLABLE_MAP, use_enum_labels=False):
+    """ the converter as it was before the compiled plans, builds an adaptor per field per message """
+    result_dict = {}
+    extensions = {}
+    for field, value in pb.ListFields():
+        if field.message_type and field.message_type.has_options and field.message_type.GetOptions().map_entry:
+            result_dict[field.name] = dict(value)
+            continue
+        type_callable = legacy_field_value_adaptor(pb, field, type_callable_map, use_enum_labels)
+        if field.label == field.LABEL_REPEATED:
+            type_callable = repeated(type_callable)
+
+        if field.is_extension:
+            extensions[str(field.number)] = type_callable(value)
+            continue
+
+        result_dict[field.name] = type_callable(value)
+
+    if extensions:
+        result_dict[EXTENSION_CONTAINER] = extensions
+    return result_dict
+
+
+def synthetic_inventory(pokemon_count=1000, item_count=40, candy_count=150):
+    rand = random.Random(1)
+    response = GetInventoryResponse()
+    response.success = True
+    delta = response.inventory_delta
+    delta.new_timestamp_ms = 1470000000000
+    for i in range(pokemon_count):
+        data = delta.inventory_items.add().inventory_item_data.pokemon_data
+        data.id = 10000000000000000000 + i
+        data.pokemon_id = rand.randint(1, 151)
+        data.cp = rand.randint(10, 2500)
+        data.stamina = data.stamina_max = rand.randint(10, 200)
+        data.move_1 = rand.randint(200, 250)
+        data.move_2 = rand.randint(13, 130)
+        data.height_m = rand.random()
+        data.weight_kg = rand.random() * 50
+        data.individual_attack = rand.randint(0, 15)
+        data.individual_defense = rand.randint(0, 15)
+        data.individual_stamina = rand.randint(0, 15)
+        data.cp_multiplier = rand.random()
+        data.pokeball = 1
+        data.captured_cell_id = rand.getrandbits(63)
+        data.creation_time_ms = 1469596340021 + i
+    for i in range(item_count):
+        item = delta.inventory_items.add().inventory_item_data.item
+        item.item_id = i + 1
+        item.count = rand.randint(1, 100)
+    for i in range(candy_count):
+        candy = delta.inventory_items.add().inventory_item_data.candy
+        candy.family_id = i + 1
+        candy.candy = rand.randint(0, 500)
+    return response.SerializeToString()
+
+
+def synthetic_map_objects(cell_count=21, forts_per_cell=15, spawns_per_cell=30, pokemon_per_cell=5):
+    rand = random.Random(2)
+    response = GetMapObjectsResponse()
+    response.status = 1
+    for c in range(cell_count):
+        cell = response.map_cells.add()
+        cell.s2_cell_id = 9970561120513919632 + c
+        cell.current_timestamp_ms = 1470000000000
+        for f in range(forts_per_cell):
+            fort = cell.forts.add()
+            fort.id = '%032x.16' % rand.getrandbits(128)
+            fort.last_modified_timestamp_ms = 1469000000000
+            fort.latitude = 40.0 + rand.random() / 100
+            fort.longitude = -73.0 + rand.random() / 100
+            fort.enabled = True
+            fort.type = 1
+            fort.cooldown_complete_timestamp_ms = 1470000000000
+        for s in range(spawns_per_cell):
+            spawn = cell.decimated_spawn_points.add()
+            spawn.latitude = 40.0 + rand.random() / 100
+            spawn.longitude = -73.0 + rand.random() / 100
+        for p in range(pokemon_per_cell):
+            wild = cell.wild_pokemons.add()
+            wild.encounter_id = rand.getrandbits(63)
+            wild.spawn_point_id = '%x' % rand.getrandbits(40)
+            wild.latitude = 40.0 + rand.random() / 100
+            wild.longitude = -73.0 + rand.random() / 100
+            wild.time_till_hidden_ms = rand.randint(0, 900000)
+            wild.pokemon_data.pokemon_id = rand.randint(1, 151)
+            nearby = cell.nearby_pokemons.add()
+            nearby.pokemon_id = wild.pokemon_data.pokemon_id
+            nearby.encounter_id = wild.encounter_id
+    return response.SerializeToString()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--inventory', help='recorded raw GetInventoryResponse')
+    parser.add_argument('--map-objects', help='recorded raw GetMapObjectsResponse')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    payloads = []
+    for name, message_class, path, synthesize in (('GET_INVENTORY', GetInventoryResponse, args.inventory, synthetic_inventory),
+                                                  ('GET_MAP_OBJECTS', GetMapObjectsResponse, args.map_objects, synthetic_map_objects)):
+        if path:
+            with open(path, 'rb') as f:
+                raw = f.read()
+        else:
+            raw = synthesize()
+        message = message_class()
+        message.ParseFromString(raw)
+        payloads.append((name, message, len(raw)))
+
+    for name, message, size in payloads:
+        assert legacy_protobuf_to_dict(message) == protobuf_to_dict(message), 'converters disagree on %s' % name
+        print('{0} ({1} bytes)'.format(name, size))
+        for label, func in (('legacy adaptors', legacy_protobuf_to_dict), ('compiled plans', protobuf_to_dict)):
+            seconds = timeit.timeit(lambda: func(message), number=ROUNDS)
+            print('  {0:<18} {1:8.2f} ms per response'.format(label, seconds / ROUNDS * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Cost of a full heartbeat response (GET_PLAYER + GET_INVENTORY + CHECK_AWARDED_BADGES) as parsed
+by RpcApi, with dict conversion vs. the lazy MessageView mode, followed by the reads the
+inventory setup does on it. Reports time and peak allocation per heartbeat.
+
+Run with: python -m benchmarks.bench_response_views
+"""
+from __future__ import absolute_import, print_function
+
+import logging
+import timeit
+import tracemalloc
+
+from pgoapi.rpc_api import RpcApi
+from POGOProtos.Networking.Envelopes_pb2 import ResponseEnvelope
+from POGOProtos.Networking.Requests_pb2 import RequestType
+from POGOProtos.Networking.Responses_pb2 import CheckAwardedBadgesResponse, GetInventoryResponse, GetPlayerResponse
+
+from .bench_protobuf_to_dict import synthetic_inventory
+
+HEARTBEAT = [
+    RequestType.Value('GET_PLAYER'),
+    RequestType.Value('CHECK_AWARDED_BADGES'),
+    {RequestType.Value('GET_INVENTORY'): {'last_timestamp_ms': 0}},
+]
+ROUNDS = 20
+
+
+class FakeHttpResponse(object):
+    status_code = 200
+
+    def __init__(self, content):
+        self.content = content
+
+
+def heartbeat_response():
+    player = GetPlayerResponse(success=True)
+    player.player_data.username = 'benchmark'
+    player.player_data.max_pokemon_storage = 250
+    player.player_data.max_item_storage = 350
+
+    envelope = ResponseEnvelope(status_code=1, request_id=1)
+    envelope.returns.extend([player.SerializeToString(), CheckAwardedBadgesResponse(success=True).SerializeToString(),
+                             synthetic_inventory()])
+    return FakeHttpResponse(envelope.SerializeToString())
+
+
+def read_like_inventory_setup(res):
+    """ the reads Poketrainer._heartbeat and Inventory.setup_inventory do on a heartbeat """
+    responses = res.get('responses', {})
+    responses.get('GET_PLAYER', {}).get('player_data', {}).get('username', 'NA')
+    items = responses.get('GET_INVENTORY', {}).get('inventory_delta', {}).get('inventory_items', [])
+    for inventory_item in items:
+        data = inventory_item.get('inventory_item_data', {})
+        if 'item' in data:
+            data['item'].get('count', 0)
+        elif 'candy' in data:
+            data['candy'].get('family_id', -1)
+        elif 'pokemon_data' in data:
+            data['pokemon_data'].get('is_egg', False)
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    http_response = heartbeat_response()
+
+    dicts = RpcApi(None)._parse_main_response(http_response, HEARTBEAT)
+    views = RpcApi(None, response_views=True)._parse_main_response(http_response, HEARTBEAT)
+    for name in dicts['responses']:
+        assert views['responses'][name].to_dict() == dicts['responses'][name], 'view of %s differs' % name
+        assert views['responses'][name] == dicts['responses'][name], 'view of %s differs' % name
+
+    print('heartbeat of {0} bytes'.format(len(http_response.content)))
+
+    def parse_only():
+        envelope = ResponseEnvelope()
+        envelope.ParseFromString(http_response.content)
+        for proto_class, raw in zip((GetPlayerResponse, CheckAwardedBadgesResponse, GetInventoryResponse), envelope.returns):
+            proto_class().ParseFromString(raw)
+
+    seconds = timeit.timeit(parse_only, number=ROUNDS)
+    print('  {0:<6} {1:8.2f} ms per heartbeat (protobuf parsing alone)'.format('parse', seconds / ROUNDS * 1e3))
+    for label, response_views in (('dicts', False), ('views', True)):
+        rpc = RpcApi(None, response_views=response_views)
+
+        def heartbeat():
+            read_like_inventory_setup(rpc._parse_main_response(http_response, HEARTBEAT))
+
+        seconds = timeit.timeit(heartbeat, number=ROUNDS)
+
+        tracemalloc.start()
+        heartbeat()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print('  {0:<6} {1:8.2f} ms per heartbeat, {2:8.1f} KiB peak'.format(label, seconds / ROUNDS * 1e3, peak / 1024.0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Ordering cached forts into a loop for 100, 1k and 5k synthetic forts: the old deepcopy based
+greedy sort of FortWalker._sort_cached_forts (only up to 300 forts, it is cubic) vs.
+poketrainer.route_planner (nearest neighbour tour, then 2-opt/or-opt).
+
+Run with: python -m benchmarks.bench_route_planner [--time-budget SECONDS]
+"""
+from __future__ import absolute_import, print_function
+
+import argparse
+import copy
+import sys
+import time
+import warnings
+
+import numpy as np
+from geopy.distance import vincenty
+
+from poketrainer import geo
+from poketrainer.route_planner import nearest_neighbor_tour, plan_route, route_length
+
+from .bench_geo import ORIGIN, synthetic_forts
+
+LEGACY_MAX_FORTS = 300
+
+
+def legacy_sort_cached_forts(all_cached_forts, orig_posf):
+    """ FortWalker._sort_cached_forts before the route planner, distances in vincenty as back then """
+    def distance_in_meters(p1, p2):
+        return vincenty(p1, p2).meters
+
+    temp_all_cached = copy.deepcopy(all_cached_forts)
+    temp_sorted = [copy.deepcopy(temp_all_cached[0])]
+    temp_element = copy.deepcopy(temp_all_cached[0])
+    temp_bool = True
+
+    while (len(temp_sorted) < len(all_cached_forts)):
+        temp_last_element = copy.deepcopy(temp_sorted[-1])
+        temp_element = copy.deepcopy(temp_sorted[0])
+        temp_max_float = sys.float_info.max
+
+        if (temp_bool):
+            for fort in temp_all_cached:
+                if distance_in_meters((orig_posf[0], orig_posf[1]),
+                                      (fort[0]['latitude'], fort[0]['longitude'])) <= temp_max_float:
+                    temp_element = copy.deepcopy(fort)
+                    temp_max_float = distance_in_meters((orig_posf[0], orig_posf[1]),
+                                                        (fort[0]['latitude'], fort[0]['longitude']))
+            temp_sorted.pop(0)
+            temp_sorted.append(temp_element)
+            temp_all_cached.remove(temp_element)
+            temp_bool = False
+        else:
+            for fort in temp_all_cached:
+                if ((distance_in_meters((temp_last_element[0]['latitude'], temp_last_element[0]['longitude']),
+                                        (fort[0]['latitude'], fort[0]['longitude'])) <= temp_max_float) and
+                        (not any(fort[0]['id'] == x[0]['id'] for x in temp_sorted))):
+                    temp_element = copy.deepcopy(fort)
+                    temp_max_float = distance_in_meters(
+                        (temp_last_element[0]['latitude'], temp_last_element[0]['longitude']),
+                        (fort[0]['latitude'], fort[0]['longitude']))
+            temp_all_cached.remove(temp_element)
+            temp_sorted.append(temp_element)
+    return temp_sorted
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--time-budget', type=float, default=2.0, help='seconds of 2-opt/or-opt improvement')
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+
+    for count in (100, 1000, 5000):
+        forts = synthetic_forts(count)
+        points = [(fort['latitude'], fort['longitude']) for fort in forts]
+        print('{0} forts'.format(count))
+
+        if count <= LEGACY_MAX_FORTS:
+            cached = [(fort, 0.0) for fort in forts]
+            started = time.time()
+            legacy = legacy_sort_cached_forts(cached, ORIGIN)
+            seconds = time.time() - started
+            ids = [fort['id'] for fort in forts]
+            order = np.array([ids.index(fort[0]['id']) for fort in legacy])
+            length = route_length(geo.distance_matrix(points), order)
+            print('  {0:<22} {1:9.3f} s {2:10.0f} m'.format('legacy sort', seconds, length))
+
+        started = time.time()
+        distances = geo.distance_matrix(points, dtype=np.float32 if count > 2000 else np.float64)
+        start = int(np.argmin(geo.distances_from(ORIGIN, points)))
+        length = route_length(distances, nearest_neighbor_tour(distances, start))
+        print('  {0:<22} {1:9.3f} s {2:10.0f} m'.format('nearest neighbour', time.time() - started, length))
+
+        started = time.time()
+        order, length = plan_route(points, start=ORIGIN, time_budget=args.time_budget)
+        assert sorted(order) == list(range(count)), 'not a permutation'
+        print('  {0:<22} {1:9.3f} s {2:10.0f} m'.format('2-opt/or-opt', time.time() - started, length))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Per-call overhead of building and parsing the sub requests of a 5-subrequest heartbeat,
+with the old import_module based class lookup vs. the precomputed class registry.
+
+Run with: python -m benchmarks.bench_rpc_registry
+"""
+from __future__ import absolute_import, print_function
+
+import logging
+import timeit
+from importlib import import_module
+
+from pgoapi.rpc_api import RpcApi
+from pgoapi.utilities import to_camel_case
+from POGOProtos.Networking.Envelopes_pb2 import RequestEnvelope, ResponseEnvelope
+from POGOProtos.Networking.Requests_pb2 import RequestType
+
+HEARTBEAT = [
+    RequestType.Value('GET_PLAYER'),
+    RequestType.Value('GET_HATCHED_EGGS'),
+    {RequestType.Value('GET_INVENTORY'): {'last_timestamp_ms': 0}},
+    RequestType.Value('CHECK_AWARDED_BADGES'),
+    {RequestType.Value('DOWNLOAD_SETTINGS'): {'hash': '54b359c97e46900f87211ef6e6dd0b7f2a3ea1f5'}},
+]
+ROUNDS = 5000
+
+
+def get_class(cls):
+    module_, class_ = cls.rsplit('.', 1)
+    return getattr(import_module(module_), class_)
+
+
+def import_module_lookups():
+    """ the class name derivation + lookups the old code did for every sub request and sub response """
+    for entry in HEARTBEAT:
+        entry_id = list(entry.keys())[0] if isinstance(entry, dict) else entry
+        entry_name = RequestType.Name(entry_id)
+        if isinstance(entry, dict):
+            get_class('POGOProtos.Networking.Requests.Messages_pb2.' + to_camel_case(entry_name.lower()) + 'Message')()
+        get_class('POGOProtos.Networking.Responses_pb2.' + to_camel_case(entry_name.lower()) + 'Response')()
+
+
+def registry_lookups():
+    from pgoapi.rpc_api import REQUEST_MESSAGE_CLASSES, RESPONSE_CLASSES
+    for entry in HEARTBEAT:
+        entry_id = list(entry.keys())[0] if isinstance(entry, dict) else entry
+        if isinstance(entry, dict):
+            REQUEST_MESSAGE_CLASSES[entry_id]()
+        RESPONSE_CLASSES[entry_id]()
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    rpc = RpcApi(None)
+
+    response = ResponseEnvelope()
+    for _ in HEARTBEAT:
+        response.returns.append(b'')
+
+    def build_and_parse():
+        rpc._build_sub_requests(RequestEnvelope(), HEARTBEAT)
+        rpc._parse_sub_responses(response, HEARTBEAT, {})
+
+    for name, func in (('import_module lookups', import_module_lookups),
+                       ('registry lookups', registry_lookups),
+                       ('build + parse (registry)', build_and_parse)):
+        seconds = timeit.timeit(func, number=ROUNDS)
+        print('{0:<28} {1:8.2f} us per heartbeat'.format(name, seconds / ROUNDS * 1e6))
+
+
+if __name__ == '__main__':
+    main()
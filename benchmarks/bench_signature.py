@@ -0,0 +1,123 @@
+"""
+Per-request cost of the signature generation, old ctypes call sequence vs. the prepared SignatureLib.
+
+The real libencrypt is not needed: a stub `encrypt` with the same prototype and output size
+is compiled into a temporary shared library when a C compiler is around, otherwise a
+ctypes callback written in python stands in for it.
+
+Run with: python -m benchmarks.bench_signature [--python-stub]
+"""
+from __future__ import absolute_import, print_function
+
+import argparse
+import ctypes
+import os
+import shutil
+import subprocess
+import tempfile
+import timeit
+
+import six
+from pgoapi.signature import SignatureLib
+
+ROUNDS = 20000
+PLAIN_SIZE = 300
+
+STUB_SOURCE = b"""
+#include <stddef.h>
+
+int encrypt(const unsigned char *input, size_t input_size, const unsigned char *iv, size_t iv_size,
+            unsigned char *output, size_t *output_size)
+{
+    size_t i, size = 32 + input_size + (256 - input_size % 256);
+    if (output == NULL) {
+        *output_size = size;
+        return 0;
+    }
+    for (i = 0; i < size; i++)
+        output[i] = (i < iv_size ? iv[i] : input[i % input_size]) ^ (unsigned char)i;
+    *output_size = size;
+    return 0;
+}
+"""
+
+# untyped pointers, the callback reads the buffers by their sizes and accepts both the old
+# byref(array) and the new array output argument
+ENCRYPT_PROTOTYPE = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t, ctypes.c_void_p, ctypes.c_size_t,
+                                     ctypes.c_void_p, ctypes.POINTER(ctypes.c_size_t))
+
+
+class PythonStubLibrary(object):
+    """ python version of the stub above, for hosts without a C compiler """
+
+    def __init__(self):
+        self.encrypt = ENCRYPT_PROTOTYPE(self._encrypt)
+
+    @staticmethod
+    def _encrypt(input_, input_size, iv, iv_size, output, output_size):
+        size = 32 + input_size + (256 - input_size % 256)
+        if output:
+            input_ = bytearray(ctypes.string_at(input_, input_size))
+            iv = bytearray(ctypes.string_at(iv, iv_size))
+            output = ctypes.cast(output, ctypes.POINTER(ctypes.c_ubyte))
+            for i in range(size):
+                output[i] = (iv[i] if i < iv_size else input_[i % input_size]) ^ (i & 0xff)
+        output_size[0] = size
+        return 0
+
+
+def compile_stub(directory):
+    source = os.path.join(directory, 'encrypt_stub.c')
+    library = os.path.join(directory, 'encrypt_stub.so')
+    with open(source, 'wb') as f:
+        f.write(STUB_SOURCE)
+    try:
+        subprocess.check_call(['cc', '-O2', '-shared', '-fPIC', '-o', library, source])
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return library
+
+
+def legacy_generate_signature(library, signature_plain, iv):
+    """ the call sequence RpcApi._generate_signature used before the prepared binding """
+    library.argtypes = [ctypes.c_char_p, ctypes.c_size_t, ctypes.c_char_p, ctypes.c_size_t, ctypes.POINTER(ctypes.c_ubyte), ctypes.POINTER(ctypes.c_size_t)]
+    library.restype = ctypes.c_int
+
+    output_size = ctypes.c_size_t()
+
+    library.encrypt(signature_plain, len(signature_plain), iv, 32, None, ctypes.byref(output_size))
+    output = (ctypes.c_ubyte * output_size.value)()
+    library.encrypt(signature_plain, len(signature_plain), iv, 32, ctypes.byref(output), ctypes.byref(output_size))
+    return b''.join(list(map(lambda x: six.int2byte(x), output)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--python-stub', action='store_true', help='use the python stub even if a C compiler is available')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        # separate handles, SignatureLib sets the prototype on its own function pointer
+        library_path = None if args.python_stub else compile_stub(directory)
+        if library_path is None:
+            print('using the python stub library')
+            library, signature_lib, rounds = PythonStubLibrary(), SignatureLib(PythonStubLibrary()), ROUNDS // 20
+        else:
+            print('using a compiled stub library')
+            library, signature_lib, rounds = ctypes.CDLL(library_path), SignatureLib(ctypes.CDLL(library_path)), ROUNDS
+
+        plain = os.urandom(PLAIN_SIZE)
+        iv = os.urandom(32)
+        assert legacy_generate_signature(library, plain, iv) == signature_lib.encrypt(plain, iv), 'signatures differ'
+
+        for label, func in (('legacy call sequence', lambda: legacy_generate_signature(library, plain, iv)),
+                            ('prepared SignatureLib', lambda: signature_lib.encrypt(plain, iv))):
+            seconds = timeit.timeit(func, number=rounds)
+            print('  {0:<22} {1:8.2f} us per signature'.format(label, seconds / rounds * 1e6))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -15,6 +15,8 @@ def create_logger(name, color='reset', log_level=logging.INFO, log_colors={
                                                    log_colors=log_colors))
     log = colorlog.getLogger(name)
     log.propagate = False
-    log.addHandler(handler)
+    # loggers are shared by every account of a process, one handler is enough
+    if not log.handlers:
+        log.addHandler(handler)
     log.setLevel(log_level)
     return log
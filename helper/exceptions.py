@@ -2,3 +2,7 @@
 
 class TooManyEmptyResponses(Exception):
     pass
+
+
+class ActionExpired(Exception):
+    pass
@@ -0,0 +1,131 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+from pgoapi.protobuf_to_dict import TYPE_CALLABLE_MAP, _get_plan, _convert, \
+    _MAP, _MESSAGE, _REPEATED_MESSAGE, _SCALAR, _REPEATED_SCALAR, _REPEATED_RAW
+
+_MISSING = object()
+_CONTAINER_KINDS = frozenset([_REPEATED_MESSAGE, _REPEATED_SCALAR, _REPEATED_RAW, _MAP])
+
+
+class MessageView(Mapping):
+
+    """
+    Read-only, dict-like view of a parsed protobuf message.
+
+    Keys and values are the same protobuf_to_dict() would produce, but fields are
+    only converted when they are accessed - sub messages become views themselves.
+    Use to_dict() where a real dict is needed (json dumps, mutation).
+    """
+
+    __slots__ = ('_pb', '_plan', '_cache')
+
+    def __init__(self, pb, skip_fields=None, plan=None):
+        self._pb = pb
+        self._plan = plan or _get_plan(pb.DESCRIPTOR, TYPE_CALLABLE_MAP, False, skip_fields)
+        self._cache = {}
+
+    def __getitem__(self, key):
+        value = self._lookup(key)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def __contains__(self, key):
+        return self._lookup(key) is not _MISSING
+
+    def _lookup(self, key):
+        value = self._cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        item = self._plan.fields_by_name.get(key)
+        if item is None:
+            return _MISSING
+        field, (name, kind, type_callable, nested) = item
+
+        pb = self._pb
+        if kind == _MESSAGE:
+            if not pb.HasField(name):
+                return _MISSING
+            value = MessageView(getattr(pb, name), plan=nested)
+        else:
+            value = getattr(pb, name)
+            if kind in _CONTAINER_KINDS:
+                if not len(value):
+                    return _MISSING
+            elif field.containing_oneof is not None:
+                if not pb.HasField(name):
+                    return _MISSING
+            elif value == field.default_value:
+                # proto3 scalars are not present when they hold their default, same as in ListFields()
+                return _MISSING
+
+            if kind == _SCALAR:
+                value = type_callable(value)
+            elif kind == _REPEATED_MESSAGE:
+                value = [MessageView(entry, plan=nested) for entry in value]
+            elif kind == _REPEATED_RAW:
+                value = list(value)
+            elif kind == _REPEATED_SCALAR:
+                value = [type_callable(entry) for entry in value]
+            elif kind == _MAP:
+                value = dict(value)
+
+        self._cache[key] = value
+        return value
+
+    def __iter__(self):
+        fields_by_name = self._plan.fields_by_name
+        for field, value in self._pb.ListFields():
+            if field.name in fields_by_name and not field.is_extension:
+                yield field.name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+    def __reduce__(self):
+        """ pickles and deep copies as the plain dict """
+        return (dict, (self.to_dict(),))
+
+    def to_dict(self):
+        return _convert(self._pb, self._plan)
+
+    def get_message(self):
+        return self._pb
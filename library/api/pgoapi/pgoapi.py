@@ -32,6 +32,9 @@ import requests
 
 from . import __title__, __version__, __copyright__
 from pgoapi.rpc_api import RpcApi
+from pgoapi.rpc_session import RpcSession
+from pgoapi.rate_limiter import RateLimiter
+from pgoapi.wire_debug import WireDebugger
 from pgoapi.auth_ptc import AuthPtc
 from pgoapi.auth_google import AuthGoogle
 from pgoapi.utilities import parse_api_endpoint
@@ -45,7 +48,8 @@ logger = logging.getLogger(__name__)
 
 class PGoApi:
 
-    def __init__(self, provider=None, oauth2_refresh_token=None, username=None, password=None, position_lat=None, position_lng=None, position_alt=None):
+    def __init__(self, provider=None, oauth2_refresh_token=None, username=None, password=None, position_lat=None, position_lng=None, position_alt=None,
+                 pool_size=10, max_reconnects=2, session=None, response_views=False, rate_limiter=None, wire_debugger=None):
         self.set_logger()
         self.log.info('%s v%s - %s', __title__, __version__, __copyright__)
 
@@ -61,6 +65,18 @@ class PGoApi:
 
         self._signature_lib = None
 
+        """ keep-alive connection pool borrowed by every RpcApi - pass a session to share it between several accounts """
+        self._session = session or RpcSession(pool_size=pool_size, max_reconnects=max_reconnects)
+
+        """ dumps the RPC envelopes - see pgoapi.wire_debug, pass one in to keep it across api objects """
+        self._wire_debugger = wire_debugger
+
+        """ sub responses as lazy read-only MessageViews instead of dicts - see pgoapi.message_view """
+        self._response_views = response_views
+
+        """ minimum spacing of the RPCs per request class - see pgoapi.rate_limiter """
+        self._rate_limiter = rate_limiter or RateLimiter()
+
     def set_logger(self, logger=None):
         self.log = logger or logging.getLogger(__name__)
 
@@ -109,6 +125,36 @@ class PGoApi:
         request = PGoApiRequest(self, self._position_lat, self._position_lng, self._position_alt)
         return request
 
+    def get_session(self):
+        return self._session
+
+    def set_session(self, session):
+        self._session = session
+
+    def get_connection_stats(self):
+        return self._session.get_stats()
+
+    def enable_wire_debug(self, filename, max_bytes=10 * 1024 * 1024, backup_count=3, use_protoc=True):
+        if self._wire_debugger:
+            self._wire_debugger.close()
+        self._wire_debugger = WireDebugger(filename, max_bytes=max_bytes, backup_count=backup_count, use_protoc=use_protoc)
+        self.log.info('Wire debug mode enabled, dumping RPC envelopes to %s', filename)
+
+    def get_wire_debugger(self):
+        return self._wire_debugger
+
+    def set_response_views(self, enabled):
+        self._response_views = enabled
+
+    def get_response_views(self):
+        return self._response_views
+
+    def set_rate_limiter(self, rate_limiter):
+        self._rate_limiter = rate_limiter
+
+    def get_rate_limiter(self):
+        return self._rate_limiter
+
     def activate_signature(self, lib_path):
         self._signature_lib = lib_path
 
@@ -207,12 +253,17 @@ class PGoApiRequest:
             self.log.info('Not logged in')
             return NotLoggedInException()
 
-        request = RpcApi(self._auth_provider)
+        request = RpcApi(self._auth_provider, self.__parent__.get_session(), self.__parent__.get_wire_debugger(),
+                         self.__parent__.get_response_views())
 
         lib_path = self.__parent__.get_signature_lib()
         if lib_path is not None:
             request.activate_signature(lib_path)
 
+        rate_limiter = self.__parent__.get_rate_limiter()
+        if rate_limiter is not None:
+            rate_limiter.wait(self._req_method_list)
+
         self.log.info('Execution of RPC')
         response = None
 
@@ -39,43 +39,123 @@ def enum_label_name(field, value):
     return field.enum_type.values_by_number[int(value)].name
 
 
-def protobuf_to_dict(pb, type_callable_map=TYPE_CALLABLE_MAP, use_enum_labels=False):
+_SKIP, _MAP, _MESSAGE, _REPEATED_MESSAGE, _SCALAR, _REPEATED_SCALAR, _RAW, _REPEATED_RAW = range(8)
+
+# default converters which return python 3 field values unchanged, their calls are left out of the plans
+_PASSTHROUGH_CALLABLES = (int, float, bool, six.text_type) if six.PY3 else ()
+
+# compiled conversion plans, keyed by (descriptor, type map, enum labels, skip fields), the maps by their
+# contents, so that maps built per call share their plans and a changed map doesn't get a stale one
+_PLANS = {}
+
+
+class _ConversionPlan(object):
+    """ per-descriptor list of field converters, built once and reused for every message of that type """
+
+    __slots__ = ('descriptor', 'entries', 'fields_by_name', 'type_callable_map', 'use_enum_labels', 'skip_fields')
+
+    def __init__(self, descriptor, type_callable_map, use_enum_labels, skip_fields):
+        self.descriptor = descriptor
+        self.entries = {}
+        self.fields_by_name = {}
+        self.type_callable_map = type_callable_map
+        self.use_enum_labels = use_enum_labels
+        self.skip_fields = skip_fields
+
+    def compile(self):
+        skipped = self.skip_fields.get(self.descriptor.full_name, ()) if self.skip_fields else ()
+        for field in self.descriptor.fields:
+            if field.name in skipped:
+                self.entries[field] = (field.name, _SKIP, None, None)
+            else:
+                self.entries[field] = self.compile_field(field)
+                self.fields_by_name[field.name] = (field, self.entries[field])
+
+    def compile_field(self, field):
+        if field.message_type and field.message_type.has_options and field.message_type.GetOptions().map_entry:
+            return (field.name, _MAP, None, None)
+
+        is_repeated = field.label == FieldDescriptor.LABEL_REPEATED
+        if field.type == FieldDescriptor.TYPE_MESSAGE:
+            nested = _get_plan(field.message_type, self.type_callable_map, self.use_enum_labels, self.skip_fields)
+            return (field.name, _REPEATED_MESSAGE if is_repeated else _MESSAGE, None, nested)
+
+        if self.use_enum_labels and field.type == FieldDescriptor.TYPE_ENUM:
+            type_callable = lambda value, field=field: enum_label_name(field, value)
+        elif field.type in self.type_callable_map:
+            type_callable = self.type_callable_map[field.type]
+        else:
+            raise TypeError("Field %s.%s has unrecognised type id %d" % (
+                self.descriptor.full_name, field.name, field.type))
+
+        if type_callable in _PASSTHROUGH_CALLABLES and type_callable is TYPE_CALLABLE_MAP.get(field.type):
+            return (field.name, _REPEATED_RAW if is_repeated else _RAW, None, None)
+        return (field.name, _REPEATED_SCALAR if is_repeated else _SCALAR, type_callable, None)
+
+
+def _get_plan(descriptor, type_callable_map, use_enum_labels, skip_fields):
+    key = (descriptor, frozenset(type_callable_map.items()), use_enum_labels,
+           frozenset((name, frozenset(fields)) for name, fields in skip_fields.items()) if skip_fields else None)
+    plan = _PLANS.get(key)
+    if plan is None:
+        plan = _ConversionPlan(descriptor, type_callable_map, use_enum_labels, skip_fields)
+        # register before compiling, so recursive message types resolve to this plan
+        _PLANS[key] = plan
+        plan.compile()
+    return plan
+
+
+def _convert(pb, plan):
     result_dict = {}
-    extensions = {}
+    extensions = None
+    entries = plan.entries
     for field, value in pb.ListFields():
-        if field.message_type and field.message_type.has_options and field.message_type.GetOptions().map_entry:
-            result_dict[field.name] = dict(value)
+        entry = entries.get(field)
+        if entry is None:
+            # extensions are not part of the descriptor's field list
+            entry = plan.compile_field(field)
+
+        name, kind, type_callable, nested = entry
+        if kind == _RAW:
+            pass
+        elif kind == _SCALAR:
+            value = type_callable(value)
+        elif kind == _MESSAGE:
+            value = _convert(value, nested)
+        elif kind == _REPEATED_MESSAGE:
+            value = [_convert(item, nested) for item in value]
+        elif kind == _REPEATED_RAW:
+            value = list(value)
+        elif kind == _REPEATED_SCALAR:
+            value = [type_callable(item) for item in value]
+        elif kind == _MAP:
+            value = dict(value)
+        else:
             continue
-        type_callable = _get_field_value_adaptor(pb, field, type_callable_map, use_enum_labels)
-        if field.label == FieldDescriptor.LABEL_REPEATED:
-            type_callable = repeated(type_callable)
 
         if field.is_extension:
-            extensions[str(field.number)] = type_callable(value)
+            if extensions is None:
+                extensions = {}
+            extensions[str(field.number)] = value
             continue
 
-        result_dict[field.name] = type_callable(value)
+        result_dict[name] = value
 
     if extensions:
         result_dict[EXTENSION_CONTAINER] = extensions
     return result_dict
 
 
-def _get_field_value_adaptor(pb, field, type_callable_map=TYPE_CALLABLE_MAP, use_enum_labels=False):
-    if field.type == FieldDescriptor.TYPE_MESSAGE:
-        # recursively encode protobuf sub-message
-        return lambda pb: protobuf_to_dict(
-            pb, type_callable_map=type_callable_map,
-            use_enum_labels=use_enum_labels)
-
-    if use_enum_labels and field.type == FieldDescriptor.TYPE_ENUM:
-        return lambda value: enum_label_name(field, value)
+def protobuf_to_dict(pb, type_callable_map=TYPE_CALLABLE_MAP, use_enum_labels=False, skip_fields=None):
+    """Converts a protobuf message into a dict, using a conversion plan compiled once per message type.
 
-    if field.type in type_callable_map:
-        return type_callable_map[field.type]
-
-    raise TypeError("Field %s.%s has unrecognised type id %d" % (
-        pb.__class__.__name__, field.name, field.type))
+    :param pb: the protobuf message instance
+    :param dict type_callable_map: a mapping of protobuf types to callables converting the field values
+    :param bool use_enum_labels: use enum labels instead of their numbers
+    :param dict skip_fields: optional mapping of message full names to field names that are left out,
+       e.g. ``{'POGOProtos.Map.MapCell': {'decimated_spawn_points'}}``
+    """
+    return _convert(pb, _get_plan(pb.DESCRIPTOR, type_callable_map, use_enum_labels, skip_fields))
 
 
 def get_bytes(value):
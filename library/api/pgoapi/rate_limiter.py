@@ -0,0 +1,159 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import bisect
+import logging
+import time
+
+from pgoapi.rpc_api import REQUEST_NAMES
+
+""" request types sharing a minimum spacing, unlisted types are not limited """
+REQUEST_CLASSES = {
+    'GET_MAP_OBJECTS': 'map_objects',
+    'ENCOUNTER': 'encounter',
+    'DISK_ENCOUNTER': 'encounter',
+    'INCENSE_ENCOUNTER': 'encounter',
+    'USE_ITEM_CAPTURE': 'encounter',
+    'CATCH_POKEMON': 'catch',
+    'FORT_SEARCH': 'fort',
+    'FORT_DETAILS': 'fort',
+    'RELEASE_POKEMON': 'release',
+    'EVOLVE_POKEMON': 'maintenance',
+    'UPGRADE_POKEMON': 'maintenance',
+    'NICKNAME_POKEMON': 'maintenance',
+    'SET_FAVORITE_POKEMON': 'maintenance',
+    'RECYCLE_INVENTORY_ITEM': 'maintenance',
+    'USE_ITEM_EGG_INCUBATOR': 'maintenance',
+    'USE_ITEM_XP_BOOST': 'maintenance',
+    'GET_HATCHED_EGGS': 'maintenance',
+}
+
+""" minimum seconds between two requests of a class """
+DEFAULT_INTERVALS = {
+    'map_objects': 1.0,
+    'encounter': 0.2,
+    'catch': 0.5,
+    'fort': 0.2,
+    'release': 1.0,
+    'maintenance': 0.2,
+}
+
+""" upper bounds (seconds) of the wait time histogram buckets """
+WAIT_BUCKETS = (0.0, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, float('inf'))
+
+
+class RateLimiter:
+
+    """
+    Token bucket per request class, an RPC waits until every class of its sub-requests has a token.
+
+    A bucket holds `burst` tokens and refills one per interval, so with the default burst of one a
+    request only waits for the rest of the interval since the last request of its class - time
+    spent on other things in between counts. Wait times are recorded per class in histograms.
+
+    checkpoint is called before every RPC, waiting or not, and again after each sleep.
+    """
+
+    def __init__(self, intervals=None, burst=1, sleep=time.sleep, clock=time.time, checkpoint=None):
+        self.log = logging.getLogger(__name__)
+
+        self._intervals = dict(DEFAULT_INTERVALS)
+        self._intervals.update(intervals or {})
+        self._burst = burst
+        self._sleep = sleep
+        self._clock = clock
+        self._checkpoint = checkpoint or (lambda: None)
+        self._buckets = {}
+        self._stats = {}
+
+    def set_interval(self, request_class, seconds):
+        self._intervals[request_class] = seconds
+
+    def get_interval(self, request_class):
+        return self._intervals.get(request_class, 0.0)
+
+    def request_classes(self, request_types):
+        classes = set()
+        for request_type in request_types:
+            if isinstance(request_type, dict):
+                request_type = list(request_type.keys())[0]
+            request_class = REQUEST_CLASSES.get(REQUEST_NAMES.get(request_type))
+            if request_class is not None and self._intervals.get(request_class, 0.0) > 0:
+                classes.add(request_class)
+        return classes
+
+    def wait(self, request_types):
+        """ blocks until the sub-requests may be sent, takes their tokens and returns the seconds waited """
+        self._checkpoint()
+        classes = self.request_classes(request_types)
+        if not classes:
+            return 0.0
+
+        started = self._clock()
+        while True:
+            now = self._clock()
+            delay = max(self._delay(request_class, now) for request_class in classes)
+            if delay <= 0:
+                break
+            # another request may have taken a token while we slept, so check again
+            self._sleep(delay)
+            self._checkpoint()
+
+        waited = now - started
+        for request_class in classes:
+            self._take(request_class, now)
+            self._record(request_class, waited)
+        if waited > 0:
+            self.log.debug('Waited %.3fs for %s', waited, ', '.join(sorted(classes)))
+        return waited
+
+    def get_stats(self):
+        stats = {}
+        for request_class, (calls, waited, histogram) in self._stats.items():
+            stats[request_class] = {
+                'calls': calls,
+                'waited': waited,
+                'histogram': dict(('<=%s' % bound, count) for bound, count in zip(WAIT_BUCKETS, histogram) if count),
+            }
+        return stats
+
+    def _tokens(self, request_class, now):
+        interval = self._intervals[request_class]
+        tokens, updated = self._buckets.get(request_class, (self._burst, now))
+        return min(self._burst, tokens + (now - updated) / interval)
+
+    def _delay(self, request_class, now):
+        tokens = self._tokens(request_class, now)
+        return 0.0 if tokens >= 1 else (1 - tokens) * self._intervals[request_class]
+
+    def _take(self, request_class, now):
+        self._buckets[request_class] = (max(0.0, self._tokens(request_class, now) - 1), now)
+
+    def _record(self, request_class, waited):
+        calls, total, histogram = self._stats.get(request_class, (0, 0.0, [0] * len(WAIT_BUCKETS)))
+        histogram[bisect.bisect_left(WAIT_BUCKETS, waited)] += 1
+        self._stats[request_class] = (calls + 1, total + waited, histogram)
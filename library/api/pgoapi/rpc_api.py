@@ -32,17 +32,14 @@ import base64
 import random
 import logging
 import requests
-import subprocess
-import six
 
 from google.protobuf import message
 
-from importlib import import_module
-
-
-import ctypes
-
 from pgoapi.protobuf_to_dict import protobuf_to_dict
+from pgoapi.message_view import MessageView
+from pgoapi.rpc_session import RpcSession
+from pgoapi.signature import load_signature_lib
+from pgoapi.wire_debug import decode_raw
 from pgoapi.exceptions import NotLoggedInException, ServerBusyOrOfflineException, ServerSideRequestThrottlingException, ServerSideAccessForbiddenException, UnexpectedResponseException, AuthTokenExpiredException, ServerApiEndpointRedirectException
 from pgoapi.utilities import to_camel_case, get_time, get_format_time_diff, Rand48, long_to_bytes, generateLocation1, generateLocation2, generateRequestHash, f2i
 
@@ -50,21 +47,48 @@ from . import protos
 from POGOProtos.Networking.Envelopes_pb2 import RequestEnvelope
 from POGOProtos.Networking.Envelopes_pb2 import ResponseEnvelope
 from POGOProtos.Networking.Requests_pb2 import RequestType
+from POGOProtos.Networking.Requests import Messages_pb2
+from POGOProtos.Networking import Responses_pb2
 import Signature_pb2
 
 
+def _build_class_registry(module, suffix):
+    """ maps every RequestType value to its protobuf class, types without a definition are left out """
+    registry = {}
+    for entry_name, entry_id in RequestType.items():
+        proto_class = getattr(module, to_camel_case(entry_name.lower()) + suffix, None)
+        if proto_class is not None:
+            registry[entry_id] = proto_class
+    return registry
+
+
+REQUEST_NAMES = dict((entry_id, entry_name) for entry_name, entry_id in RequestType.items())
+REQUEST_MESSAGE_CLASSES = _build_class_registry(Messages_pb2, 'Message')
+RESPONSE_CLASSES = _build_class_registry(Responses_pb2, 'Response')
+
+""" fields left out of the response dicts - the raw sub response bytes are parsed on their own """
+RESPONSE_SKIP_FIELDS = {
+    ResponseEnvelope.DESCRIPTOR.full_name: frozenset(['returns']),
+}
+
+
 class RpcApi:
 
     RPC_ID = 0
     START_TIME = 0
 
-    def __init__(self, auth_provider):
+    def __init__(self, auth_provider, session=None, wire_debugger=None, response_views=False):
 
         self.log = logging.getLogger(__name__)
 
-        self._session = requests.session()
-        self._session.headers.update({'User-Agent': 'Niantic App'})
-        self._session.verify = True
+        """ borrow the long-lived transport of our PGoApi, only standalone usage gets its own one """
+        self._session = session or RpcSession()
+
+        """ envelope dumps are only produced in wire-debug mode, off the request path """
+        self._wire_debugger = wire_debugger
+
+        """ return lazy read-only MessageViews instead of fully converted dicts for the sub responses """
+        self._response_views = response_views
 
         self._auth_provider = auth_provider
 
@@ -82,7 +106,7 @@ class RpcApi:
     def activate_signature(self, lib_path):
         try:
             self._signature_gen = True
-            self._signature_lib = ctypes.cdll.LoadLibrary(lib_path)
+            self._signature_lib = load_signature_lib(lib_path)
         except:
             raise
 
@@ -93,28 +117,16 @@ class RpcApi:
         return RpcApi.RPC_ID
 
     def decode_raw(self, raw):
-        output = error = None
-        try:
-            process = subprocess.Popen(['protoc', '--decode_raw'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, close_fds=True)
-            output, error = process.communicate(raw)
-        except:
-            output = "Couldn't find protoc in your environment OR other issue..."
-
-        return output
-
-    def get_class(self, cls):
-        module_, class_ = cls.rsplit('.', 1)
-        class_ = getattr(import_module(module_), class_)
-        return class_
+        return decode_raw(raw)
 
     def _make_rpc(self, endpoint, request_proto_plain):
         self.log.debug('Execution of RPC')
 
         request_proto_serialized = request_proto_plain.SerializeToString()
-        try:
-            http_response = self._session.post(endpoint, data=request_proto_serialized)
-        except requests.exceptions.ConnectionError as e:
-            raise ServerBusyOrOfflineException(e)
+        if self._wire_debugger:
+            self._wire_debugger.submit('RequestEnvelope', RequestEnvelope, request_proto_serialized)
+
+        http_response = self._session.post(endpoint, data=request_proto_serialized)
 
         return http_response
 
@@ -219,25 +231,17 @@ class RpcApi:
         # unknown stuff
         request.unknown12 = 989
 
-        self.log.debug('Generated protobuf request: \n\r%s', request)
+        if not self._wire_debugger:
+            self.log.debug('Generated protobuf request: \n\r%s', request)
 
         return request
 
     def _generate_signature(self, signature_plain, lib_path="encrypt.so"):
         if self._signature_lib is None:
             self.activate_signature(lib_path)
-        self._signature_lib.argtypes = [ctypes.c_char_p, ctypes.c_size_t, ctypes.c_char_p, ctypes.c_size_t, ctypes.POINTER(ctypes.c_ubyte), ctypes.POINTER(ctypes.c_size_t)]
-        self._signature_lib.restype = ctypes.c_int
 
         iv = os.urandom(32)
-
-        output_size = ctypes.c_size_t()
-
-        self._signature_lib.encrypt(signature_plain, len(signature_plain), iv, 32, None, ctypes.byref(output_size))
-        output = (ctypes.c_ubyte * output_size.value)()
-        self._signature_lib.encrypt(signature_plain, len(signature_plain), iv, 32, ctypes.byref(output), ctypes.byref(output_size))
-        signature = b''.join(list(map(lambda x: six.int2byte(x), output)))
-        return signature
+        return self._signature_lib.encrypt(signature_plain, iv)
 
     def _build_main_request_orig(self, subrequests, player_position=None):
         self.log.debug('Generating main RPC request...')
@@ -277,13 +281,14 @@ class RpcApi:
                 entry_id = list(entry.items())[0][0]
                 entry_content = entry[entry_id]
 
-                entry_name = RequestType.Name(entry_id)
+                proto_class = REQUEST_MESSAGE_CLASSES.get(entry_id)
+                if proto_class is None:
+                    raise Exception('No request message definition found for {}'.format(REQUEST_NAMES.get(entry_id, entry_id)))
 
-                proto_name = to_camel_case(entry_name.lower()) + 'Message'
-                proto_classname = 'POGOProtos.Networking.Requests.Messages_pb2.' + proto_name
-                subrequest_extension = self.get_class(proto_classname)()
+                subrequest_extension = proto_class()
+                proto_name = proto_class.__name__
 
-                self.log.debug("Subrequest class: %s", proto_classname)
+                self.log.debug("Subrequest class: %s", proto_name)
 
                 for (key, value) in entry_content.items():
                     if isinstance(value, list):
@@ -349,13 +354,15 @@ class RpcApi:
             self.log.warning('Could not parse response: %s', e)
             return False
 
-        self.log.debug('Protobuf structure of rpc response:\n\r%s', response_proto)
-        try:
-            self.log.debug('Decode raw over protoc (protoc has to be in your PATH):\n\r%s', self.decode_raw(response_raw.content).decode('utf-8'))
-        except:
-            self.log.debug('Error during protoc parsing - ignored.')
+        if self._wire_debugger:
+            self._wire_debugger.submit('ResponseEnvelope', ResponseEnvelope, response_raw.content)
+        else:
+            self.log.debug('Protobuf structure of rpc response:\n\r%s', response_proto)
 
-        response_proto_dict = protobuf_to_dict(response_proto)
+        if self._response_views:
+            response_proto_dict = dict(MessageView(response_proto, skip_fields=RESPONSE_SKIP_FIELDS))
+        else:
+            response_proto_dict = protobuf_to_dict(response_proto, skip_fields=RESPONSE_SKIP_FIELDS)
         response_proto_dict = self._parse_sub_responses(response_proto, subrequests, response_proto_dict)
 
         return response_proto_dict
@@ -363,6 +370,8 @@ class RpcApi:
     def _parse_sub_responses(self, response_proto, subrequests_list, response_proto_dict):
         self.log.debug('Parsing sub RPC responses...')
         response_proto_dict['responses'] = {}
+        # in request order, as 'responses' keeps only the last of several sub requests of the same type
+        response_proto_dict['sub_responses'] = []
 
         if 'returns' in response_proto_dict:
             del response_proto_dict['returns']
@@ -379,17 +388,17 @@ class RpcApi:
             else:
                 entry_id = list(request_entry.items())[0][0]
 
-            entry_name = RequestType.Name(entry_id)
-            proto_name = to_camel_case(entry_name.lower()) + 'Response'
-            proto_classname = 'POGOProtos.Networking.Responses_pb2.' + proto_name
-
-            self.log.debug("Parsing class: %s", proto_classname)
+            entry_name = REQUEST_NAMES[entry_id]
+            proto_class = RESPONSE_CLASSES.get(entry_id)
 
             subresponse_return = None
-            try:
-                subresponse_extension = self.get_class(proto_classname)()
-            except Exception as e:
+            if proto_class is not None:
+                subresponse_extension = proto_class()
+                proto_classname = proto_class.__name__
+                self.log.debug("Parsing class: %s", proto_classname)
+            else:
                 subresponse_extension = None
+                proto_classname = to_camel_case(entry_name.lower()) + 'Response'
                 error = 'Protobuf definition for {} not found'.format(proto_classname)
                 subresponse_return = error
                 self.log.debug(error)
@@ -397,13 +406,17 @@ class RpcApi:
             if subresponse_extension:
                 try:
                     subresponse_extension.ParseFromString(subresponse)
-                    subresponse_return = protobuf_to_dict(subresponse_extension)
+                    if self._response_views:
+                        subresponse_return = MessageView(subresponse_extension, skip_fields=RESPONSE_SKIP_FIELDS)
+                    else:
+                        subresponse_return = protobuf_to_dict(subresponse_extension, skip_fields=RESPONSE_SKIP_FIELDS)
                 except:
                     error = "Protobuf definition for {} seems not to match".format(proto_classname)
                     subresponse_return = error
                     self.log.debug(error)
 
             response_proto_dict['responses'][entry_name] = subresponse_return
+            response_proto_dict['sub_responses'].append(subresponse_return)
             i += 1
 
         return response_proto_dict
@@ -0,0 +1,108 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import logging
+import requests
+
+from requests.adapters import HTTPAdapter
+
+from pgoapi.exceptions import ServerBusyOrOfflineException
+
+
+class _ConnectionTrackingAdapter(HTTPAdapter):
+
+    """ tells on every response whether its request opened a new connection or reused one of the pool """
+
+    def build_response(self, req, resp):
+        response = super(_ConnectionTrackingAdapter, self).build_response(req, resp)
+        # the connection is still checked out, a socket it has not served before is a new one (or a reconnect)
+        connection = getattr(resp, '_connection', None)
+        sock = getattr(connection, 'sock', None)
+        response.new_connection = sock is None or getattr(connection, '_pgoapi_sock', None) is not sock
+        if sock is not None:
+            connection._pgoapi_sock = sock
+        return response
+
+
+class RpcSession:
+
+    """
+    Long-lived keep-alive HTTP transport, borrowed by every RpcApi instance.
+
+    One RpcSession can be shared by several PGoApi objects (e.g. all accounts of
+    one process); connections are pooled per endpoint host by the underlying
+    urllib3 pool manager, so sharing does not mix up api endpoints.
+    """
+
+    def __init__(self, pool_size=10, pool_block=False, max_reconnects=2):
+        self.log = logging.getLogger(__name__)
+
+        self._max_reconnects = max_reconnects
+
+        self._adapter = _ConnectionTrackingAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=pool_block)
+
+        self._session = requests.session()
+        self._session.headers.update({'User-Agent': 'Niantic App'})
+        self._session.verify = True
+        self._session.mount('https://', self._adapter)
+        self._session.mount('http://', self._adapter)
+
+        self._stats = {}
+
+    def post(self, endpoint, data):
+        attempt = 0
+        while True:
+            try:
+                response = self._session.post(endpoint, data=data)
+            except requests.exceptions.ConnectionError as e:
+                # urllib3 drops the broken connection from the pool, so the next attempt gets a fresh one
+                self._count(endpoint, 'resets')
+                if attempt >= self._max_reconnects:
+                    raise ServerBusyOrOfflineException(e)
+                attempt += 1
+                self.log.debug('Connection to %s reset, reconnecting (%s/%s): %s', endpoint, attempt, self._max_reconnects, e)
+                continue
+
+            self._count(endpoint, 'handshakes' if getattr(response, 'new_connection', True) else 'reused')
+            return response
+
+    def get_stats(self, endpoint=None):
+        if endpoint is not None:
+            return dict(self._stats.get(endpoint, {}))
+
+        total = {'handshakes': 0, 'reused': 0, 'resets': 0}
+        for stats in self._stats.values():
+            for key, value in stats.items():
+                total[key] += value
+        return total
+
+    def close(self):
+        self._session.close()
+
+    def _count(self, endpoint, key):
+        stats = self._stats.setdefault(endpoint, {'handshakes': 0, 'reused': 0, 'resets': 0})
+        stats[key] += 1
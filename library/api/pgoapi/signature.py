@@ -0,0 +1,80 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import ctypes
+import logging
+import threading
+
+""" one bound library per path and process, shared by every RpcApi """
+_LIBRARIES = {}
+_LIBRARIES_LOCK = threading.Lock()
+
+
+def load_signature_lib(lib_path):
+    with _LIBRARIES_LOCK:
+        signature_lib = _LIBRARIES.get(lib_path)
+        if signature_lib is None:
+            signature_lib = SignatureLib(ctypes.cdll.LoadLibrary(lib_path))
+            _LIBRARIES[lib_path] = signature_lib
+        return signature_lib
+
+
+class SignatureLib:
+
+    """
+    Prepared binding of the native `encrypt` function.
+
+    The prototype is set once, the output size is only probed once per input length
+    (it solely depends on it) and the output buffer is reused between calls.
+    """
+
+    def __init__(self, library):
+        self.log = logging.getLogger(__name__)
+
+        self._encrypt = library.encrypt
+        self._encrypt.argtypes = [ctypes.c_char_p, ctypes.c_size_t, ctypes.c_char_p, ctypes.c_size_t, ctypes.POINTER(ctypes.c_ubyte), ctypes.POINTER(ctypes.c_size_t)]
+        self._encrypt.restype = ctypes.c_int
+
+        self._lock = threading.Lock()
+        self._output_sizes = {}
+        self._output = None
+        self._output_size = ctypes.c_size_t()
+
+    def encrypt(self, plain, iv):
+        with self._lock:
+            output_size = self._output_sizes.get(len(plain))
+            if output_size is None:
+                self._encrypt(plain, len(plain), iv, len(iv), None, ctypes.byref(self._output_size))
+                output_size = self._output_sizes[len(plain)] = self._output_size.value
+                self.log.debug('Signature output size for %s input bytes: %s', len(plain), output_size)
+
+            if self._output is None or len(self._output) < output_size:
+                self._output = (ctypes.c_ubyte * output_size)()
+
+            self._output_size.value = output_size
+            self._encrypt(plain, len(plain), iv, len(iv), self._output, ctypes.byref(self._output_size))
+            return ctypes.string_at(self._output, self._output_size.value)
@@ -32,11 +32,12 @@ import logging
 
 from json import JSONEncoder
 from binascii import unhexlify
+from collections import OrderedDict
 
 # other stuff
 from google.protobuf.internal import encoder
 from geopy.geocoders import GoogleV3
-from s2sphere import LatLng, Angle, Cap, RegionCoverer, math
+from s2sphere import CellId, LatLng, Angle, Cap, RegionCoverer, math
 
 log = logging.getLogger(__name__)
 
@@ -68,12 +69,53 @@ def get_pos_by_name(location_name):
 
     return (loc.latitude, loc.longitude, loc.altitude)
 
+class CoveringCache(object):
+    """
+    Bounded LRU cache of S2 coverings, keyed by the fine cell containing the position and the
+    covering arguments. Coverings are computed for the center of that cell, so every position
+    within it gets the same (sorted) cell id list.
+    """
+
+    def __init__(self, maxsize=256, key_level=17):
+        self.maxsize = maxsize
+        self.key_level = key_level
+        self.hits = 0
+        self.misses = 0
+        self._coverings = OrderedDict()
+
+    def get(self, lat, lng, compute, *args):
+        cell = CellId.from_lat_lng(LatLng.from_degrees(lat, lng)).parent(self.key_level)
+        key = (cell.id(),) + args
+        covering = self._coverings.pop(key, None)
+        if covering is None:
+            self.misses += 1
+            center = cell.to_lat_lng()
+            covering = tuple(compute(center.lat().degrees, center.lng().degrees, *args))
+            if len(self._coverings) >= self.maxsize:
+                self._coverings.popitem(last=False)
+        else:
+            self.hits += 1
+        self._coverings[key] = covering
+        return list(covering)
+
+    def get_stats(self):
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._coverings),
+                'hit_rate': float(self.hits) / lookups if lookups else 0.0}
+
+    def clear(self):
+        self._coverings.clear()
+
 EARTH_RADIUS = 6371 * 1000
+CELL_ID_COVERINGS = CoveringCache()
 def get_cell_ids(lat, long, radius=1000):
     # Max values allowed by server according to this comment:
     # https://github.com/AeonLucid/POGOProtos/issues/83#issuecomment-235612285
     if radius > 1500:
         radius = 1500  # radius = 1500 is max allowed by the server
+    return CELL_ID_COVERINGS.get(lat, long, _get_cell_ids, radius)
+
+def _get_cell_ids(lat, long, radius):
     region = Cap.from_axis_angle(LatLng.from_degrees(lat, long).to_point(), Angle.from_degrees(360*radius/(2*math.pi*EARTH_RADIUS)))
     coverer = RegionCoverer()
     coverer.min_level = 15
@@ -0,0 +1,117 @@
+"""
+pgoapi - Pokemon Go API
+Copyright (c) 2016 tjado <https://github.com/tejado>
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+OR OTHER DEALINGS IN THE SOFTWARE.
+
+Author: tjado <https://github.com/tejado>
+"""
+
+from __future__ import absolute_import
+
+import logging
+import subprocess
+import threading
+
+from logging.handlers import RotatingFileHandler
+from six.moves import queue
+
+
+def decode_raw(raw):
+    output = error = None
+    try:
+        process = subprocess.Popen(['protoc', '--decode_raw'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, close_fds=True)
+        output, error = process.communicate(raw)
+    except:
+        output = b"Couldn't find protoc in your environment OR other issue..."
+
+    return output
+
+
+class WireDebugger:
+
+    """
+    Opt-in wire dump of every RPC envelope.
+
+    The request path only enqueues the serialized bytes; protobuf text formatting and
+    the `protoc --decode_raw` fork run on a background thread which writes the
+    dumps to a rotating file. If the worker falls behind, dumps are dropped instead
+    of slowing down the bot. close() stops the thread and closes the file.
+    """
+
+    def __init__(self, filename, max_bytes=10 * 1024 * 1024, backup_count=3, queue_size=100, use_protoc=True):
+        self.log = logging.getLogger(__name__)
+
+        self.filename = filename
+        self._use_protoc = use_protoc
+        self._queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+        self._handler = RotatingFileHandler(filename, maxBytes=max_bytes, backupCount=backup_count)
+        self._handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+        # not registered with the logging module, so it goes away with the debugger
+        self._dump_log = logging.Logger('{}.dump'.format(__name__), logging.DEBUG)
+        self._dump_log.addHandler(self._handler)
+
+        self._worker = threading.Thread(target=self._run, name='pgoapi-wire-debug')
+        self._worker.daemon = True
+        self._worker.start()
+
+    def submit(self, label, message_class, raw):
+        try:
+            self._queue.put_nowait((label, message_class, raw))
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        self._queue.join()
+
+    def close(self):
+        if not self._worker.is_alive():
+            return
+        # the dumps queued so far are still written
+        self._queue.put(None)
+        self._worker.join()
+        self._dump_log.removeHandler(self._handler)
+        self._handler.close()
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                self._queue.task_done()
+                return
+            label, message_class, raw = entry
+            try:
+                self._dump(label, message_class, raw)
+            except Exception as e:
+                self.log.debug('Wire debug dump of %s failed: %s', label, e)
+            finally:
+                self._queue.task_done()
+
+    def _dump(self, label, message_class, raw):
+        message = message_class()
+        message.ParseFromString(raw)
+        self._dump_log.debug('%s (%s bytes):\n%s', label, len(raw), message)
+
+        if self._use_protoc:
+            decoded = decode_raw(raw)
+            if isinstance(decoded, bytes):
+                decoded = decoded.decode('utf-8', 'replace')
+            self._dump_log.debug('%s decoded raw over protoc:\n%s', label, decoded)
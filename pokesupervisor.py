@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+Runs many accounts of config.json in one process (or sharded across a few worker processes),
+instead of one pokecli.py process per account.
+"""
+# the accounts share one hub, blocking socket, ssl and sleep calls have to yield to the others
+from gevent import monkey
+monkey.patch_all()
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import logging  # noqa: E402
+import multiprocessing  # noqa: E402
+import os  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+
+import gevent  # noqa: E402
+
+from helper.colorlogger import create_logger  # noqa: E402
+from poketrainer.supervisor import Supervisor  # noqa: E402
+
+logger = create_logger(__name__, color='red')
+
+
+def init_arguments():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-a", "--accounts", help="Comma separated indices of the accounts in config.json to start (default: all)")
+    parser.add_argument("-w", "--workers", help="Number of processes to shard the accounts across, 0 for one per CPU",
+                        default=1, type=int)
+    parser.add_argument("-e", "--encrypt_lib", help="encrypt lib, libencrypt.so/encrypt.dll", default="libencrypt.so")
+    parser.add_argument("-d", "--debug", help="Debug Mode", action='store_true', default=False)
+    parser.add_argument("--shard", help=argparse.SUPPRESS, type=int)
+    return parser.parse_args()
+
+
+def config_indices(accounts):
+    if accounts:
+        return [int(index) for index in accounts.split(',')]
+    with open("config.json") as data:
+        return list(range(len(json.load(data).get('accounts', []))))
+
+
+def run_workers(arguments, workers):
+    processes = []
+    for shard in range(workers):
+        command = [sys.executable, os.path.realpath(__file__), '--workers', str(workers), '--shard', str(shard),
+                   '--encrypt_lib', arguments.encrypt_lib]
+        if arguments.accounts:
+            command += ['--accounts', arguments.accounts]
+        if arguments.debug:
+            command.append('--debug')
+        processes.append(subprocess.Popen(command))
+    try:
+        for process in processes:
+            process.wait()
+    except KeyboardInterrupt:
+        logger.info('Exiting...')
+        for process in processes:
+            process.terminate()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(module)10s] [%(levelname)5s] s%(message)s')
+    create_logger("requests", log_level=logging.WARNING)
+    create_logger("pgoapi", log_level=logging.WARNING)
+    create_logger("rpc_api", log_level=logging.INFO)
+
+    arguments = init_arguments()
+    workers = arguments.workers or multiprocessing.cpu_count()
+    indices = config_indices(arguments.accounts)
+    if workers > 1 and arguments.shard is None:
+        run_workers(arguments, min(workers, len(indices)))
+        return
+    if arguments.shard is not None:
+        indices = indices[arguments.shard::workers]
+
+    args = {'config_index': None, 'location': None, 'encrypt_lib': arguments.encrypt_lib, 'debug': arguments.debug}
+    supervisor = Supervisor(args, indices)
+    logger.info('Starting accounts %s', ', '.join(map(str, indices)))
+    supervisor.start()
+    while True:
+        try:
+            gevent.sleep(60.0)
+            totals = supervisor.metrics()['totals']
+            logger.info('Accounts running: %s/%s, pokemon caught: %s', totals['running'], totals['accounts'],
+                        totals['pokemon_caught'])
+        except KeyboardInterrupt:
+            logger.info('Exiting...')
+            supervisor.stop()
+            exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+from __future__ import absolute_import
+
+from helper.colorlogger import create_logger
+
+
+class RequestBatch(object):
+    """
+    Collects independent maintenance sub-requests (release, recycle, evolve, incubate) and sends
+    them as few RPC envelopes as possible, at most max_size sub-requests each.
+
+    Every sub-request has a callback which gets its own sub-response, even when an envelope
+    holds several requests of the same type. The callbacks apply the results to the local
+    inventory; if that isn't enough (hatched eggs), the last envelope can also fetch the full
+    inventory, which the callbacks of that envelope then already see.
+
+    The sub-requests were chosen from the local inventory, so no interrupting action of the
+    scheduler (e.g. a release from the web) runs between the envelopes.
+    """
+
+    def __init__(self, parent, max_size=None):
+        self.parent = parent
+        self.log = create_logger(__name__)
+        self.max_size = max(1, max_size or self.parent.config.max_batch_size)
+        self._requests = []
+
+    def add(self, method, callback=None, **kwargs):
+        self._requests.append((method, kwargs, callback))
+
+    def __len__(self):
+        return len(self._requests)
+
+    def flush(self, refresh_inventory=False):
+        """ sends the queued sub-requests and calls their callbacks, returns the number of RPCs """
+        requests, self._requests = self._requests, []
+        if not requests:
+            return 0
+
+        # the inventory request takes a slot in the last envelope, which may then hold only it
+        count = len(requests) + (1 if refresh_inventory else 0)
+        envelopes = [requests[i:i + self.max_size] for i in range(0, count, self.max_size)]
+        with self.parent.scheduler.uninterrupted():
+            self._send(envelopes, refresh_inventory)
+        self.log.debug("Sent %s sub-requests in %s RPCs", len(requests), len(envelopes))
+        return len(envelopes)
+
+    def _send(self, envelopes, refresh_inventory):
+        for number, envelope in enumerate(envelopes, 1):
+            request = self.parent.api.create_request()
+            for method, kwargs, _ in envelope:
+                getattr(request, method)(**kwargs)
+            refresh = refresh_inventory and number == len(envelopes)
+            if refresh:
+                request.get_inventory(**self.parent.inventory.inventory_request())
+            res = request.call()
+            if refresh:
+                self.parent.inventory.update_player_inventory(res=res if isinstance(res, dict) else None)
+
+            sub_responses = res.get('sub_responses', []) if isinstance(res, dict) else []
+            for i, (method, _, callback) in enumerate(envelope):
+                sub_response = sub_responses[i] if i < len(sub_responses) else None
+                if not hasattr(sub_response, 'get'):
+                    # missing, or an error message instead of a parsed response
+                    self.log.debug("No response for %s: %s", method, sub_response)
+                    sub_response = {}
+                if callback is not None:
+                    callback(sub_response)
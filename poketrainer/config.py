@@ -7,6 +7,8 @@ from library.api.pgoapi.protos.POGOProtos import Enums_pb2 as Enums
 from library.api.pgoapi.protos.POGOProtos.Inventory import \
     Item_pb2 as Item_Enums
 
+from .geo import check_distance_mode
+
 
 class Config(object):
 
@@ -32,6 +34,10 @@ class Config(object):
         self.spin_all_forts = config.get("BEHAVIOR", {}).get("SPIN_ALL_FORTS", False)
         self.stay_within_proximity = config.get("BEHAVIOR", {}).get("STAY_WITHIN_PROXIMITY",
                                                                     9999999)  # Stay within proximity
+        self.distance_mode = check_distance_mode(config.get("BEHAVIOR", {}).get("DISTANCE_MODE", "haversine"))  # or "vincenty"
+        self.route_planner = config.get("BEHAVIOR", {}).get("ROUTE_PLANNER", "local")  # or "google"
+        self.shared_knowledge_file = config.get("BEHAVIOR", {}).get("SHARED_KNOWLEDGE_FILE", "")  # sqlite file, all accounts
+        self.inventory_resync_seconds = config.get("BEHAVIOR", {}).get("INVENTORY_RESYNC_SECONDS", 300)
         self.should_catch_pokemon = config.get("CAPTURE", {}).get("CATCH_POKEMON", True)
         self.max_catch_attempts = config.get("CAPTURE", {}).get("MAX_CATCH_ATTEMPTS", 10)
         self.min_failed_attempts_before_using_berry = config.get("CAPTURE", {}).get("MIN_FAILED_ATTEMPTS_BEFORE_USING_BERRY", 3)
@@ -53,6 +59,14 @@ class Config(object):
 
         self.experimental = config.get("BEHAVIOR", {}).get("EXPERIMENTAL", False)
 
+        self.connection_pool_size = config.get("API", {}).get("CONNECTION_POOL_SIZE", 10)
+        self.max_reconnects = config.get("API", {}).get("MAX_RECONNECTS", 2)
+        self.wire_debug = config.get("API", {}).get("WIRE_DEBUG", False)  # dump raw RPC envelopes to a file
+        self.wire_debug_file = config.get("API", {}).get("WIRE_DEBUG_FILE", "data_dumps/%s.wire.log" % self.username)
+        self.response_views = config.get("API", {}).get("RESPONSE_VIEWS", False)  # lazy read-only responses
+        self.incremental_map_objects = config.get("API", {}).get("INCREMENTAL_MAP_OBJECTS", False)
+        self.max_batch_size = config.get("API", {}).get("MAX_BATCH_SIZE", 10)  # sub-requests per maintenance RPC
+
         self.pokemon_cleanup_testing_mode = config.get('POKEMON_CLEANUP', {}).get('TESTING_MODE', False)
         self.min_similar_pokemon = config.get("POKEMON_CLEANUP", {}).get("MIN_SIMILAR_POKEMON",
                                                                          1)  # Keep atleast one of everything.
@@ -114,6 +128,7 @@ class Config(object):
             self.cache_filename = './cache/cache ' + (hashlib.md5(start_location.encode())).hexdigest() + str(self.stay_within_proximity)
             self.use_cache = config.get("BEHAVIOR", {}).get("USE_CACHED_FORTS", False)
             self.cache_is_sorted = config.get("BEHAVIOR", {}).get("CACHED_FORTS_SORTED", False)
+            self.cache_read_only = config.get("BEHAVIOR", {}).get("CACHED_FORTS_READ_ONLY", False)  # shared cache of another account
             self.enable_caching = config.get("BEHAVIOR", {}).get("ENABLE_CACHING", False)
 
     def _sanity_check_needy_item_farming(self):
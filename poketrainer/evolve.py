@@ -1,7 +1,10 @@
 from __future__ import absolute_import
 
+from functools import partial
+
 from helper.colorlogger import create_logger
 
+from .batch import RequestBatch
 from .pokemon import Pokemon
 
 
@@ -12,44 +15,52 @@ class Evolve(object):
         self.log = create_logger(__name__, self.parent.config.log_colors["evolve".upper()])
 
     def attempt_evolve(self):
-        caught_pokemon = self.parent.inventory.get_caught_pokemon_by_family()
-        for pokemons in caught_pokemon.values():
-            if len(pokemons) > self.parent.config.min_similar_pokemon:
-                pokemons = sorted(pokemons, key=lambda x: (x.cp, x.iv), reverse=True)
-                for pokemon in pokemons[self.parent.config.min_similar_pokemon:]:
+        self.parent.inventory.sync(pokemon=True)
+        pokemon_table = self.parent.inventory.get_pokemon_table()
+        batch = RequestBatch(self.parent)
+        # the score breaks ties, as it did for the score ordered lists
+        for rows in pokemon_table.by_species(('cp', 'iv', 'score')).values():
+            if len(rows) > self.parent.config.min_similar_pokemon:
+                # only the pokemon that are looked at are built
+                for row in rows[self.parent.config.min_similar_pokemon:]:
                     # If we can't evolve this type of pokemon anymore, don't check others.
-                    if not self.attempt_evolve_pokemon(pokemon):
+                    if not self.attempt_evolve_pokemon(pokemon_table.get(row), batch):
                         break
             elif self.parent.config.explain_evolution_before_cleanup:
                 self.log.info(
                     'Not evolving %s because you have %s but need more than %s.',
-                    pokemons[0].pokemon_type, len(pokemons), self.parent.config.min_similar_pokemon
+                    pokemon_table.get(rows[0]).pokemon_type, len(rows), self.parent.config.min_similar_pokemon
                 )
+        batch.flush()
 
-    def attempt_evolve_pokemon(self, pokemon):
+    def attempt_evolve_pokemon(self, pokemon, batch):
+        """ queues the evolution, the candy it costs is taken right away so the next check of the family sees it """
         if self.is_pokemon_eligible_for_evolution(pokemon=pokemon):
             self.log.info("Evolving pokemon: %s", pokemon)
-            self.parent.sleep(0.2 + self.parent.config.extra_wait)
-            evo_res = self.parent.api.evolve_pokemon(pokemon_id=pokemon.id).get('responses', {}).get('EVOLVE_POKEMON', {})
-            status = evo_res.get('result', -1)
-            # self.sleep(3)
-            if status == 1:
-                evolved_pokemon = Pokemon(evo_res.get('evolved_pokemon_data', {}),
-                                          self.parent.player_stats.level, self.parent.config.score_method,
-                                          self.parent.config.score_settings)
-                # I don' think we need additional stats for evolved pokemon. Since we do not do anything with it.
-                # evolved_pokemon.pokemon_additional_data = self.game_master.get(pokemon.pokemon_id, PokemonData())
-                self.log.info("Evolved to %s", evolved_pokemon)
-                self.parent.inventory.update_player_inventory()
-                return True
-            else:
-                self.log.debug("Could not evolve Pokemon %s", evo_res)
-                self.log.info("Could not evolve pokemon %s | Status %s", pokemon, status)
-                self.parent.inventory.update_player_inventory()
-                return False
+            self.parent.inventory.pokemon_candy[int(pokemon.family_id)] -= self.parent.config.pokemon_evolution[pokemon.pokemon_id]
+            batch.add('evolve_pokemon', partial(self._evolved, pokemon), pokemon_id=pokemon.id)
+            return True
         else:
             return False
 
+    def _evolved(self, pokemon, evo_res):
+        status = evo_res.get('result', -1)
+        if status == 1:
+            evolved_pokemon = Pokemon(evo_res.get('evolved_pokemon_data', {}),
+                                      self.parent.player_stats.level, self.parent.config.score_method,
+                                      self.parent.config.score_settings)
+            # I don' think we need additional stats for evolved pokemon. Since we do not do anything with it.
+            # evolved_pokemon.pokemon_additional_data = self.game_master.get(pokemon.pokemon_id, PokemonData())
+            self.log.info("Evolved to %s", evolved_pokemon)
+            self.parent.inventory.remove_pokemon(pokemon.id)
+            self.parent.inventory.add_pokemon(evo_res.get('evolved_pokemon_data', {}))
+            self.parent.inventory.pokemon_candy[int(pokemon.family_id)] += evo_res.get('candy_awarded', 0)
+        else:
+            # the candy was taken when the evolution was queued
+            self.parent.inventory.mark_diverged()
+            self.log.debug("Could not evolve Pokemon %s", evo_res)
+            self.log.info("Could not evolve pokemon %s | Status %s", pokemon, status)
+
     def is_pokemon_eligible_for_evolution(self, pokemon):
         candy_have = self.parent.inventory.pokemon_candy.get(int(pokemon.family_id), -1)
         candy_needed = self.parent.config.pokemon_evolution.get(pokemon.pokemon_id, None)
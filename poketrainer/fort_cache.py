@@ -0,0 +1,124 @@
+from __future__ import absolute_import
+
+import json
+import logging
+import os
+import pickle
+from collections import OrderedDict
+
+# all the walker needs to route to a cached fort
+FORT_FIELDS = ('id', 'latitude', 'longitude')
+
+_replace = getattr(os, 'replace', os.rename)
+
+logger = logging.getLogger(__name__)
+
+
+class FortCacheStore(object):
+    """
+    Forts cached for routing, one JSON line per fort.
+
+    New forts are appended to the file, only compaction (e.g. to store a sorted order) rewrites
+    it, into a temporary file which then atomically replaces the old one. A read-only store
+    never writes, so accounts farming the same area can share one file.
+    """
+
+    def __init__(self, filename, read_only=False, compact_garbage=100):
+        self.filename = filename
+        self.read_only = read_only
+        self.compact_garbage = compact_garbage
+        self._forts = OrderedDict()
+        self._lines = 0
+
+    def load(self):
+        """ streams the file into the index, later lines for the same fort win """
+        self._forts.clear()
+        self._lines = 0
+        if not os.path.exists(self.filename):
+            return self
+        with open(self.filename, 'r') as handle:
+            for line in handle:
+                try:
+                    fort = json.loads(line)
+                except ValueError:
+                    # a partially written last line of a crashed process
+                    logger.debug("Skipping malformed fort cache line: %r", line)
+                    continue
+                self._lines += 1
+                self._forts[fort['id']] = fort
+        if self._lines - len(self._forts) > self.compact_garbage:
+            self.compact()
+        return self
+
+    def import_pickle(self, filename):
+        """ loads a cache written by older versions, a pickled list of (fort, distance) tuples """
+        with open(filename, 'rb') as handle:
+            forts = pickle.load(handle)
+        return self.add(fort for fort, _ in forts)
+
+    def add(self, forts):
+        """ appends the forts not cached yet, returns how many were new """
+        new_forts = []
+        for fort in forts:
+            if fort['id'] not in self._forts:
+                fort = dict((field, fort[field]) for field in FORT_FIELDS)
+                self._forts[fort['id']] = fort
+                new_forts.append(fort)
+        if new_forts and not self.read_only:
+            self._make_directory()
+            # opened per write, so appends end up in the current file after another process compacted it
+            with open(self.filename, 'ab+') as handle:
+                lines = ''.join(self._dumps(fort) for fort in new_forts)
+                if not self._ends_with_newline(handle):
+                    # terminate the partially written line load() skipped, or the first fort is lost too
+                    lines = '\n' + lines
+                handle.write(lines.encode('utf-8'))
+            self._lines += len(new_forts)
+        return len(new_forts)
+
+    def compact(self, order=None):
+        """ rewrites the file with one line per fort, in the given order of fort ids if any """
+        if order is not None:
+            forts = OrderedDict((fort_id, self._forts[fort_id]) for fort_id in order if fort_id in self._forts)
+            forts.update(self._forts)
+            self._forts = forts
+        if self.read_only:
+            return
+        self._make_directory()
+        temp_filename = '%s.%s.tmp' % (self.filename, os.getpid())
+        with open(temp_filename, 'w') as handle:
+            for fort in self._forts.values():
+                handle.write(self._dumps(fort))
+            handle.flush()
+            os.fsync(handle.fileno())
+        _replace(temp_filename, self.filename)
+        self._lines = len(self._forts)
+
+    def forts(self):
+        return list(self._forts.values())
+
+    def get(self, fort_id):
+        return self._forts.get(fort_id)
+
+    def __contains__(self, fort_id):
+        return fort_id in self._forts
+
+    def __len__(self):
+        return len(self._forts)
+
+    def _make_directory(self):
+        directory = os.path.dirname(self.filename)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+    @staticmethod
+    def _ends_with_newline(handle):
+        handle.seek(0, os.SEEK_END)
+        if not handle.tell():
+            return True
+        handle.seek(-1, os.SEEK_END)
+        return handle.read(1) == b'\n'
+
+    @staticmethod
+    def _dumps(fort):
+        return json.dumps(fort, sort_keys=True, separators=(',', ':')) + '\n'
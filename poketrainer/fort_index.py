@@ -0,0 +1,185 @@
+from __future__ import absolute_import
+
+import math
+from collections import defaultdict
+from time import time
+
+import numpy as np
+import s2sphere
+from cachetools import TTLCache
+
+from . import geo
+
+# forts are bucketed by level 13 cells (~1.3km), a query touches a handful of buckets
+BUCKET_LEVEL = 13
+
+FORT_TYPE_POKESTOP = 1
+
+
+class FortIndex(object):
+    """
+    Every fort seen in map responses, bucketed by S2 cell for radius and nearest queries.
+
+    Forts stay known after walking out of the polled cells, so routes can be planned across
+    them. Visited forts and spin cooldowns are kept alongside.
+    """
+
+    def __init__(self, visited_ttl=600, visited_maxsize=120, level=BUCKET_LEVEL, distance_mode=geo.HAVERSINE):
+        self.level = level
+        self.distance_mode = distance_mode
+        self.visited = TTLCache(maxsize=visited_maxsize, ttl=visited_ttl)
+        self._forts = {}
+        self._cooldowns = {}
+        self._fort_buckets = {}
+        self._buckets = defaultdict(set)
+        self._map_cells = {}
+        self._centers = {}
+        # every point of a cell is within half its diagonal of the center
+        self._cell_radius = s2sphere.MAX_DIAG.get_value(level) * geo.EARTH_RADIUS / 2
+        self._cell_area = s2sphere.AVG_AREA.get_value(level) * geo.EARTH_RADIUS ** 2
+
+    def update(self, map_cells):
+        """ merges the cells of a GET_MAP_OBJECTS response, a polled cell replaces what was known about it """
+        for cell in map_cells:
+            fort_ids = set()
+            for fort in cell.get('forts', []):
+                self.add(fort)
+                fort_ids.add(fort['id'])
+            cell_id = cell.get('s2_cell_id')
+            for fort_id in self._map_cells.get(cell_id, set()) - fort_ids:
+                self.remove(fort_id)
+            for fort_id in cell.get('deleted_objects', []):
+                self.remove(fort_id)
+            self._map_cells[cell_id] = fort_ids
+
+    def add(self, fort):
+        fort_id = fort['id']
+        known = self._forts.get(fort_id)
+        self._forts[fort_id] = fort
+        self._cooldowns[fort_id] = fort.get('cooldown_complete_timestamp_ms', -1)
+        if known is not None and (known['latitude'], known['longitude']) == (fort['latitude'], fort['longitude']):
+            return
+        bucket = self._bucket(fort['latitude'], fort['longitude'])
+        previous = self._fort_buckets.get(fort_id)
+        if previous != bucket:
+            if previous is not None:
+                self._buckets[previous].discard(fort_id)
+            self._buckets[bucket].add(fort_id)
+            self._fort_buckets[fort_id] = bucket
+
+    def remove(self, fort_id):
+        self._forts.pop(fort_id, None)
+        self._cooldowns.pop(fort_id, None)
+        bucket = self._fort_buckets.pop(fort_id, None)
+        if bucket is not None:
+            self._buckets[bucket].discard(fort_id)
+            if not self._buckets[bucket]:
+                del self._buckets[bucket]
+
+    def get(self, fort_id):
+        return self._forts.get(fort_id)
+
+    def mark_visited(self, fort):
+        self.visited[fort['id']] = fort
+
+    def set_cooldown(self, fort_id, cooldown_complete_timestamp_ms):
+        if fort_id in self._forts:
+            self._cooldowns[fort_id] = cooldown_complete_timestamp_ms
+
+    def is_spinnable(self, fort_id, now_ms=None):
+        fort = self._forts.get(fort_id)
+        return fort is not None and fort.get('type', None) == FORT_TYPE_POKESTOP and \
+            ('enabled' in fort or 'lure_info' in fort) and \
+            self._cooldowns.get(fort_id, -1) < (now_ms or time() * 1000) and fort_id not in self.visited
+
+    def within(self, center, radius=None, spinnable=False, now_ms=None):
+        """ (fort, distance) pairs within radius meters of center (every known fort without radius), nearest first """
+        fort_ids = self._candidates(center, radius)
+        if spinnable:
+            now_ms = now_ms or time() * 1000
+            fort_ids = [fort_id for fort_id in fort_ids if self.is_spinnable(fort_id, now_ms)]
+        forts, distances = self._distances(center, fort_ids)
+        if radius is not None:
+            keep = distances <= radius
+            forts, distances = [fort for fort, k in zip(forts, keep) if k], distances[keep]
+        order = np.argsort(distances, kind='mergesort')
+        return [(forts[i], float(distances[i])) for i in order]
+
+    def nearest(self, center, k=1, spinnable=False, now_ms=None):
+        """ the k (fort, distance) pairs nearest to center """
+        radius = self._cell_radius
+        while True:
+            forts = self.within(center, radius, spinnable=spinnable, now_ms=now_ms)
+            # every fort outside the radius is further away than the ones found
+            if len(forts) >= k or len(self._candidate_buckets(center, radius)) == len(self._buckets):
+                return forts[:k]
+            radius *= 2
+
+    def spinnable(self, position, origin=None, proximity=0, now_ms=None):
+        """
+        spinnable pokestops sorted by their distance from position, limited to proximity meters
+        around origin if a proximity is set
+        """
+        if proximity and proximity > 0 and origin is not None:
+            in_proximity = self.within(origin, proximity, spinnable=True, now_ms=now_ms)
+            forts, distances = self._distances(position, [fort['id'] for fort, _ in in_proximity])
+            order = np.argsort(distances, kind='mergesort')
+            return [(forts[i], float(distances[i])) for i in order]
+        return self.within(position, spinnable=True, now_ms=now_ms)
+
+    def clear(self):
+        self._forts.clear()
+        self._cooldowns.clear()
+        self._fort_buckets.clear()
+        self._buckets.clear()
+        self._map_cells.clear()
+
+    def __len__(self):
+        return len(self._forts)
+
+    def __contains__(self, fort_id):
+        return fort_id in self._forts
+
+    def _bucket(self, lat, lng):
+        return s2sphere.CellId.from_lat_lng(s2sphere.LatLng.from_degrees(lat, lng)).parent(self.level).id()
+
+    def _center(self, bucket):
+        center = self._centers.get(bucket)
+        if center is None:
+            lat_lng = s2sphere.CellId(bucket).to_lat_lng()
+            center = self._centers[bucket] = (lat_lng.lat().degrees, lat_lng.lng().degrees)
+        return center
+
+    def _candidates(self, center, radius):
+        if radius is None:
+            return list(self._forts)
+        return [fort_id for bucket in self._candidate_buckets(center, radius) for fort_id in self._buckets[bucket]]
+
+    def _candidate_buckets(self, center, radius):
+        reach = radius + self._cell_radius
+        if math.pi * reach ** 2 / self._cell_area > len(self._buckets):
+            # the area spans more cells than there are buckets, check the buckets instead
+            buckets = list(self._buckets)
+            distances = geo.distances_from(center, [self._center(bucket) for bucket in buckets], self.distance_mode)
+            return [bucket for bucket, d in zip(buckets, distances) if d <= reach]
+
+        # walk the cells around center until they are out of reach
+        start = s2sphere.CellId.from_lat_lng(s2sphere.LatLng.from_degrees(center[0], center[1])).parent(self.level)
+        seen = set([start.id()])
+        queue = [start]
+        buckets = []
+        while queue:
+            cell = queue.pop()
+            if cell.id() in self._buckets:
+                buckets.append(cell.id())
+            for neighbor in cell.get_edge_neighbors():
+                if neighbor.id() not in seen:
+                    seen.add(neighbor.id())
+                    if geo.distance(center, self._center(neighbor.id()), self.distance_mode) <= reach:
+                        queue.append(neighbor)
+        return buckets
+
+    def _distances(self, center, fort_ids):
+        forts = [self._forts[fort_id] for fort_id in fort_ids]
+        distances = geo.distances_from(center, [(fort['latitude'], fort['longitude']) for fort in forts], self.distance_mode)
+        return forts, distances
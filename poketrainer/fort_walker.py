@@ -1,29 +1,29 @@
 from __future__ import absolute_import
 
-import copy
 import os
-import pickle
-import sys
 from collections import defaultdict
 
 import six
-from cachetools import TTLCache
 
 from helper.colorlogger import create_logger
 from helper.exceptions import TooManyEmptyResponses
-from helper.utilities import flat_map
 
-from .location import distance_in_meters, filtered_forts, get_route
+from .fort_cache import FortCacheStore
+from .location import distance_in_meters, get_fort_route, get_route
 from .poke_utils import get_item_name
+from .route_planner import plan_route
 
 if six.PY3:
     from past.builtins import map
 
+# time spent improving the order of cached or all known forts, and how many of the nearest ones are planned
+ROUTE_PLANNING_SECONDS = 0.2
+ROUTE_PLANNING_MAX_FORTS = 100
+
 
 class FortWalker(object):
     def __init__(self, parent):
         self.parent = parent
-        self.visited_forts = TTLCache(maxsize=120, ttl=self.parent.config.skip_visited_fort_duration)
         self.route = {'steps': [], 'total_distance': 0}  # route should contain the complete path we're planning to go
         self.route_only_forts = False
         self.steps = []  # steps contain all steps to the next route target
@@ -34,6 +34,7 @@ class FortWalker(object):
         self.base_travel_link = ''
         self._error_counter = 0
         self._error_threshold = 10
+        self.fort_cache = None
         self.all_cached_forts = []
         self.spinnable_cached_forts = []
         self.cache_is_sorted = self.parent.config.cache_is_sorted
@@ -90,7 +91,7 @@ class FortWalker(object):
                             self.parent.get_position(), (next_loc['lat'], next_loc['long']),
                             self.parent.config.use_google, self.parent.config.gmaps_api_key,
                             self.parent.config.experimental and self.parent.config.spin_all_forts,
-                            step_size=self.parent.step_size
+                            step_size=self.parent.step_size, distance_mode=self.parent.config.distance_mode
                         )
                         posf = self.parent.get_position()
                         self.base_travel_link = "https://www.google.com/maps/dir/%s,%s/" % (posf[0], posf[1])
@@ -125,12 +126,10 @@ class FortWalker(object):
         if not destinations:
             res = self.parent.map_objects.nearby_map_objects()
             self.log.debug("nearby_map_objects: %s", res)
-            map_cells = res.get('responses', {}).get('GET_MAP_OBJECTS', {}).get('map_cells', [])
-            forts = flat_map(lambda c: c.get('forts', []), map_cells)
-            # filter forts and sort by distance
-            destinations = filtered_forts(self.parent.get_orig_position(), self.parent.get_position(), forts,
-                                          self.parent.config.stay_within_proximity,
-                                          self.visited_forts)
+            # spinnable forts sorted by distance, including known forts outside of the polled cells
+            destinations = self.parent.map_objects.forts.spinnable(self.parent.get_position(),
+                                                                   self.parent.get_orig_position(),
+                                                                   self.parent.config.stay_within_proximity)
             if not destinations:
                 self.log.debug("No fort to walk to! %s", res)
                 self.log.info('No more spinnable forts within proximity. Or server error')
@@ -146,9 +145,17 @@ class FortWalker(object):
         self.base_travel_link = "https://www.google.com/maps/dir/%s,%s/" % (posf[0], posf[1])
         self.total_distance_traveled = 0
 
-        # honestly it makes no sense to use spin_all_forts without google, but i'm leaving it that way
         # wander_steps should only be used if we're not using google i guess
-        if experimental and spin_all_forts:
+        if experimental and spin_all_forts and not (use_google and self.parent.config.route_planner == 'google'):
+            # order the nearest forts locally, they are within the proximity already
+            self.route = get_fort_route(
+                self.parent.get_position(),
+                [(fort_data[0]['latitude'], fort_data[0]['longitude']) for fort_data in destinations[:ROUTE_PLANNING_MAX_FORTS]],
+                step_size=self.parent.step_size, time_budget=ROUTE_PLANNING_SECONDS,
+                distance_mode=self.parent.config.distance_mode
+            )
+            self.route_only_forts = False
+        elif experimental and spin_all_forts:
             if len(destinations) >= 20:
                 destinations = destinations[:20]
             furthest_fort = destinations[0][0]
@@ -158,7 +165,7 @@ class FortWalker(object):
                 use_google, self.parent.config.gmaps_api_key,
                 experimental and spin_all_forts,
                 map(lambda x: "via:%f,%f" % (x[0]['latitude'], x[0]['longitude']), destinations[1:]),
-                step_size=self.parent.step_size
+                step_size=self.parent.step_size, distance_mode=self.parent.config.distance_mode
             )
             self.route = route_data
             self.route_only_forts = False
@@ -176,7 +183,7 @@ class FortWalker(object):
 
     def _walk(self, next_point):
         next_point = (next_point['lat'], next_point['long'], 0)
-        distance_to_point = distance_in_meters(self.parent.get_position(), next_point)
+        distance_to_point = distance_in_meters(self.parent.get_position(), next_point, self.parent.config.distance_mode)
         self.total_distance_traveled += distance_to_point
         if self.parent.config.show_steps:
             travel_link = ''
@@ -198,12 +205,10 @@ class FortWalker(object):
         self.route_only_forts = True
 
     def spin_nearest_fort(self):
-        map_cells = self.parent.map_objects.nearby_map_objects().get('responses', {}).get('GET_MAP_OBJECTS', {})\
-            .get('map_cells', [])
-        forts = flat_map(lambda c: c.get('forts', []), map_cells)
-        destinations = filtered_forts(self.parent.get_orig_position(), self.parent.get_position(), forts,
-                                      self.parent.config.stay_within_proximity,
-                                      self.visited_forts)
+        self.parent.map_objects.nearby_map_objects()
+        destinations = self.parent.map_objects.forts.spinnable(self.parent.get_position(),
+                                                               self.parent.get_orig_position(),
+                                                               self.parent.config.stay_within_proximity)
         if destinations:
             nearest_fort = destinations[0][0]
             nearest_fort_dis = destinations[0][1]
@@ -216,7 +221,7 @@ class FortWalker(object):
                 route_data = get_route(
                     self.parent.get_position(), (destinations[0][0]['latitude'], destinations[0][0]['longitude']),
                     use_google=False, gmaps_api_key='', walk_to_all_forts=False, waypoints=None,
-                    step_size=self.parent.step_size
+                    step_size=self.parent.step_size, distance_mode=self.parent.config.distance_mode
                 )
                 self.wander_steps = route_data['steps']
             elif nearest_fort_dis <= 40.00:
@@ -233,7 +238,6 @@ class FortWalker(object):
             self._walk_back_to_origin()
 
     def do_fort_spin(self, fort, player_postion, fort_distance):
-        self.parent.sleep(0.2 + self.parent.config.extra_wait)
         res = self.parent.api.fort_search(fort_id=fort['id'], fort_latitude=fort['latitude'],
                                           fort_longitude=fort['longitude'],
                                           player_latitude=player_postion[0],
@@ -241,13 +245,16 @@ class FortWalker(object):
         result = -1
         if res:
             res = res.get('responses', {}).get('FORT_SEARCH', {})
-            result = res.pop('result', -1)
+            result = res.get('result', -1)
+            if 'cooldown_complete_timestamp_ms' in res:
+                self.parent.map_objects.forts.set_cooldown(fort['id'], res['cooldown_complete_timestamp_ms'])
         if result == 1:
             self.log.info("Visiting fort... (http://maps.google.com/maps?q=%s,%s)", fort['latitude'], fort['longitude'])
             if "items_awarded" in res:
                 items = defaultdict(int)
                 for item in res['items_awarded']:
                     items[item['item_id']] += item['item_count']
+                    self.parent.inventory.add_items(item['item_id'], item['item_count'])
                 reward = 'XP +' + str(res['experience_awarded'])
                 for item_id, amount in six.iteritems(items):
                     reward += ', ' + str(amount) + 'x ' + get_item_name(item_id)
@@ -255,11 +262,12 @@ class FortWalker(object):
                               reward)
             else:
                 self.log.warning("Fort spun, but did not yield any rewards. Possible soft ban?")
-            self.visited_forts[fort['id']] = fort
+            self.parent.map_objects.forts.mark_visited(fort)
         elif result == 4:
             self.log.debug("Fort spun but Your inventory is full : %s", res)
             self.log.info("Fort spun but Your inventory is full.")
-            self.visited_forts[fort['id']] = fort
+            self.parent.inventory.mark_diverged(pokemon=False)
+            self.parent.map_objects.forts.mark_visited(fort)
         elif result == 2:
             self.log.debug("Could not spin fort -  fort not in range %s", res)
             self.log.info("Could not spin fort http://maps.google.com/maps?q=%s,%s, Not in Range %s", fort['latitude'],
@@ -277,91 +285,45 @@ class FortWalker(object):
         return True
 
     def setup_cache(self):
-        try:
-            self.log.debug("Opening cache file...")
-            with open(self.parent.config.cache_filename, 'rb') as handle:
-                self.all_cached_forts = pickle.load(handle)
-
-        except Exception as e:
-            self.log.debug("Could not find or open cache, making new cache... %s", e)
-            if not os.path.exists('./cache'):
-                os.makedirs('./cache')
+        self.log.debug("Opening cache file...")
+        filename = self.parent.config.cache_filename
+        self.fort_cache = FortCacheStore(filename + '.jsonl', read_only=self.parent.config.cache_read_only).load()
+        if not len(self.fort_cache) and os.path.exists(filename):
+            # pickled cache of older versions
             try:
-                os.remove(self.parent.config.cache_filename)
-            except OSError:
-                pass
-            with open(self.parent.config.cache_filename, 'wb') as handle:
-                pickle.dump(self.all_cached_forts, handle)
+                self.log.info("Imported %s forts from the old cache file", self.fort_cache.import_pickle(filename))
+            except Exception as e:
+                self.log.debug("Could not import the old cache file... %s", e)
+        self.all_cached_forts = [(fort, 0.0) for fort in self.fort_cache.forts()]
 
     def _cache_forts(self, forts):
-        if not self.all_cached_forts:
-            with open(self.parent.config.cache_filename, 'wb') as handle:
-                pickle.dump(forts, handle)
-
-            with open(self.parent.config.cache_filename, 'rb') as handle:
-                self.all_cached_forts = pickle.load(handle)
-
-            self.log.info("Cache was empty... Dumping in new forts and initializing all_cached_forts")
-
-        else:
-            for fort in forts:
-                if not any(fort[0]['id'] == x[0]['id'] for x in self.all_cached_forts):
-                    self.all_cached_forts.insert(0, fort)
-                    self.log.info("Added new fort to cache")
-
-            with open(self.parent.config.cache_filename, 'wb') as handle:
-                pickle.dump(self.all_cached_forts, handle)
-
+        added = self.fort_cache.add(fort for fort, _ in forts)
+        if added:
+            self.log.info("Added %s new forts to cache", added)
+            self.all_cached_forts = [(fort, 0.0) for fort in self.fort_cache.forts()]
         self.log.info("Cached forts %s: ", len(self.all_cached_forts))
 
     def _sort_cached_forts(self):
         if len(self.all_cached_forts) > 0:
             if not self.cache_is_sorted:
                 self.log.info("Cache is unsorted, sorting now...")
-                temp_all_cached = copy.deepcopy(self.all_cached_forts)  # copy over original
-                temp_sorted = [copy.deepcopy(temp_all_cached[0])]  # the final list to copy to cache
-                temp_element = copy.deepcopy(temp_all_cached[0])  # cur element
-                temp_bool = True
-
-                while (len(temp_sorted) < len(self.all_cached_forts)):  # sort all elements
-                    temp_last_element = copy.deepcopy(temp_sorted[-1])
-                    temp_element = copy.deepcopy(temp_sorted[0])
-                    temp_max_float = sys.float_info.max  # start with max float to find min distance
-
-                    if (temp_bool):
-                        for fort in temp_all_cached:
-                            orig_posf = self.parent.get_orig_position()
-                            if distance_in_meters((orig_posf[0], orig_posf[1]),
-                                                  (fort[0]['latitude'], fort[0]['longitude'])) <= temp_max_float:
-                                temp_element = copy.deepcopy(fort)
-                                temp_max_float = distance_in_meters((orig_posf[0], orig_posf[1]),
-                                                                    (fort[0]['latitude'], fort[0]['longitude']))
-
-                        temp_sorted.pop(0)
-                        temp_sorted.append(temp_element)
-                        temp_all_cached.remove(temp_element)
-                        temp_bool = False
-                    else:
-                        for fort in temp_all_cached:
-                            if ((distance_in_meters((temp_last_element[0]['latitude'], temp_last_element[0]['longitude']),
-                                                    (fort[0]['latitude'], fort[0]['longitude'])) <= temp_max_float) and
-                                    (not any(fort[0]['id'] == x[0]['id'] for x in temp_sorted))):
-                                temp_element = copy.deepcopy(fort)
-                                temp_max_float = distance_in_meters(
-                                    (temp_last_element[0]['latitude'], temp_last_element[0]['longitude']),
-                                    (fort[0]['latitude'], fort[0]['longitude']))
-                        temp_all_cached.remove(temp_element)
-                        temp_sorted.append(temp_element)
-
-                self.spinnable_cached_forts = copy.deepcopy(temp_sorted)
+                points = [(fort[0]['latitude'], fort[0]['longitude']) for fort in self.all_cached_forts]
+                order, length = plan_route(points, start=self.parent.get_orig_position(),
+                                           time_budget=ROUTE_PLANNING_SECONDS,
+                                           distance_mode=self.parent.config.distance_mode,
+                                           max_points=ROUTE_PLANNING_MAX_FORTS)
+                self.log.info("Planned a %.0f meter loop through %s of %s cached forts", length,
+                              min(len(order), ROUTE_PLANNING_MAX_FORTS), len(order))
+                self.spinnable_cached_forts = [self.all_cached_forts[i] for i in order]
                 self.cache_is_sorted = True
-
-                with open(self.parent.config.cache_filename, 'wb') as handle:
-                    pickle.dump(self.spinnable_cached_forts, handle)
+                self.fort_cache.compact(order=[fort[0]['id'] for fort in self.spinnable_cached_forts])
 
             if not self.spinnable_cached_forts:
-                self.spinnable_cached_forts = copy.deepcopy(self.all_cached_forts)
-            return self.spinnable_cached_forts
+                self.spinnable_cached_forts = list(self.all_cached_forts)
+            # forts spun less than skip_visited_fort_duration ago are left out of this lap
+            visited = self.parent.map_objects.forts.visited
+            spinnable = [fort for fort in self.spinnable_cached_forts if fort[0]['id'] not in visited]
+            return spinnable or self.spinnable_cached_forts
         else:
             self.log.info("Cache is empty! Switching mode to cache forts")
             return False
@@ -0,0 +1,112 @@
+from __future__ import absolute_import
+
+import math
+
+import numpy as np
+from geopy.distance import vincenty
+
+HAVERSINE = 'haversine'
+VINCENTY = 'vincenty'
+DISTANCE_MODES = (HAVERSINE, VINCENTY)
+
+# mean earth radius, haversine stays within ~0.5% of the WGS84 geodesic
+EARTH_RADIUS = 6371008.8
+
+# WGS84 ellipsoid, for vincenty
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = (1 - WGS84_F) * WGS84_A
+
+
+def check_distance_mode(mode):
+    if mode not in DISTANCE_MODES:
+        raise ValueError("Unknown distance mode %s, use one of %s" % (mode, ", ".join(DISTANCE_MODES)))
+    return mode
+
+
+def distance(p1, p2, mode=HAVERSINE):
+    """ distance between two (lat, lng[, alt]) points in meters """
+    if mode == VINCENTY:
+        return vincenty(p1[:2], p2[:2]).meters
+    lat1, lng1, lat2, lng2 = map(math.radians, (p1[0], p1[1], p2[0], p2[1]))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def distances_from(origin, points, mode=HAVERSINE):
+    """ distances in meters from one origin to every (lat, lng) in points, as a numpy array """
+    lats, lngs = _split(points)
+    if not len(lats):
+        return np.zeros(0)
+    return _distances(np.float64(origin[0]), np.float64(origin[1]), lats, lngs, mode)
+
+
+def distance_matrix(points, mode=HAVERSINE, dtype=np.float64, chunk_size=512):
+    """
+    N x N distances in meters between all (lat, lng) points.
+
+    Rows are computed in chunks of chunk_size to bound the temporaries, use a float32
+    dtype to halve the memory of big matrices.
+    """
+    lats, lngs = _split(points)
+    matrix = np.empty((len(lats), len(lats)), dtype=dtype)
+    for start in range(0, len(lats), chunk_size):
+        end = min(start + chunk_size, len(lats))
+        matrix[start:end] = _distances(lats[start:end, None], lngs[start:end, None], lats[None, :], lngs[None, :], mode)
+    return matrix
+
+
+def _split(points):
+    points = np.asarray(points, dtype=np.float64)
+    if not points.size:
+        return np.zeros(0), np.zeros(0)
+    return points[:, 0], points[:, 1]
+
+
+def _distances(lat1, lng1, lat2, lng2, mode):
+    if mode == VINCENTY:
+        return _vincenty(lat1, lng1, lat2, lng2)
+    return _haversine(lat1, lng1, lat2, lng2)
+
+
+def _haversine(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = np.radians(lat1), np.radians(lng1), np.radians(lat2), np.radians(lng2)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def _vincenty(lat1, lng1, lat2, lng2, iterations=200, tolerance=1e-12):
+    # vincenty's inverse formula, iterated for all pairs at once; pairs which do not converge
+    # (nearly antipodal points) fall back to haversine
+    u1 = np.arctan((1 - WGS84_F) * np.tan(np.radians(lat1)))
+    u2 = np.arctan((1 - WGS84_F) * np.tan(np.radians(lat2)))
+    sin_u1, cos_u1 = np.sin(u1), np.cos(u1)
+    sin_u2, cos_u2 = np.sin(u2), np.cos(u2)
+    big_l = np.radians(lng2 - lng1)
+
+    lam = big_l
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for _ in range(iterations):
+            sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+            sin_sigma = np.sqrt((cos_u2 * sin_lam) ** 2 + (cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam) ** 2)
+            cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+            sigma = np.arctan2(sin_sigma, cos_sigma)
+            sin_alpha = np.where(sin_sigma == 0, 0.0, cos_u1 * cos_u2 * sin_lam / sin_sigma)
+            cos2_alpha = 1 - sin_alpha ** 2
+            cos_2sigma_m = np.where(cos2_alpha == 0, 0.0, cos_sigma - 2 * sin_u1 * sin_u2 / cos2_alpha)
+            c = WGS84_F / 16 * cos2_alpha * (4 + WGS84_F * (4 - 3 * cos2_alpha))
+            previous, lam = lam, big_l + (1 - c) * WGS84_F * sin_alpha * (
+                sigma + c * sin_sigma * (cos_2sigma_m + c * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)))
+            converged = np.abs(lam - previous) < tolerance
+            if np.all(converged):
+                break
+
+        u_sq = cos2_alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+        a = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+        b = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+        delta_sigma = b * sin_sigma * (cos_2sigma_m + b / 4 * (
+            cos_sigma * (-1 + 2 * cos_2sigma_m ** 2) -
+            b / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2sigma_m ** 2)))
+        meters = WGS84_B * a * (sigma - delta_sigma)
+
+    return np.where(converged, meters, _haversine(lat1, lng1, lat2, lng2))
@@ -1,8 +1,10 @@
 from __future__ import absolute_import
 
+from functools import partial
+
 from helper.colorlogger import create_logger
 
-from .poke_utils import get_pokemon_by_long_id
+from .batch import RequestBatch
 
 
 class Incubate(object):
@@ -13,6 +15,8 @@ class Incubate(object):
     def incubate_eggs(self):
         if not self.parent.config.egg_incubation_enabled:
             return
+        batch = RequestBatch(self.parent)
+        hatching = False
         if self.parent.player_stats.km_walked > 0:
             for incubator in self.parent.inventory.incubators_busy:
                 incubator_start_km_walked = incubator.get('start_km_walked', self.parent.player_stats.km_walked)
@@ -20,7 +24,7 @@ class Incubate(object):
                 incubator_egg_distance = incubator['target_km_walked'] - incubator_start_km_walked
                 incubator_distance_done = self.parent.player_stats.km_walked - incubator_start_km_walked
                 if incubator_distance_done > incubator_egg_distance:
-                    self.attempt_finish_incubation()
+                    hatching = True
                     break
             for incubator in self.parent.inventory.incubators_busy:
                 incubator_start_km_walked = incubator.get('start_km_walked', self.parent.player_stats.km_walked)
@@ -29,6 +33,11 @@ class Incubate(object):
                 incubator_distance_done = self.parent.player_stats.km_walked - incubator_start_km_walked
                 self.log.info('Incubating %skm egg, %skm done', incubator_egg_distance,
                               round(incubator_distance_done, 2))
+        eggs_available = self.parent.inventory.eggs_available
+        eggs_available = sorted(eggs_available, key=lambda egg: egg['creation_time_ms'],
+                                reverse=False)  # oldest first
+        eggs_available = sorted(eggs_available, key=lambda egg: egg['egg_km_walked_target'],
+                                reverse=self.parent.config.incubate_big_eggs_first)  # now sort as defined
         for incubator in self.parent.inventory.incubators_available:
             if incubator['item_id'] == 901:  # unlimited use
                 pass
@@ -36,48 +45,44 @@ class Incubate(object):
                 pass
             else:
                 continue
-            eggs_available = self.parent.inventory.eggs_available
-            eggs_available = sorted(eggs_available, key=lambda egg: egg['creation_time_ms'],
-                                    reverse=False)  # oldest first
-            eggs_available = sorted(eggs_available, key=lambda egg: egg['egg_km_walked_target'],
-                                    reverse=self.parent.config.incubate_big_eggs_first)  # now sort as defined
-            if not len(eggs_available) > 0 or not self.attempt_start_incubation(eggs_available[0], incubator):
+            if not len(eggs_available) > 0:
                 break
+            # every incubator gets another egg, the inventory only changes when the batch is sent
+            self.attempt_start_incubation(eggs_available.pop(0), incubator, batch)
+        if hatching:
+            # queued last, so it is sent along with the inventory refresh which has the hatched pokemon
+            self.attempt_finish_incubation(batch)
+        batch.flush(refresh_inventory=hatching)
 
-    def attempt_start_incubation(self, egg, incubator):
+    def attempt_start_incubation(self, egg, incubator, batch):
         self.log.info("Start incubating %skm egg", egg['egg_km_walked_target'])
-        self.parent.sleep(0.2 + self.parent.config.extra_wait)
-        incubate_res = self.parent.api.use_item_egg_incubator(item_id=incubator['id'], pokemon_id=egg['id']) \
-            .get('responses', {}).get('USE_ITEM_EGG_INCUBATOR', {})
+        batch.add('use_item_egg_incubator', partial(self._incubation_started, egg, incubator),
+                  item_id=incubator['id'], pokemon_id=egg['id'])
+
+    def _incubation_started(self, egg, incubator, incubate_res):
         status = incubate_res.get('result', -1)
         if status == 1:
             self.log.info("Incubation started with %skm egg !", egg['egg_km_walked_target'])
-            self.parent.inventory.update_player_inventory()
-            return True
+            self.parent.inventory.start_incubation(egg, incubator)
         else:
+            self.parent.inventory.mark_diverged(pokemon=False)
             self.log.debug("Could not start incubating %s", incubate_res)
             self.log.info("Could not start incubating %s egg | Status %s", egg['egg_km_walked_target'], status)
-            self.parent.inventory.update_player_inventory()
-            return False
 
-    def attempt_finish_incubation(self):
+    def attempt_finish_incubation(self, batch):
         self.log.info("Checking for hatched eggs")
-        self.parent.sleep(0.2 + self.parent.config.extra_wait)
-        hatch_res = self.parent.api.get_hatched_eggs().get('responses', {}).get('GET_HATCHED_EGGS', {})
+        batch.add('get_hatched_eggs', self._eggs_hatched)
+
+    def _eggs_hatched(self, hatch_res):
         status = hatch_res.get('success', -1)
-        # self.sleep(3)
         if status == 1:
-            self.parent.inventory.update_player_inventory()
             for i, pokemon_id in enumerate(hatch_res['pokemon_id']):
-                pokemon = get_pokemon_by_long_id(pokemon_id, self.parent.inventory.inventory_items)
+                pokemon = self.parent.inventory.get_pokemon(pokemon_id)
                 self.log.info("Egg Hatched! XP +%s, Candy +%s, Stardust +%s, %s",
                               hatch_res['experience_awarded'][i],
                               hatch_res['candy_awarded'][i],
                               hatch_res['stardust_awarded'][i],
                               pokemon)
-            return True
         else:
             self.log.debug("Could not get hatched eggs %s", hatch_res)
             self.log.info("Could not get hatched eggs Status %s", status)
-            self.parent.inventory.update_player_inventory()
-            return False
@@ -1,23 +1,101 @@
 from __future__ import absolute_import
 
 import json
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from functools import partial
 from time import time
 
+from six import iteritems, itervalues
+
 from helper.colorlogger import create_logger
 from library.api.pgoapi.protos.POGOProtos.Inventory import \
     Item_pb2 as Item_Enums
 
-from .poke_utils import get_item_name
+from .batch import RequestBatch
+from .poke_utils import get_item_name, json_default
 from .pokemon import Pokemon
+from .pokemon_table import PokemonTable
+
+# the counters kept as attributes, for the items the bot uses itself
+ITEM_ATTRIBUTES = {
+    Item_Enums.ITEM_POTION: 'potion',
+    Item_Enums.ITEM_SUPER_POTION: 'super_potion',
+    Item_Enums.ITEM_MAX_POTION: 'max_potion',
+    Item_Enums.ITEM_HYPER_POTION: 'hyper_potion',
+    Item_Enums.ITEM_POKE_BALL: 'poke_balls',
+    Item_Enums.ITEM_GREAT_BALL: 'great_balls',
+    Item_Enums.ITEM_MASTER_BALL: 'master_balls',
+    Item_Enums.ITEM_ULTRA_BALL: 'ultra_balls',
+    Item_Enums.ITEM_LUCKY_EGG: 'lucky_eggs',
+    Item_Enums.ITEM_RAZZ_BERRY: 'razz_berries',
+}
+
+# the field identifying an entry of each kind of inventory item data, kinds without one exist once
+ITEM_KEY_FIELDS = {
+    'pokemon_data': 'id',
+    'item': 'item_id',
+    'pokedex_entry': 'pokemon_id',
+    'candy': 'family_id',
+}
+
+
+def item_key(inventory_item):
+    """ the key of an inventory item in the store, deleted items are pokemon """
+    if inventory_item.get('deleted_item_key'):
+        # an int64, the id of the deleted pokemon is an unsigned fixed64
+        return 'pokemon_data', inventory_item['deleted_item_key'] & 0xFFFFFFFFFFFFFFFF
+    for kind, data in inventory_item.get('inventory_item_data', {}).items():
+        field = ITEM_KEY_FIELDS.get(kind)
+        return kind, data.get(field) if field else None
+    return None
+
+
+def _pokemon_key(pokemon_data):
+    """ the fields a Pokemon is derived from and a delta may change """
+    return (pokemon_data.get('id'), pokemon_data.get('cp'), pokemon_data.get('cp_multiplier'),
+            pokemon_data.get('favorite'), pokemon_data.get('nickname'))
 
 
 class Inventory(object):
+    """
+    The player's items, pokemon, candy, eggs and incubators.
+
+    A full GET_INVENTORY is only needed now and then: the results of the bot's own actions
+    (catches, spins, recycling, releases, evolutions, incubations) are applied locally, and
+    sync() only fetches the inventory when the last one is older than INVENTORY_RESYNC_SECONDS,
+    the server has changes the bot can't apply itself, or a response showed the local state went
+    wrong, in which case the full inventory replaces it.
+
+    After the first full inventory only the changes since its new_timestamp_ms are requested
+    and merged into a store keyed by item_key, so an unchanged inventory costs next to nothing.
+    The store holds the items of each kind by their key (items by item id, pokemon by id,
+    candy by family), the eggs are indexed as well, and the inventory_items list is only
+    built for the callers that want all of them.
+    """
+
     def __init__(self, parent, inventory_items):
         self._parent = parent
-        self.inventory_items = inventory_items
+        self.last_timestamp_ms = 0
+        self._load(inventory_items)
         self._last_egg_use_time = 0
 
+        # local changes since the last full inventory
+        self.item_counts = {}
+        self._released_pokemon = set()
+        self._new_pokemon = OrderedDict()
+        self._items_stale = False
+        self._pokemon_stale = False
+        self._synced_at = 0
+
+        # changes whenever the pokemon might have, the Pokemon objects are only rebuilt then
+        self.version = 0
+        self._pokemon_cache = {}
+        self._pokemon_cache_settings = None
+        self._caught_pokemon = None
+        self._pokemon_table = None
+        self._caught_pokemon_by_family = None
+        self._sync_stats = {'full': 0, 'delta': 0, 'unchanged': 0, 'skipped': 0, 'items_received': 0}
+
         self._log = create_logger(__name__, self._parent.config.log_colors["inventory".upper()])
 
         self.ultra_balls = 0
@@ -36,65 +114,155 @@ class Inventory(object):
         self.use_masterball = self._parent.config.ball_priorities[3]
 
         self.pokemon_candy = defaultdict()
-        self.eggs_available = []
-        self.incubators_available = []
-        self.incubators_busy = []
+        self._eggs_available = OrderedDict()
+        self._incubators_available = OrderedDict()
+        self._incubators_busy = OrderedDict()
         self.setup_inventory()
 
+    def _load(self, inventory_items):
+        self._store = OrderedDict()
+        self._eggs = OrderedDict()
+        self._inventory_items = None
+        for inventory_item in inventory_items:
+            self._store_item(inventory_item)
+
+    def _store_item(self, inventory_item):
+        key = item_key(inventory_item)
+        if key is None:
+            return
+        kind, item_id = key
+        self._inventory_items = None
+        if inventory_item.get('deleted_item_key'):
+            self._stored(kind).pop(item_id, None)
+            self._eggs.pop(item_id, None)
+            return
+        self._store.setdefault(kind, OrderedDict())[item_id] = inventory_item
+        if kind == 'pokemon_data':
+            pokemon_data = inventory_item['inventory_item_data']['pokemon_data']
+            if pokemon_data.get('is_egg', False):
+                self._eggs[item_id] = pokemon_data
+            else:
+                self._eggs.pop(item_id, None)
+
+    def _stored(self, kind):
+        return self._store.get(kind, {})
+
+    @property
+    def inventory_items(self):
+        if self._inventory_items is None:
+            self._inventory_items = [inventory_item for items in itervalues(self._store) for inventory_item in itervalues(items)]
+        return self._inventory_items
+
+    @property
+    def eggs_available(self):
+        return list(itervalues(self._eggs_available))
+
+    @property
+    def incubators_available(self):
+        return list(itervalues(self._incubators_available))
+
+    @property
+    def incubators_busy(self):
+        return list(itervalues(self._incubators_busy))
+
     def setup_inventory(self):
-        self.eggs_available = []
-        self.incubators_available = []
-        self.incubators_busy = []
-        for inventory_item in self.inventory_items:
-            item = inventory_item['inventory_item_data'].get('item', {})
-            item_id = item.get('item_id', -1)
-            item_count = item.get('count', 0)
-            if item_id == Item_Enums.ITEM_POTION:
-                self.potion = item_count
-            elif item_id == Item_Enums.ITEM_SUPER_POTION:
-                self.super_potion = item_count
-            elif item_id == Item_Enums.ITEM_MAX_POTION:
-                self.max_potion = item_count
-            elif item_id == Item_Enums.ITEM_HYPER_POTION:
-                self.hyper_potion = item_count
-            elif item_id == Item_Enums.ITEM_POKE_BALL:
-                self.poke_balls = item_count
-            elif item_id == Item_Enums.ITEM_GREAT_BALL:
-                self.great_balls = item_count
-            elif item_id == Item_Enums.ITEM_MASTER_BALL:
-                self.master_balls = item_count
-            elif item_id == Item_Enums.ITEM_ULTRA_BALL:
-                self.ultra_balls = item_count
-            elif item_id == Item_Enums.ITEM_LUCKY_EGG:
-                self.lucky_eggs = item_count
-            elif item_id == Item_Enums.ITEM_RAZZ_BERRY:
-                self.razz_berries = item_count
-            candy = inventory_item['inventory_item_data'].get('candy', {})
-            self.pokemon_candy[candy.get('family_id', -1)] = candy.get('candy', -1)
-            pokemon_data = inventory_item['inventory_item_data'].get('pokemon_data', {})
-            if pokemon_data.get('is_egg', False) and not pokemon_data.get('egg_incubator_id', False):
-                self.eggs_available.append(pokemon_data)
-            egg_incubators = inventory_item['inventory_item_data'].get('egg_incubators', {}).get('egg_incubator', [])
-            for incubator in egg_incubators:
+        """ the counters and the egg and incubator indexes from the store, local changes are dropped """
+        self.item_counts = {}
+        self._released_pokemon = set()
+        self._new_pokemon = OrderedDict()
+        self.version += 1
+        for attribute in ITEM_ATTRIBUTES.values():
+            setattr(self, attribute, 0)
+        for item_id, inventory_item in iteritems(self._stored('item')):
+            self.set_item_count(item_id, inventory_item['inventory_item_data']['item'].get('count', 0))
+        for family_id, inventory_item in iteritems(self._stored('candy')):
+            self.pokemon_candy[family_id] = inventory_item['inventory_item_data']['candy'].get('candy', -1)
+        self._eggs_available = OrderedDict((egg_id, egg) for egg_id, egg in iteritems(self._eggs)
+                                           if not egg.get('egg_incubator_id', False))
+        self._incubators_available = OrderedDict()
+        self._incubators_busy = OrderedDict()
+        for inventory_item in itervalues(self._stored('egg_incubators')):
+            for incubator in inventory_item['inventory_item_data']['egg_incubators'].get('egg_incubator', []):
                 if "pokemon_id" in incubator:
-                    self.incubators_busy.append(incubator)
+                    self._incubators_busy[incubator.get('id')] = incubator
                 else:
-                    self.incubators_available.append(incubator)
+                    self._incubators_available[incubator.get('id')] = incubator
+
+    def set_item_count(self, item_id, count):
+        self.item_counts[item_id] = count
+        if item_id in ITEM_ATTRIBUTES:
+            setattr(self, ITEM_ATTRIBUTES[item_id], count)
+
+    def add_items(self, item_id, count):
+        """ a local delta, count is negative for items used up """
+        self.set_item_count(item_id, max(0, self.item_counts.get(item_id, 0) + count))
+
+    def remove_pokemon(self, pokemon_id):
+        self._released_pokemon.add(pokemon_id)
+        self.version += 1
+
+    def add_pokemon(self, pokemon_data):
+        self._new_pokemon[pokemon_data.get('id')] = pokemon_data
+        self.version += 1
+
+    def get_pokemon(self, pokemon_id):
+        """ the caught pokemon with the given id, None for eggs and released or unknown pokemon """
+        pokemon_data = self._new_pokemon.get(pokemon_id)
+        if pokemon_data is None:
+            inventory_item = self._stored('pokemon_data').get(pokemon_id)
+            pokemon_data = inventory_item['inventory_item_data']['pokemon_data'] if inventory_item else None
+        if pokemon_data is None or pokemon_data.get('is_egg', False) or pokemon_id in self._released_pokemon:
+            return None
+        return self._get_pokemon(pokemon_data)
+
+    def start_incubation(self, egg, incubator):
+        self._eggs_available.pop(egg['id'], None)
+        self._incubators_available.pop(incubator['id'], None)
+        busy = dict(incubator)
+        busy['pokemon_id'] = egg['id']
+        busy['target_km_walked'] = self._parent.player_stats.km_walked + egg['egg_km_walked_target']
+        busy['start_km_walked'] = self._parent.player_stats.km_walked
+        self._incubators_busy[incubator['id']] = busy
+
+    def mark_changed(self, items=True, pokemon=True):
+        """ the server has changes the local state misses (a caught pokemon), the next sync() fetches them """
+        self._items_stale = self._items_stale or items
+        self._pokemon_stale = self._pokemon_stale or pokemon
+
+    def mark_diverged(self, items=True, pokemon=True):
+        """ a response contradicted the local state, the next inventory is a full one """
+        self.mark_changed(items, pokemon)
+        self.reset()
+
+    def sync(self, pokemon=False):
+        """
+        Fetches the full inventory if the local one can't be trusted (pokemon=True if the caller
+        needs the pokemon list too, which is incomplete after a catch). Returns if it did.
+        """
+        if (self._items_stale or (pokemon and self._pokemon_stale) or
+                time() - self._synced_at > self._parent.config.inventory_resync_seconds):
+            self.update_player_inventory()
+            return True
+        self._sync_stats['skipped'] += 1
+        return False
+
+    def get_sync_stats(self):
+        return dict(self._sync_stats)
 
     def can_attempt_catch(self):
         return self.poke_balls + self.great_balls + self.ultra_balls + self.master_balls > 0
 
     def take_pokeball(self):
-        self.poke_balls -= 1
+        self.add_items(Item_Enums.ITEM_POKE_BALL, -1)
 
     def take_greatball(self):
-        self.great_balls -= 1
+        self.add_items(Item_Enums.ITEM_GREAT_BALL, -1)
 
     def take_masterball(self):
-        self.master_balls -= 1
+        self.add_items(Item_Enums.ITEM_MASTER_BALL, -1)
 
     def take_ultraball(self):
-        self.ultra_balls -= 1
+        self.add_items(Item_Enums.ITEM_ULTRA_BALL, -1)
 
     def best_ball(self):
         if self.use_masterball and self.master_balls:
@@ -125,98 +293,161 @@ class Inventory(object):
             return -1
 
     def take_ball(self, ball_id):
-        if ball_id == Item_Enums.ITEM_POKE_BALL:
-            self.poke_balls -= 1
-        elif ball_id == Item_Enums.ITEM_GREAT_BALL:
-            self.great_balls -= 1
-        elif ball_id == Item_Enums.ITEM_ULTRA_BALL:
-            self.ultra_balls -= 1
-        elif ball_id == Item_Enums.ITEM_MASTER_BALL:
-            self.master_balls -= 1
+        if ball_id in (Item_Enums.ITEM_POKE_BALL, Item_Enums.ITEM_GREAT_BALL,
+                       Item_Enums.ITEM_ULTRA_BALL, Item_Enums.ITEM_MASTER_BALL):
+            self.add_items(ball_id, -1)
 
     def has_lucky_egg(self):
-        for inventory_item in self.inventory_items:
-            item = inventory_item['inventory_item_data'].get('item', {})
-            item_id = item.get('item_id', -1)
-            if item_id == Item_Enums.ITEM_LUCKY_EGG and 'count' in item:
-                return True
-        return False
+        return self.lucky_eggs > 0
 
     def take_lucky_egg(self):
-        self.lucky_eggs -= 1
+        self.add_items(Item_Enums.ITEM_LUCKY_EGG, -1)
         return Item_Enums.ITEM_LUCKY_EGG
 
     def has_berry(self):
         # Only Razz berries are in the game at the moment
-        for inventory_item in self.inventory_items:
-            item = inventory_item['inventory_item_data'].get('item', {})
-            item_id = item.get('item_id', -1)
-            if item_id == Item_Enums.ITEM_RAZZ_BERRY and 'count' in item:
-                return True
-        return False
+        return self.razz_berries > 0
 
     def take_berry(self):
-        self.razz_berries -= 1
+        self.add_items(Item_Enums.ITEM_RAZZ_BERRY, -1)
         return Item_Enums.ITEM_RAZZ_BERRY
 
+    def _recycled(self, item_id, expected_count, res):
+        response_code = res.get('result', -1)
+        if response_code == 1:
+            self._log.info("{0}(s) recycled successfully. New count: {1}".format(get_item_name(
+                item_id), res.get('new_count', 0)))
+            if res.get('new_count', 0) != expected_count:
+                self.mark_diverged(pokemon=False)
+            self.set_item_count(item_id, res.get('new_count', 0))
+        else:
+            self._log.info("Failed to recycle {0}, Code: {1}".format(get_item_name(item_id), response_code))
+            self.mark_diverged(pokemon=False)
+
     def cleanup_inventory(self):
         item_count = 0
-        for inventory_item in self.inventory_items:
-            if "item" in inventory_item['inventory_item_data']:
-                item = inventory_item['inventory_item_data']['item']
-                if (
-                        item['item_id'] in self._parent.config.min_items and
-                        "count" in item and
-                        item['count'] > self._parent.config.min_items[item['item_id']]
-                ):
-                    recycle_count = item['count'] - self._parent.config.min_items[item['item_id']]
-                    item_count += item['count'] - recycle_count
-                    self._log.info("Recycling {0} {1}(s)".format(recycle_count, get_item_name(item['item_id'])))
-                    self._parent.sleep(0.2 + self._parent.config.extra_wait)
-                    res = self._parent.api.recycle_inventory_item(item_id=item['item_id'], count=recycle_count) \
-                        .get('responses', {}).get('RECYCLE_INVENTORY_ITEM', {})
-                    response_code = res.get('result', -1)
-                    if response_code == 1:
-                        self._log.info("{0}(s) recycled successfully. New count: {1}".format(get_item_name(
-                            item['item_id']), res.get('new_count', 0)))
-                    else:
-                        self._log.info("Failed to recycle {0}, Code: {1}".format(get_item_name(item['item_id']),
-                                                                                 response_code))
-                elif "count" in item:
-                    item_count += item['count']
+        batch = RequestBatch(self._parent)
+        for item_id, count in sorted(self.item_counts.items()):
+            min_count = self._parent.config.min_items.get(item_id)
+            if min_count is not None and count > min_count:
+                recycle_count = count - min_count
+                item_count += min_count
+                self._log.info("Recycling {0} {1}(s)".format(recycle_count, get_item_name(item_id)))
+                batch.add('recycle_inventory_item', partial(self._recycled, item_id, min_count),
+                          item_id=item_id, count=recycle_count)
+            else:
+                item_count += count
         if item_count > 0:
             self._log.info("Inventory has {0}/{1} items".format(item_count, self._parent.player.max_item_storage))
-        return self.update_player_inventory()
-
-    def get_caught_pokemon(self, as_json=False):
-        pokemon_list = sorted(map(lambda x: Pokemon(x['pokemon_data'], self._parent.player_stats.level,
-                                                    self._parent.config.score_method,
-                                                    self._parent.config.score_settings),
-                                  filter(lambda x: 'pokemon_data' in x and not x['pokemon_data'].get("is_egg", False),
-                                         map(lambda x: x.get('inventory_item_data', {}), self.inventory_items))),
-                              key=lambda x: x.score, reverse=True)
-        pokemon_list = filter(lambda x: not x.is_egg, pokemon_list)
+        batch.flush()
+
+    def get_caught_pokemon(self, as_json=False, fields=None):
+        """
+        the caught pokemon, best score first, built once per inventory version and shared by all callers,
+        as_json only sends the given Pokemon fields, all but the raw pokemon data by default
+        """
+        pokemon_settings = self._pokemon_settings()
+        if self._caught_pokemon is None or self._caught_pokemon[:2] != (self.version, pokemon_settings):
+            self._caught_pokemon = (self.version, pokemon_settings, self._build_caught_pokemon())
+            self._caught_pokemon_by_family = None
+        pokemon_list = list(self._caught_pokemon[2])
         if as_json:
-            return json.dumps(pokemon_list, default=lambda p: p.__dict__)  # reduce the data sent?
+            return json.dumps([pokemon.to_dict(fields) for pokemon in pokemon_list], default=json_default)
         return pokemon_list
 
-    def get_caught_pokemon_by_family(self, as_json=False):
-        pokemon_list = defaultdict(list)
-        for pokemon in self.get_caught_pokemon():
-            pokemon_list[pokemon.pokemon_id].append(pokemon)
+    def _pokemon_settings(self):
+        return self._parent.player_stats.level, self._parent.config.score_method, self._parent.config.score_settings
+
+    def _build_caught_pokemon(self):
+        pokemon_list = [self._get_pokemon(pokemon_data) for pokemon_data in self._caught_pokemon_data()]
+        # released pokemon drop out of the cache
+        self._pokemon_cache = dict((_pokemon_key(pokemon.pokemon_data), pokemon) for pokemon in pokemon_list)
+        return sorted(pokemon_list, key=lambda x: x.score, reverse=True)
+
+    def _get_pokemon(self, pokemon_data):
+        pokemon_settings = self._pokemon_settings()
+        if self._pokemon_cache_settings != pokemon_settings:
+            # level and score of every pokemon depend on these
+            self._pokemon_cache = {}
+            self._pokemon_cache_settings = pokemon_settings
+        key = _pokemon_key(pokemon_data)
+        pokemon = self._pokemon_cache.get(key)
+        if pokemon is None:
+            pokemon = self._pokemon_cache[key] = Pokemon(pokemon_data, *pokemon_settings)
+        return pokemon
+
+    def get_pokemon_table(self):
+        """ the caught pokemon as a PokemonTable, built once per inventory version, rows turn into the cached Pokemon """
+        pokemon_settings = self._pokemon_settings()
+        if self._pokemon_table is None or self._pokemon_table[:2] != (self.version, pokemon_settings):
+            self._pokemon_table = (self.version, pokemon_settings,
+                                   PokemonTable(self._caught_pokemon_data(), *pokemon_settings, pokemon_factory=self._get_pokemon))
+        return self._pokemon_table[2]
+
+    def _pokemon_data(self):
+        for inventory_item in itervalues(self._stored('pokemon_data')):
+            yield inventory_item['inventory_item_data']['pokemon_data']
+        for pokemon_data in itervalues(self._new_pokemon):
+            yield pokemon_data
+
+    def _caught_pokemon_data(self):
+        for pokemon_data in self._pokemon_data():
+            if not pokemon_data.get('is_egg', False) and pokemon_data.get('id') not in self._released_pokemon:
+                yield pokemon_data
+
+    def get_caught_pokemon_by_family(self, as_json=False, fields=None):
+        caught_pokemon = self.get_caught_pokemon()
+        if self._caught_pokemon_by_family is None:
+            self._caught_pokemon_by_family = defaultdict(list)
+            for pokemon in caught_pokemon:
+                self._caught_pokemon_by_family[pokemon.pokemon_id].append(pokemon)
+        # callers may change their lists
+        pokemon_list = defaultdict(list, ((pokemon_id, list(pokemon)) for pokemon_id, pokemon
+                                          in self._caught_pokemon_by_family.items()))
         if as_json:
-            return json.dumps(pokemon_list, default=lambda p: p.__dict__)  # reduce the data sent?
+            return json.dumps(dict((pokemon_id, [pokemon.to_dict(fields) for pokemon in pokemons])
+                                   for pokemon_id, pokemons in pokemon_list.items()), default=json_default)
         return pokemon_list
 
+    def reset(self):
+        """ the next inventory is a full one and replaces the store """
+        self.last_timestamp_ms = 0
+
+    def inventory_request(self):
+        """ the arguments of a GET_INVENTORY asking for the changes since the last one """
+        return {'last_timestamp_ms': self.last_timestamp_ms}
+
     def update_player_inventory(self, res=None):
         if res is None:
-            res = self._parent.api.get_inventory()
-        if 'GET_INVENTORY' in res.get('responses', {}):
-            self.inventory_items = res.get('responses', {}) \
-                .get('GET_INVENTORY', {}).get('inventory_delta', {}).get('inventory_items', [])
-            self.setup_inventory()
+            res = self._parent.api.get_inventory(**self.inventory_request())
+        delta = res.get('responses', {}).get('GET_INVENTORY', {}).get('inventory_delta')
+        if delta is not None:
+            # the local changes can't be trusted, rebuild them from the store even if nothing changed
+            self._merge(delta, rebuild=self._items_stale or self._pokemon_stale)
+            self._items_stale = self._pokemon_stale = False
+            self._synced_at = time()
         return res
 
+    def player_stats_data(self):
+        inventory_item = self._stored('player_stats').get(None)
+        return inventory_item['inventory_item_data']['player_stats'] if inventory_item else None
+
+    def _merge(self, delta, rebuild=False):
+        inventory_items = delta.get('inventory_items', [])
+        self._sync_stats['items_received'] += len(inventory_items)
+        if not self.last_timestamp_ms:
+            self._load(inventory_items)
+            self._sync_stats['full'] += 1
+        elif inventory_items:
+            for inventory_item in inventory_items:
+                self._store_item(inventory_item)
+            self._sync_stats['delta'] += 1
+        else:
+            self._sync_stats['unchanged'] += 1
+        self.last_timestamp_ms = delta.get('new_timestamp_ms', self.last_timestamp_ms)
+        if inventory_items or rebuild or not self._store:
+            self.setup_inventory()
+
     def use_lucky_egg(self):
         if self._parent.config.use_lucky_egg and \
                 self.has_lucky_egg() and time() - self._last_egg_use_time > 30 * 60:
@@ -254,7 +485,7 @@ class Inventory(object):
         return self.__str__()
 
     def to_json(self):
-        return json.dumps(
-            dict((att, val) for att, val in self.__dict__.iteritems() if not att.startswith('_')),
-            default=lambda o: o.__dict__
-        )
+        inventory = dict((att, val) for att, val in iteritems(self.__dict__) if not att.startswith('_'))
+        inventory.update(inventory_items=self.inventory_items, eggs_available=self.eggs_available,
+                         incubators_available=self.incubators_available, incubators_busy=self.incubators_busy)
+        return json.dumps(inventory, default=json_default)
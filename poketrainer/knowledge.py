@@ -0,0 +1,166 @@
+from __future__ import absolute_import
+
+import logging
+import math
+import os
+import sqlite3
+from time import time
+
+from . import geo
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS forts (
+    id TEXT PRIMARY KEY,
+    cell_id TEXT NOT NULL,
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    type INTEGER NOT NULL,
+    enabled INTEGER NOT NULL,
+    last_seen_ms INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS forts_cell ON forts (cell_id);
+CREATE INDEX IF NOT EXISTS forts_position ON forts (latitude, longitude);
+
+CREATE TABLE IF NOT EXISTS spawn_points (
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    cell_id TEXT NOT NULL,
+    last_seen_ms INTEGER NOT NULL,
+    PRIMARY KEY (latitude, longitude)
+);
+CREATE INDEX IF NOT EXISTS spawn_points_cell ON spawn_points (cell_id);
+
+CREATE TABLE IF NOT EXISTS sightings (
+    encounter_id TEXT PRIMARY KEY,
+    spawn_point_id TEXT NOT NULL,
+    cell_id TEXT NOT NULL,
+    pokemon_id INTEGER NOT NULL,
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    seen_ms INTEGER NOT NULL,
+    despawn_ms INTEGER
+);
+CREATE INDEX IF NOT EXISTS sightings_spawn_point ON sightings (spawn_point_id);
+CREATE INDEX IF NOT EXISTS sightings_cell ON sightings (cell_id);
+CREATE INDEX IF NOT EXISTS sightings_seen ON sightings (seen_ms);
+"""
+
+# meters per degree of latitude, for the bounding box of position queries
+METERS_PER_DEGREE = math.pi * geo.EARTH_RADIUS / 180
+
+# sightings older than this are deleted, spawn times only need the last few days
+SIGHTINGS_RETENTION_SECONDS = 7 * 24 * 3600
+SETUP_TIMEOUT = 30.0
+
+logger = logging.getLogger(__name__)
+
+
+class KnowledgeStore(object):
+    """
+    Forts, spawn points and pokemon sightings of every account, in a SQLite file.
+
+    Any number of bot processes can read and write the same file (WAL journal), so accounts in
+    the same area share what they have seen and can plan before their first map poll. A writer
+    waits at most timeout seconds for another one, blocking its whole process meanwhile, then
+    the write is skipped; the next map poll tells the same again. Cell ids are the level 15 S2
+    cells of the map responses.
+    """
+
+    def __init__(self, filename, timeout=0.1, sightings_retention=SIGHTINGS_RETENTION_SECONDS):
+        directory = os.path.dirname(filename)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.filename = filename
+        self.sightings_retention = sightings_retention
+        # creating the schema happens once, at start up it may wait for the other writers
+        self._db = sqlite3.connect(filename, timeout=SETUP_TIMEOUT)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(SCHEMA)
+        self._db.execute('PRAGMA busy_timeout=%d' % int(timeout * 1000))
+
+    def record_map_cells(self, map_cells, now=None):
+        """
+        Stores everything a GET_MAP_OBJECTS response told about its cells and deletes the expired
+        sightings, in one transaction. Returns False if the file was locked by another writer.
+        """
+        now_ms = int((now or time()) * 1000)
+        forts, spawn_points, sightings = [], [], []
+        for cell in map_cells:
+            cell_id = str(cell.get('s2_cell_id'))
+            for fort in cell.get('forts', []):
+                forts.append((fort['id'], cell_id, fort['latitude'], fort['longitude'], fort.get('type', 0),
+                              int(fort.get('enabled', False)), now_ms))
+            for spawn in cell.get('spawn_points', []):
+                spawn_points.append((spawn['latitude'], spawn['longitude'], cell_id, now_ms))
+            for pokemon in cell.get('catchable_pokemons', []):
+                despawn_ms = pokemon.get('expiration_timestamp_ms', -1)
+                sightings.append((str(pokemon['encounter_id']), pokemon.get('spawn_point_id', ''), cell_id,
+                                  pokemon['pokemon_id'], pokemon['latitude'], pokemon['longitude'], now_ms,
+                                  despawn_ms if despawn_ms > 0 else None))
+            for pokemon in cell.get('wild_pokemons', []):
+                time_till_hidden_ms = pokemon.get('time_till_hidden_ms', -1)
+                despawn_ms = pokemon.get('last_modified_timestamp_ms', now_ms) + time_till_hidden_ms
+                sightings.append((str(pokemon['encounter_id']), pokemon.get('spawn_point_id', ''), cell_id,
+                                  pokemon.get('pokemon_data', {}).get('pokemon_id', 0),
+                                  pokemon['latitude'], pokemon['longitude'], now_ms,
+                                  despawn_ms if 0 < time_till_hidden_ms <= 3600 * 1000 else None))
+
+        try:
+            with self._db:
+                self._db.executemany('INSERT OR REPLACE INTO forts VALUES (?, ?, ?, ?, ?, ?, ?)', forts)
+                self._db.executemany('INSERT OR REPLACE INTO spawn_points VALUES (?, ?, ?, ?)', spawn_points)
+                # a later sighting of the same encounter may know its despawn time, an earlier one not
+                self._db.executemany('INSERT OR IGNORE INTO sightings VALUES (?, ?, ?, ?, ?, ?, ?, ?)', sightings)
+                self._db.executemany('UPDATE sightings SET despawn_ms = ? WHERE encounter_id = ? AND despawn_ms IS NULL',
+                                     [(sighting[7], sighting[0]) for sighting in sightings if sighting[7] is not None])
+                self._db.execute('DELETE FROM sightings WHERE seen_ms < ?', (now_ms - self.sightings_retention * 1000,))
+        except sqlite3.OperationalError as e:
+            logger.debug("Skipped a write to the knowledge store: %s", e)
+            return False
+        return True
+
+    def forts_in_cells(self, cell_ids):
+        return self._forts('cell_id IN (%s)' % ', '.join('?' * len(cell_ids)), [str(c) for c in cell_ids])
+
+    def forts_near(self, center, radius, distance_mode=geo.HAVERSINE):
+        """ forts within radius meters of center """
+        lat_delta = radius / METERS_PER_DEGREE
+        lng_delta = lat_delta / max(math.cos(math.radians(center[0])), 1e-6)
+        forts = self._forts('latitude BETWEEN ? AND ? AND longitude BETWEEN ? AND ?',
+                            [center[0] - lat_delta, center[0] + lat_delta, center[1] - lng_delta, center[1] + lng_delta])
+        if not forts:
+            return []
+        distances = geo.distances_from(center, [(fort['latitude'], fort['longitude']) for fort in forts], distance_mode)
+        return [fort for fort, distance in zip(forts, distances) if distance <= radius]
+
+    def spawn_points_in_cells(self, cell_ids):
+        rows = self._db.execute('SELECT latitude, longitude FROM spawn_points WHERE cell_id IN (%s)' %
+                                ', '.join('?' * len(cell_ids)), [str(c) for c in cell_ids])
+        return [{'latitude': row['latitude'], 'longitude': row['longitude']} for row in rows]
+
+    def spawn_times(self, spawn_point_id):
+        """ the observed despawn times of a spawn point, as seconds past the hour """
+        rows = self._db.execute('SELECT DISTINCT (despawn_ms / 1000) % 3600 AS second FROM sightings '
+                                'WHERE spawn_point_id = ? AND despawn_ms IS NOT NULL ORDER BY second', (spawn_point_id,))
+        return [row['second'] for row in rows]
+
+    def sightings_in_cells(self, cell_ids, since_ms=0):
+        rows = self._db.execute('SELECT * FROM sightings WHERE seen_ms >= ? AND cell_id IN (%s) ORDER BY seen_ms' %
+                                ', '.join('?' * len(cell_ids)), [since_ms] + [str(c) for c in cell_ids])
+        return [dict(zip(row.keys(), row)) for row in rows]
+
+    def close(self):
+        self._db.close()
+
+    def _forts(self, where, args):
+        rows = self._db.execute('SELECT id, latitude, longitude, type, enabled FROM forts WHERE ' + where, args)
+        forts = []
+        for row in rows:
+            # the shape of a fort in a map response, cooldowns are per player and not shared
+            fort = {'id': row['id'], 'latitude': row['latitude'], 'longitude': row['longitude'], 'type': row['type']}
+            if row['enabled']:
+                fort['enabled'] = True
+            forts.append(fort)
+        return forts
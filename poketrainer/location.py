@@ -1,16 +1,15 @@
 from __future__ import absolute_import
 
-from time import time
-
 import pyproj
 import s2sphere
-import six
-from geopy.distance import VincentyDistance, vincenty
+from geopy.distance import VincentyDistance
 from geopy.geocoders import GoogleV3
 from gmaps.directions import Directions
 
-if six.PY3:
-    from past.builtins import map
+from library.api.pgoapi.utilities import CoveringCache
+
+from . import geo
+from .route_planner import plan_route
 
 g = pyproj.Geod(ellps='WGS84')
 geolocator = GoogleV3()
@@ -22,7 +21,8 @@ def get_location(search):
 
 
 # http://python-gmaps.readthedocs.io/en/latest/gmaps.html#module-gmaps.directions
-def get_route(start, end, use_google=False, gmaps_api_key="", walk_to_all_forts=False, waypoints=None, step_size=200):
+def get_route(start, end, use_google=False, gmaps_api_key="", walk_to_all_forts=False, waypoints=None, step_size=200,
+              distance_mode=geo.HAVERSINE):
     origin = (start[0], start[1])
     destination = (end[0], end[1])
     if use_google:
@@ -52,7 +52,7 @@ def get_route(start, end, use_google=False, gmaps_api_key="", walk_to_all_forts=
                     final_steps.append({
                         'lat': step[0],
                         'long': step[1],
-                        'distance': distance_in_meters(previous_step, step)
+                        'distance': distance_in_meters(previous_step, step, distance_mode)
                     })
                     previous_step = step
         return {
@@ -60,7 +60,7 @@ def get_route(start, end, use_google=False, gmaps_api_key="", walk_to_all_forts=
             'steps': final_steps
         }
     else:
-        total_distance = distance_in_meters(start, destination)
+        total_distance = distance_in_meters(start, destination, distance_mode)
         step_increments = get_increments(start, destination, step_size)
         final_steps = []
         previous_step = step_increments[0]
@@ -68,7 +68,7 @@ def get_route(start, end, use_google=False, gmaps_api_key="", walk_to_all_forts=
             final_steps.append({
                 'lat': step[0],
                 'long': step[1],
-                'distance': distance_in_meters(previous_step, step)
+                'distance': distance_in_meters(previous_step, step, distance_mode)
             })
             previous_step = step
 
@@ -78,6 +78,29 @@ def get_route(start, end, use_google=False, gmaps_api_key="", walk_to_all_forts=
         }
 
 
+def get_fort_route(start, forts, step_size=200, time_budget=1.0, distance_mode=geo.HAVERSINE):
+    """
+    Route from start through all (lat, lng) forts, ordered locally to walk the least, in the
+    shape get_route returns. Forts filtered to a proximity circle keep the route inside it,
+    the straight legs between them cannot leave a circle.
+    """
+    points = [(start[0], start[1])] + [(fort[0], fort[1]) for fort in forts]
+    # the start is the first point, an open route never moves it
+    order, _ = plan_route(points, closed=False, time_budget=time_budget, distance_mode=distance_mode)
+    total_distance = 0
+    final_steps = []
+    previous = (start[0], start[1], 0)
+    for index in order[1:]:
+        leg = get_route(previous, points[index], step_size=step_size, distance_mode=distance_mode)
+        total_distance += leg['total_distance']
+        final_steps.extend(leg['steps'])
+        previous = (points[index][0], points[index][1], 0)
+    return {
+        'total_distance': total_distance,
+        'steps': final_steps
+    }
+
+
 # step_size corresponds to how many meters between each step we want
 def get_increments(start, end, step_size=200):
     # def get_increments(start,end,step_size=3):
@@ -94,33 +117,22 @@ def get_increments(start, end, step_size=200):
     return [(l[1], l[0], 0) for l in lonlats]  # reorder to be lat,long instead of long,lat
 
 
-def distance_in_meters(p1, p2):
-    return vincenty(p1, p2).meters
-
+def distance_in_meters(p1, p2, distance_mode=geo.HAVERSINE):
+    return geo.distance(p1, p2, distance_mode)
 
-def filtered_forts(starting_location, origin, forts, proximity, visited_forts={}, reverse=False):
-    forts = filter(lambda f: is_active_pokestop(f[0], visited_forts=visited_forts, starting_location=starting_location,
-                                                proximity=proximity),
-                   map(lambda x: (x, distance_in_meters(origin, (x['latitude'], x['longitude']))), forts))
 
-    sorted_forts = sorted(forts, key=lambda x: x[1], reverse=reverse)
-    return sorted_forts
-
-
-def is_active_pokestop(fort, visited_forts, starting_location, proximity):
-    is_active_fort = fort.get('type', None) == 1 and ("enabled" in fort or 'lure_info' in fort) and fort.get(
-        'cooldown_complete_timestamp_ms', -1) < time() * 1000
-    if proximity and proximity > 0:
-        return is_active_fort and fort['id'] not in visited_forts and distance_in_meters(starting_location, (
-            fort['latitude'], fort['longitude'])) < proximity
-    else:
-        return is_active_fort and fort['id'] not in visited_forts
+# positions within the same level 17 cell (~70m) share the covering of that cell's center
+NEIGHBOR_COVERINGS = CoveringCache(maxsize=256, key_level=17)
 
 
 # from pokemongodev slack @erhan
 def get_neighbors(loc, level=15, spread=700):
+    return NEIGHBOR_COVERINGS.get(loc[0], loc[1], _get_neighbors, level, spread)
+
+
+def _get_neighbors(lat, lng, level, spread):
     distance = VincentyDistance(meters=spread)
-    center = (loc[0], loc[1], 0)
+    center = (lat, lng, 0)
     p1 = distance.destination(point=center, bearing=45)
     p2 = distance.destination(point=center, bearing=225)
     p1 = s2sphere.LatLng.from_degrees(p1[0], p1[1])
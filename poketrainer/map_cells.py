@@ -0,0 +1,131 @@
+from __future__ import absolute_import
+
+from time import time
+
+# objects of a cell that are merged by their key, everything else a cell returns is replaced
+MERGED_OBJECTS = {
+    'forts': lambda fort: fort.get('id'),
+    'spawn_points': lambda spawn: (spawn.get('latitude', 0.0), spawn.get('longitude', 0.0)),
+    'decimated_spawn_points': lambda spawn: (spawn.get('latitude', 0.0), spawn.get('longitude', 0.0)),
+    'fort_summaries': lambda summary: summary.get('fort_summary_id'),
+    # deleted_objects holds strings, the encounter ids are fixed64
+    'wild_pokemons': lambda pokemon: str(pokemon.get('encounter_id')),
+    'catchable_pokemons': lambda pokemon: str(pokemon.get('encounter_id')),
+}
+EXPIRING_OBJECTS = ('wild_pokemons', 'catchable_pokemons')
+
+# pokemon whose despawn time is unknown (or bogus) are kept this long
+DEFAULT_POKEMON_TTL_MS = 15 * 60 * 1000
+
+
+class MapCell(object):
+    def __init__(self, cell_id):
+        self.cell_id = cell_id
+        self.current_timestamp_ms = 0
+        self.objects = dict((key, {}) for key in MERGED_OBJECTS)
+        # (kind, key) of an expiring object -> its despawn time
+        self.expires_ms = {}
+        self.nearby_pokemons = []
+        self.last_requested = 0
+
+    def merge(self, cell, full, now_ms):
+        if full:
+            for objects in self.objects.values():
+                objects.clear()
+            self.expires_ms.clear()
+
+        for key, get_key in MERGED_OBJECTS.items():
+            objects = self.objects[key]
+            for obj in cell.get(key, []):
+                obj_key = get_key(obj)
+                objects[obj_key] = obj
+                if key in EXPIRING_OBJECTS:
+                    self.expires_ms[(key, obj_key)] = self._expiry(key, obj, now_ms)
+
+        for deleted in cell.get('deleted_objects', []):
+            for key, objects in self.objects.items():
+                objects.pop(deleted, None)
+                self.expires_ms.pop((key, deleted), None)
+
+        # nearby pokemon have no despawn time, they are only valid for the latest poll
+        self.nearby_pokemons = cell.get('nearby_pokemons', [])
+        self.current_timestamp_ms = cell.get('current_timestamp_ms', self.current_timestamp_ms)
+
+    def expire(self, now_ms):
+        for key, obj_key in [expiring for expiring, expires_ms in self.expires_ms.items() if expires_ms <= now_ms]:
+            del self.expires_ms[(key, obj_key)]
+            self.objects[key].pop(obj_key, None)
+
+    def to_dict(self):
+        # same shape as a map cell of a GET_MAP_OBJECTS response, empty lists are left out
+        cell = {'s2_cell_id': self.cell_id}
+        if self.current_timestamp_ms:
+            cell['current_timestamp_ms'] = self.current_timestamp_ms
+        for key, objects in self.objects.items():
+            if objects:
+                cell[key] = list(objects.values())
+        if self.nearby_pokemons:
+            cell['nearby_pokemons'] = self.nearby_pokemons
+        return cell
+
+    @staticmethod
+    def _expiry(key, pokemon, now_ms):
+        if key == 'catchable_pokemons':
+            expires_ms = pokemon.get('expiration_timestamp_ms', -1)
+            if expires_ms > now_ms:
+                return expires_ms
+        else:
+            time_till_hidden_ms = pokemon.get('time_till_hidden_ms', -1)
+            if 0 < time_till_hidden_ms <= 3600 * 1000:
+                return now_ms + time_till_hidden_ms
+        return now_ms + DEFAULT_POKEMON_TTL_MS
+
+
+class MapCellCache(object):
+    """ Remembers the contents and timestamp of every polled S2 cell, so only deltas have to be requested """
+
+    def __init__(self, incremental=True, cell_ttl=600):
+        self.incremental = incremental
+        self.cell_ttl = cell_ttl
+        self._cells = {}
+
+    def since_timestamps(self, cell_ids):
+        if not self.incremental:
+            return [0, ] * len(cell_ids)
+        return [self._cells[cell_id].current_timestamp_ms if cell_id in self._cells else 0 for cell_id in cell_ids]
+
+    def merge(self, cell_ids, since_timestamp_ms, map_cells, now=None):
+        now = now or time()
+        now_ms = int(now * 1000)
+        since = dict(zip(cell_ids, since_timestamp_ms))
+
+        for cell in map_cells:
+            cell_id = cell.get('s2_cell_id')
+            map_cell = self._cells.get(cell_id)
+            if map_cell is None:
+                map_cell = self._cells[cell_id] = MapCell(cell_id)
+            map_cell.merge(cell, not since.get(cell_id, 0), now_ms)
+
+        for cell_id in cell_ids:
+            if cell_id in self._cells:
+                self._cells[cell_id].last_requested = now
+
+        # forget cells we walked away from, they get requested in full again
+        for cell_id in [cell_id for cell_id, cell in self._cells.items() if now - cell.last_requested > self.cell_ttl]:
+            del self._cells[cell_id]
+
+    def map_cells(self, cell_ids, now=None):
+        now_ms = int((now or time()) * 1000)
+        map_cells = []
+        for cell_id in cell_ids:
+            map_cell = self._cells.get(cell_id)
+            if map_cell is not None:
+                map_cell.expire(now_ms)
+                map_cells.append(map_cell.to_dict())
+        return map_cells
+
+    def clear(self):
+        self._cells.clear()
+
+    def __len__(self):
+        return len(self._cells)
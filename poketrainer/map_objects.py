@@ -1,10 +1,17 @@
 from __future__ import absolute_import
 
+import sqlite3
 from time import time
 
 from helper.colorlogger import create_logger
 
+from .fort_index import FortIndex
+from .knowledge import KnowledgeStore
 from .location import get_neighbors
+from .map_cells import MapCellCache
+
+# how far around the start position forts known by other accounts are loaded
+KNOWLEDGE_RADIUS = 5000
 
 
 class MapObjects(object):
@@ -17,6 +24,13 @@ class MapObjects(object):
 
         # cache
         self._objects = {}
+        self._cells = MapCellCache(incremental=self.parent.config.incremental_map_objects)
+        self.forts = FortIndex(visited_ttl=self.parent.config.skip_visited_fort_duration,
+                               distance_mode=self.parent.config.distance_mode)
+        # shared with the other accounts
+        self.knowledge = None
+        if self.parent.config.shared_knowledge_file:
+            self.knowledge = KnowledgeStore(self.parent.config.shared_knowledge_file)
 
     def get_api_rate_limit(self):
         return self._map_objects_rate_limit
@@ -29,14 +43,52 @@ class MapObjects(object):
         while time() - self._last_got_map_objects < self._map_objects_rate_limit:
             self.parent.sleep(0.1)
 
+    def load_knowledge(self, position):
+        """ adds the forts other accounts have seen around position to the fort index, before our first poll """
+        if self.knowledge is None:
+            return 0
+        radius = min(self.parent.config.stay_within_proximity, KNOWLEDGE_RADIUS)
+        forts = [fort for fort in self.knowledge.forts_near(position, radius, self.parent.config.distance_mode) if fort['id'] not in self.forts]
+        for fort in forts:
+            self.forts.add(fort)
+        self.log.info("Loaded %s known forts from the shared knowledge store", len(forts))
+        return len(forts)
+
     def nearby_map_objects(self):
         if time() - self._last_got_map_objects > self._map_objects_rate_limit:
             position = self.parent.api.get_position()
             neighbors = get_neighbors(self.parent.get_position())
-            self.parent.sleep(1.0 + self.parent.config.extra_wait)
-            self._objects = self.parent.api.get_map_objects(
+            since_timestamp_ms = self._cells.since_timestamps(neighbors)
+            res = self.parent.api.get_map_objects(
                 latitude=position[0], longitude=position[1],
-                since_timestamp_ms=[0, ] * len(neighbors),
+                since_timestamp_ms=since_timestamp_ms,
                 cell_id=neighbors)
             self._last_got_map_objects = time()
+            self._objects = self._merge_map_objects(res, neighbors, since_timestamp_ms)
         return self._objects
+
+    def _merge_map_objects(self, res, neighbors, since_timestamp_ms):
+        map_objects = res.get('responses', {}).get('GET_MAP_OBJECTS', {}) if isinstance(res, dict) else {}
+        if map_objects.get('status', 0) != 1:
+            # nothing to merge, make sure the next poll asks for full cells again
+            self._cells.clear()
+            return res
+
+        self._cells.merge(neighbors, since_timestamp_ms, map_objects.get('map_cells', []))
+        if self.knowledge is not None:
+            try:
+                self.knowledge.record_map_cells(map_objects.get('map_cells', []))
+            except sqlite3.Error as e:
+                self.log.warning("Could not update the shared knowledge store: %s", e)
+        self.log.debug("Map cell cache holds %s cells", len(self._cells))
+
+        # hand out the merged cells in the shape of the original response
+        map_cells = self._cells.map_cells(neighbors)
+        self.forts.update(map_cells)
+        merged = dict(res)
+        merged['responses'] = dict(res['responses'])
+        merged['responses']['GET_MAP_OBJECTS'] = {
+            'status': map_objects['status'],
+            'map_cells': map_cells,
+        }
+        return merged
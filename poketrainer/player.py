@@ -2,8 +2,13 @@ from __future__ import absolute_import
 
 import json
 
+from .poke_utils import json_default
+
 
 class Player(object):
+    __slots__ = ('player_data', 'username', 'team', 'max_pokemon_storage', 'creation_timestamp_ms', 'max_item_storage', 'currencies')
+    DICT_FIELDS = __slots__
+
     def __init__(self, player_data):
         self.player_data = player_data
         self.username = 0
@@ -30,5 +35,8 @@ class Player(object):
     def __repr__(self):
         return self.__str__()
 
-    def to_json(self):
-        return json.dumps(self, default=lambda o: o.__dict__)
+    def to_dict(self, fields=None):
+        return dict((field, getattr(self, field)) for field in (fields or self.DICT_FIELDS))
+
+    def to_json(self, fields=None):
+        return json.dumps(self.to_dict(fields), default=json_default)
@@ -4,6 +4,10 @@ from time import time
 
 
 class PlayerStats(object):
+    __slots__ = ('player_stats', 'experience', 'next_level_xp', 'prev_level_xp', 'unique_pokedex_entries', 'km_walked', 'level',
+                 'run_pokemon_caught', 'run_start_time', 'run_exp_start', 'run_duration_s', 'run_exp_earned', 'run_hourly_exp')
+    DICT_FIELDS = __slots__[1:]
+
     def __init__(self, player_stats, pokemon_caught=0, start_time=time(), exp_start=None):
         self.player_stats = player_stats
         self.experience = 0
@@ -46,3 +50,6 @@ class PlayerStats(object):
 
     def __repr__(self):
         return self.__str__()
+
+    def to_dict(self, fields=None):
+        return dict((field, getattr(self, field)) for field in (fields or self.DICT_FIELDS))
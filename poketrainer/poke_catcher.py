@@ -7,8 +7,8 @@ from cachetools import TTLCache
 from helper.colorlogger import create_logger
 from helper.utilities import flat_map
 
-from .location import distance_in_meters
-from .poke_utils import create_capture_probability, get_item_name
+from . import geo
+from .poke_utils import create_capture_probability, get_item_name, json_default
 from .pokemon import POKEMON_NAMES, Pokemon
 
 
@@ -37,13 +37,13 @@ class PokeCatcher(object):
         map_cells = self.parent.map_objects.nearby_map_objects().get('responses', {}).get('GET_MAP_OBJECTS', {})\
             .get('map_cells', [])
         pokemons = flat_map(lambda c: c.get('catchable_pokemons', []), map_cells)
-        pokemons = filter(lambda p: (p['encounter_id'] not in self.encountered_pokemons), pokemons)
+        pokemons = [p for p in pokemons if p['encounter_id'] not in self.encountered_pokemons]
 
         # catch first pokemon:
         origin = self.parent.get_position()
-        pokemon_distances = [(pokemon, distance_in_meters(origin, (pokemon['latitude'], pokemon['longitude']))) for
-                             pokemon
-                             in pokemons]
+        distances = geo.distances_from(origin, [(pokemon['latitude'], pokemon['longitude']) for pokemon in pokemons],
+                                       self.parent.config.distance_mode)
+        pokemon_distances = [(pokemon, float(distance)) for pokemon, distance in zip(pokemons, distances)]
         if pokemons:
             self.log.debug("Nearby pokemon: : %s", pokemon_distances)
             self.log.info("Nearby Pokemon: %s",
@@ -72,7 +72,6 @@ class PokeCatcher(object):
             if catch_attempts > self.parent.config.min_failed_attempts_before_using_berry \
                     and self.parent.inventory.has_berry():
                 self.log.info("Feeding da razz berry!")
-                self.parent.sleep(0.2 + self.parent.config.extra_wait)
                 r = self.parent.api.use_item_capture(item_id=self.parent.inventory.take_berry(),
                                                      encounter_id=encounter_id,
                                                      spawn_point_id=spawn_point_id) \
@@ -81,11 +80,11 @@ class PokeCatcher(object):
                     item_capture_mult = r.get("item_capture_mult", 1.0)
                 else:
                     self.log.info("Could not feed the Pokemon. (%s)", r)
+                    self.parent.inventory.mark_diverged(pokemon=False)
 
             pokeball = self.parent.inventory.take_next_ball(capture_probability)
             self.log.info("Attempting catch with {0} at {1:.2f}% chance. Try Number: {2}".format(get_item_name(
                 pokeball), item_capture_mult * capture_probability.get(pokeball, 0.0) * 100, catch_attempts))
-            self.parent.sleep(0.5 + self.parent.config.extra_wait)
             r = self.parent.api.catch_pokemon(
                 normalized_reticle_size=1.950,
                 pokeball=pokeball,
@@ -98,8 +97,14 @@ class PokeCatcher(object):
             catch_attempts += 1
             if "status" in r:
                 catch_status = r['status']
+                if catch_status == 1:
+                    # the caught pokemon and its candy are only in the next inventory
+                    self.parent.inventory.mark_changed(items=False)
                 # fleed or error
                 if catch_status == 3 or catch_status == 0:
+                    if catch_status == 0:
+                        # e.g. a ball we thought we had
+                        self.parent.inventory.mark_diverged(pokemon=False)
                     break
             ret = r
             # Sleep between catch attempts
@@ -138,7 +143,7 @@ class PokeCatcher(object):
                           new_loc=None):  # take in a MapPokemon from MapCell.catchable_pokemons
         # Update Inventory to make sure we can catch this mon
         try:
-            self.parent.inventory.update_player_inventory()
+            self.parent.inventory.sync()
             if not self.parent.inventory.can_attempt_catch():
                 self.log.info("No balls to catch %s, exiting encounter", self.parent.inventory)
                 return False
@@ -148,7 +153,6 @@ class PokeCatcher(object):
             position = self.parent.api.get_position()
             pokemon = Pokemon(pokemon_data)
             self.log.info("Trying initiate catching Pokemon: %s", pokemon.pokemon_type)
-            self.parent.sleep(0.2 + self.parent.config.extra_wait)
             encounter = self.parent.api.encounter(encounter_id=encounter_id,
                                                   spawn_point_id=spawn_point_id,
                                                   player_latitude=position[0],
@@ -162,7 +166,7 @@ class PokeCatcher(object):
                                   self.parent.config.score_method, self.parent.config.score_settings)
                 capture_probability = create_capture_probability(encounter.get('capture_probability', {}))
                 self.log.debug("Attempt Encounter Capture Probability: %s",
-                               json.dumps(encounter, indent=4, sort_keys=True))
+                               json.dumps(encounter, indent=4, sort_keys=True, default=json_default))
 
                 if new_loc:
                     # change loc for sniping
@@ -188,7 +192,7 @@ class PokeCatcher(object):
 
     def disk_encounter_pokemon(self, lureinfo, retry=False):
         try:
-            self.parent.inventory.update_player_inventory()
+            self.parent.inventory.sync()
             if not self.parent.inventory.can_attempt_catch():
                 self.log.info("No balls to catch %s, exiting disk encounter", self.parent.inventory)
                 return False
@@ -206,7 +210,7 @@ class PokeCatcher(object):
             if result == 1 and 'pokemon_data' in resp and 'capture_probability' in resp:
                 pokemon = Pokemon(resp.get('pokemon_data', {}))
                 capture_probability = create_capture_probability(resp.get('capture_probability', {}))
-                self.log.debug("Attempt Encounter: %s", json.dumps(resp, indent=4, sort_keys=True))
+                self.log.debug("Attempt Encounter: %s", json.dumps(resp, indent=4, sort_keys=True, default=json_default))
                 return self.do_catch_pokemon(encounter_id, fort_id, capture_probability, pokemon)
             elif result == 5:
                 self.log.info("Couldn't catch %s Your pokemon bag was full, attempting to clear and re-try",
@@ -2,15 +2,26 @@ from __future__ import absolute_import
 
 from library.api.pgoapi.protos.POGOProtos.Inventory import \
     Item_pb2 as Enum_Items
-from poketrainer.pokemon import Pokemon
+
+ITEM_NAMES = dict((item_id, item.name.replace('ITEM_', '', 1))
+                  for item_id, item in Enum_Items.ItemId.DESCRIPTOR.values_by_number.items())
 
 
 def get_item_name(s_item_id):
-    available_items = Enum_Items.ItemId.DESCRIPTOR.values_by_number.items()
-    for (item_id, item) in available_items:
-        if item_id == s_item_id:
-            return item.name.replace('ITEM_', '', 1)
-    return 'Unknown'
+    return ITEM_NAMES.get(s_item_id, 'Unknown')
+
+
+def to_plain(value):
+    # responses of the api's view mode are read-only MessageViews, everything else is a dict already
+    return value.to_dict() if hasattr(value, 'to_dict') else value
+
+
+def json_default(obj):
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    if isinstance(obj, bytes):
+        return obj.decode('utf8')
+    return obj.__dict__
 
 
 def pokemon_iv_percentage(pokemon):
@@ -27,13 +38,6 @@ def create_capture_probability(capture_probability):
         return dict(zip(capture_balls, capture_rate))
 
 
-def get_pokemon_by_long_id(pokemon_id, res):
-    for inventory_item in res:
-        pokemon_data = inventory_item['inventory_item_data'].get('pokemon_data', {})
-        if not pokemon_data.get('is_egg', False) and pokemon_data.get('id', 'NA') == pokemon_id:
-            return Pokemon(pokemon_data)
-    return None
-
 DISK_ENCOUNTER = {0: "UNKNOWN",
                   1: "SUCCESS",
                   2: "NOT_AVAILABLE",
@@ -1,6 +1,7 @@
 from __future__ import absolute_import
 
 import json
+from bisect import bisect_left
 from math import floor, sqrt
 from os import sep as os_sep
 from os import path
@@ -8,6 +9,7 @@ from os import path
 from helper.utilities import all_in
 from poketrainer.game_master import GAME_MASTER, PokemonData
 from poketrainer.poke_lvl_data import POKEMON_LVL_DATA, TCPM_VALS, get_tcpm
+from poketrainer.poke_utils import json_default
 
 POKEMON_NAMES = {}
 
@@ -16,32 +18,109 @@ with open(_names_file_path) as jsonfile:
     POKEMON_NAMES.update(json.load(jsonfile))
 
 
+# Used for calculating the pokemon level
+# source http://pokemongo.gamepress.gg/cp-multiplier
+CPM_INCREMENTS = [
+    {
+        'max_level': 1,
+        'cpm_sqrt_increase_per_level': 0.008836,
+        'max_level_cpm': 0.094  # we can't calculate this value, thus we set it here
+    },
+    {
+        'max_level': 10,
+        'cpm_sqrt_increase_per_level': 0.009426125 * 2,
+    },
+    {
+        'max_level': 20,
+        'cpm_sqrt_increase_per_level': 0.008919026 * 2,
+    },
+    {
+        'max_level': 30,
+        'cpm_sqrt_increase_per_level': 0.008924906 * 2,
+    },
+    {
+        'max_level': 40,
+        'cpm_sqrt_increase_per_level': 0.004459461 * 2,
+    }
+]
+
+
+def _calculate_cpm(level):
+    prev_max_level = 0
+    prev_max_level_cpm = 0
+    for cpm_increment in CPM_INCREMENTS:
+        max_level = cpm_increment['max_level']
+        cpm_sqrt_increase_per_level = cpm_increment['cpm_sqrt_increase_per_level']
+        if level <= max_level:  # we are below the max level of current cpm iteration
+            # this calculates the CPM for a pokemon with given level
+            return sqrt(
+                pow(prev_max_level_cpm, 2) +
+                cpm_sqrt_increase_per_level * (level - prev_max_level)
+            )
+        else:
+            # this calculates the CPM for a pokemon with max_level, used in next iteration
+            prev_max_level_cpm = sqrt(
+                pow(prev_max_level_cpm, 2) +
+                cpm_sqrt_increase_per_level * (max_level - prev_max_level)
+            )
+            prev_max_level = max_level
+    return 0.0
+
+
+# CPM of every half level from 1 to 40, LEVEL_CPMS[2 * level - 2]
+LEVEL_CPMS = [_calculate_cpm(half_level / 2.0) for half_level in range(2, 81)]
+MAX_LEVEL_CPM = LEVEL_CPMS[-1]
+# CPM at the max level of each increment, the increment of a CPM is found by bisecting these
+INCREMENT_MAX_CPMS = [cpm_increment['max_level_cpm'] if 'max_level_cpm' in cpm_increment
+                      else _calculate_cpm(cpm_increment['max_level']) for cpm_increment in CPM_INCREMENTS]
+
+# pokemon id -> CP at level 40 with the worst and with perfect IVs
+_IV_CP_RANGES = {}
+
+
+def cpm_by_level(level):
+    index = level * 2 - 2
+    if 0 <= index < len(LEVEL_CPMS) and index == int(index):
+        return LEVEL_CPMS[int(index)]
+    return _calculate_cpm(level)
+
+
+def level_by_cpm(cpm_total):
+    i = bisect_left(INCREMENT_MAX_CPMS, cpm_total)
+    if i == len(INCREMENT_MAX_CPMS):
+        return 0.0
+    prev_max_level = CPM_INCREMENTS[i - 1]['max_level'] if i else 0
+    prev_max_level_cpm = INCREMENT_MAX_CPMS[i - 1] if i else 0
+    # cpm_sqrt_increase_per_level is only valid for CPM increase since prev_max_level
+    level_diff_prev_max_level = (pow(cpm_total, 2) - pow(prev_max_level_cpm, 2)) / CPM_INCREMENTS[i]['cpm_sqrt_increase_per_level']
+    return round(prev_max_level + level_diff_prev_max_level, 1)
+
+
+def iv_cp_range(pokemon_id):
+    """ the CP of a species at level 40 with the worst and with perfect IVs """
+    if pokemon_id not in _IV_CP_RANGES:
+        additional_data = GAME_MASTER.get(pokemon_id)
+        # Thanks to http://pokemongo.gamepress.gg/pokemon-stats-advanced for the magical formulas
+        attack = float(additional_data.BaseAttack) if additional_data else 0.0
+        defense = float(additional_data.BaseDefense) if additional_data else 0.0
+        stamina = float(additional_data.BaseStamina) if additional_data else 0.0
+        # calculating these for level 40 to get more accurate values
+        worst_iv_cp = (attack * sqrt(defense) * sqrt(stamina) * pow(MAX_LEVEL_CPM, 2)) / 10
+        perfect_iv_cp = ((attack + 15) * sqrt(defense + 15) * sqrt(stamina + 15) * pow(MAX_LEVEL_CPM, 2)) / 10
+        _IV_CP_RANGES[pokemon_id] = worst_iv_cp, perfect_iv_cp
+    return _IV_CP_RANGES[pokemon_id]
+
+
 class Pokemon(object):
-    # Used for calculating the pokemon level
-    # source http://pokemongo.gamepress.gg/cp-multiplier
-    cpm_calculation_increments = [
-        {
-            'max_level': 1,
-            'cpm_sqrt_increase_per_level': 0.008836,
-            'max_level_cpm': 0.094  # we can't calculate this value, thus we set it here
-        },
-        {
-            'max_level': 10,
-            'cpm_sqrt_increase_per_level': 0.009426125 * 2,
-        },
-        {
-            'max_level': 20,
-            'cpm_sqrt_increase_per_level': 0.008919026 * 2,
-        },
-        {
-            'max_level': 30,
-            'cpm_sqrt_increase_per_level': 0.008924906 * 2,
-        },
-        {
-            'max_level': 40,
-            'cpm_sqrt_increase_per_level': 0.004459461 * 2,
-        }
-    ]
+    # the raw pokemon_data is shared with the inventory and left out of to_dict() by default
+    __slots__ = ('pokemon_data', 'creation_time_ms', 'stamina', 'favorite', 'is_favorite', 'pokemon_id', 'id', 'cp',
+                 'stamina_max', 'is_egg', 'origin', 'height_m', 'weight_kg', 'individual_attack', 'individual_defense',
+                 'individual_stamina', 'cp_multiplier', 'additional_cp_multiplier', 'nickname', 'iv', 'pokemon_type',
+                 'name', 'candy', 'move_1', 'move_2', 'candy_needed_to_max_evolve', 'dust_needed_to_max_evolve',
+                 'max_evolve_cp', 'power_up_result', 'iv_normalized', 'max_cp', 'max_cp_absolute', 'family_id',
+                 'cpm_total', 'level_wild', 'level', 'score', 'try_keep')
+    DICT_FIELDS = __slots__[1:]
+    cpm_calculation_increments = CPM_INCREMENTS
 
     def __init__(self, pokemon_data, player_level=0,
                  score_method="CP", score_settings=dict()):
@@ -91,19 +170,12 @@ class Pokemon(object):
 
         # helps with rounding errors
         self.cpm_total = get_tcpm(self.cp_multiplier + self.additional_cp_multiplier)
-        self.level_wild = self.get_level_by_cpm(self.cp_multiplier)
-        self.level = self.get_level_by_cpm(self.cpm_total)
+        self.level_wild = level_by_cpm(self.cp_multiplier)
+        self.level = level_by_cpm(self.cpm_total)
 
-        # Thanks to http://pokemongo.gamepress.gg/pokemon-stats-advanced for the magical formulas
-        attack = float(additional_data.BaseAttack) if additional_data else 0.0
-        defense = float(additional_data.BaseDefense) if additional_data else 0.0
-        stamina = float(additional_data.BaseStamina) if additional_data else 0.0
-
-        self.max_cp = self.calc_cp(self.get_cpm_by_level(player_level + 1.5), additional_data)
-        self.max_cp_absolute = self.calc_cp(self.get_cpm_by_level(40), additional_data)
-        # calculating these for level 40 to get more accurate values
-        worst_iv_cp = (attack * sqrt(defense) * sqrt(stamina) * pow(self.get_cpm_by_level(40), 2)) / 10
-        perfect_iv_cp = ((attack + 15) * sqrt(defense + 15) * sqrt(stamina + 15) * pow(self.get_cpm_by_level(40), 2)) / 10
+        self.max_cp = self.calc_cp(cpm_by_level(player_level + 1.5), additional_data)
+        self.max_cp_absolute = self.calc_cp(MAX_LEVEL_CPM, additional_data)
+        worst_iv_cp, perfect_iv_cp = iv_cp_range(self.pokemon_id)
         if perfect_iv_cp - worst_iv_cp > 0:
                 self.iv_normalized = 100 * (self.max_cp_absolute - worst_iv_cp) / (perfect_iv_cp - worst_iv_cp)
         self.score = 0.0
@@ -196,45 +268,10 @@ class Pokemon(object):
         self.power_up_result = self.calc_cp(TCPM_VALS[poke_lvl], poke_game_data) - self.cp
 
     def get_level_by_cpm(self, cpm_total):
-        prev_max_level = 0
-        prev_max_level_cpm = 0
-        for cpm_increment in self.cpm_calculation_increments:
-            max_level = cpm_increment['max_level']
-            cpm_sqrt_increase_per_level = cpm_increment['cpm_sqrt_increase_per_level']
-            if "max_level_cpm" in cpm_increment:
-                max_level_cpm = cpm_increment['max_level_cpm']
-            else:
-                # this calculates the CPM for a pokemon with max_level of the current iteration
-                max_level_cpm = self.get_cpm_by_level(max_level)
-            if cpm_total <= max_level_cpm:
-                # cpm_sqrt_increase_per_level is only valid for CPM increase since prev_max_level
-                level_diff_prev_max_level = (pow(cpm_total, 2) - pow(prev_max_level_cpm, 2)) / cpm_sqrt_increase_per_level
-                return round(prev_max_level + level_diff_prev_max_level, 1)
-            else:
-                prev_max_level = max_level
-                prev_max_level_cpm = max_level_cpm
-        return 0.0
+        return level_by_cpm(cpm_total)
 
     def get_cpm_by_level(self, level):
-        prev_max_level = 0
-        prev_max_level_cpm = 0
-        for cpm_increment in self.cpm_calculation_increments:
-            max_level = cpm_increment['max_level']
-            cpm_sqrt_increase_per_level = cpm_increment['cpm_sqrt_increase_per_level']
-            if level <= max_level:  # we are below the max level of current cpm iteration
-                # this calculates the CPM for a pokemon with given level
-                return sqrt(
-                    pow(prev_max_level_cpm, 2) +
-                    cpm_sqrt_increase_per_level * (level - prev_max_level)
-                )
-            else:
-                # this calculates the CPM for a pokemon with max_level, used in next iteration
-                prev_max_level_cpm = sqrt(
-                    pow(prev_max_level_cpm, 2) +
-                    cpm_sqrt_increase_per_level * (max_level - prev_max_level)
-                )
-                prev_max_level = max_level
-        return 0.0
+        return cpm_by_level(level)
 
     def get_iv_percentage(self):
         return ((self.individual_attack + self.individual_stamina + self.individual_defense + 0.0) / 45.0) * 100.0
@@ -242,5 +279,8 @@ class Pokemon(object):
     def is_valid_pokemon(self):
         return self.pokemon_id > 0
 
-    def to_json(self):
-        return json.dumps(self, default=lambda o: o.__dict__)
+    def to_dict(self, fields=None):
+        return dict((field, getattr(self, field)) for field in (fields or self.DICT_FIELDS))
+
+    def to_json(self, fields=None):
+        return json.dumps(self.to_dict(fields), default=json_default)
@@ -0,0 +1,164 @@
+from __future__ import absolute_import
+
+from collections import OrderedDict
+
+import numpy as np
+
+from poketrainer.game_master import GAME_MASTER
+from poketrainer.pokemon import (CPM_INCREMENTS, INCREMENT_MAX_CPMS,
+                                 MAX_LEVEL_CPM, cpm_by_level, iv_cp_range)
+from poketrainer.poke_lvl_data import TCPM_VALS
+
+DTYPE = np.dtype([
+    ('id', np.uint64),
+    ('pokemon_id', np.int32),
+    ('family_id', np.int32),
+    ('cp', np.int32),
+    ('individual_attack', np.int32),
+    ('individual_defense', np.int32),
+    ('individual_stamina', np.int32),
+    ('cp_multiplier', np.float64),
+    ('cpm_total', np.float64),
+    ('level', np.float64),
+    ('level_wild', np.float64),
+    ('iv', np.float64),
+    ('iv_normalized', np.float64),
+    ('max_cp', np.int32),
+    ('max_cp_absolute', np.int32),
+    ('is_favorite', np.bool_),
+    ('score', np.float64),
+])
+
+_TCPM_VALS = np.array(TCPM_VALS)
+_INCREMENT_MAX_LEVELS = np.array([0] + [cpm_increment['max_level'] for cpm_increment in CPM_INCREMENTS])
+_INCREMENT_MAX_CPMS = np.array([0.0] + INCREMENT_MAX_CPMS)
+_INCREMENT_SQRT_INCREASES = np.array([cpm_increment['cpm_sqrt_increase_per_level'] for cpm_increment in CPM_INCREMENTS] + [1.0])
+
+# base stats and family by pokemon id, the known flag tells species without game master data apart
+_SPECIES_COUNT = max(GAME_MASTER) + 1
+_KNOWN = np.zeros(_SPECIES_COUNT, dtype=np.bool_)
+_BASE_ATTACK = np.zeros(_SPECIES_COUNT)
+_BASE_DEFENSE = np.zeros(_SPECIES_COUNT)
+_BASE_STAMINA = np.zeros(_SPECIES_COUNT)
+_FAMILY_ID = np.zeros(_SPECIES_COUNT, dtype=np.int32)
+for _pokemon_id, _additional_data in GAME_MASTER.items():
+    _KNOWN[_pokemon_id] = True
+    _BASE_ATTACK[_pokemon_id] = int(_additional_data.BaseAttack)
+    _BASE_DEFENSE[_pokemon_id] = int(_additional_data.BaseDefense)
+    _BASE_STAMINA[_pokemon_id] = int(_additional_data.BaseStamina)
+    _FAMILY_ID[_pokemon_id] = int(_additional_data.FamilyId)
+
+
+def get_tcpm(cpm):
+    """ poke_lvl_data.get_tcpm for an array, the closest total CPM, the smaller one on ties """
+    pos = np.clip(np.searchsorted(_TCPM_VALS, cpm, side='left'), 1, len(_TCPM_VALS) - 1)
+    before = _TCPM_VALS[pos - 1]
+    after = _TCPM_VALS[pos]
+    closest = np.where(after - cpm < cpm - before, after, before)
+    closest = np.where(cpm <= _TCPM_VALS[0], _TCPM_VALS[0], closest)
+    return np.where(cpm > _TCPM_VALS[-1], _TCPM_VALS[-1], closest)
+
+
+def level_by_cpm(cpm_total):
+    """ pokemon.level_by_cpm for an array """
+    i = np.searchsorted(_INCREMENT_MAX_CPMS[1:], cpm_total, side='left')
+    level_diff_prev_max_level = (cpm_total ** 2 - _INCREMENT_MAX_CPMS[i] ** 2) / _INCREMENT_SQRT_INCREASES[i]
+    levels = _round(_INCREMENT_MAX_LEVELS[i] + level_diff_prev_max_level)
+    return np.where(i == len(CPM_INCREMENTS), 0.0, levels)
+
+
+def _round(values):
+    # np.round scales by 10 and can differ from round() in the last digit, these are only 1000s of values
+    return np.array([round(value, 1) for value in values.tolist()], dtype=np.float64)
+
+
+class PokemonTable(object):
+    """
+    The caught pokemon as columns, with their level, IVs, max CP and the score of every score
+    method computed for all of them at once.
+
+    Rows keep the order of the pokemon data, the sorting helpers are stable like sorted() and
+    return row indices. get(row) and pokemon(rows) turn rows into Pokemon objects with the
+    given factory, so the objects are only built for the rows that are looked at.
+    """
+
+    def __init__(self, pokemon_data, player_level=0, score_method="CP", score_settings=dict(), pokemon_factory=None):
+        self.pokemon_data = list(pokemon_data)
+        self.pokemon_factory = pokemon_factory
+        self.rows = np.zeros(len(self.pokemon_data), dtype=DTYPE)
+        self.scores = {}
+        if self.pokemon_data:
+            self._fill()
+            self._compute(player_level, score_settings)
+        self.rows['score'] = self.scores.get(score_method, 0.0)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _fill(self):
+        for name, default in (('id', 0), ('pokemon_id', 0), ('cp', 0), ('individual_attack', 0),
+                              ('individual_defense', 0), ('individual_stamina', 0)):
+            self.rows[name] = [pokemon_data.get(name, default) for pokemon_data in self.pokemon_data]
+        self.rows['cp_multiplier'] = [pokemon_data.get('cp_multiplier', 0.0) for pokemon_data in self.pokemon_data]
+        self.rows['cpm_total'] = get_tcpm(self.rows['cp_multiplier'] +
+                                          [pokemon_data.get('additional_cp_multiplier', 0.0) for pokemon_data in self.pokemon_data])
+        self.rows['is_favorite'] = [pokemon_data.get('favorite', -1) != -1 for pokemon_data in self.pokemon_data]
+
+    def _compute(self, player_level, score_settings):
+        rows = self.rows
+        species = np.clip(rows['pokemon_id'], 0, _SPECIES_COUNT - 1)
+        known = _KNOWN[species] & (rows['pokemon_id'] == species)
+        rows['family_id'] = np.where(known, _FAMILY_ID[species], 0)
+        rows['level_wild'] = level_by_cpm(rows['cp_multiplier'])
+        rows['level'] = level_by_cpm(rows['cpm_total'])
+        rows['iv'] = ((rows['individual_attack'] + rows['individual_stamina'] + rows['individual_defense'] + 0.0) / 45.0) * 100.0
+
+        rows['max_cp'] = self._calc_cp(species, known, cpm_by_level(player_level + 1.5))
+        rows['max_cp_absolute'] = self._calc_cp(species, known, MAX_LEVEL_CPM)
+        worst_iv_cp = np.zeros(len(rows))
+        perfect_iv_cp = np.zeros(len(rows))
+        for pokemon_id in np.unique(rows['pokemon_id']).tolist():
+            in_species = rows['pokemon_id'] == pokemon_id
+            worst_iv_cp[in_species], perfect_iv_cp[in_species] = iv_cp_range(pokemon_id)
+        iv_cp_diff = perfect_iv_cp - worst_iv_cp
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rows['iv_normalized'] = np.where(iv_cp_diff > 0, 100 * (rows['max_cp_absolute'] - worst_iv_cp) / iv_cp_diff, -1.0)
+
+        self.scores = {
+            "CP": rows['cp'].astype(np.float64),
+            "IV": rows['iv_normalized'],
+            "CP*IV": rows['cp'] * rows['iv_normalized'],
+            "CP+IV": rows['cp'] + rows['iv_normalized'],
+            "FANCY": (rows['iv_normalized'] / 100.0 * score_settings.get("WEIGHT_IV", 0.5)) +
+                     (rows['level'] / (player_level + 1.5) * score_settings.get("WEIGHT_LVL", 0.5)),
+        }
+
+    def _calc_cp(self, species, known, tcpm):
+        """ Pokemon.calc_cp for every row """
+        attk = (_BASE_ATTACK[species] + self.rows['individual_attack']) * tcpm
+        defense = (_BASE_DEFENSE[species] + self.rows['individual_defense']) * tcpm
+        stamina = (_BASE_STAMINA[species] + self.rows['individual_stamina']) * tcpm
+        cp = np.maximum(10, np.floor(np.sqrt(stamina) * attk * np.sqrt(defense) / 10))
+        return np.where(known, cp, 0)
+
+    def order(self, keys=('score',), rows=None):
+        """ row indices, highest first by the given columns like sorted(..., reverse=True) """
+        if rows is None:
+            rows = np.arange(len(self.rows))
+        columns = [-self.rows[key][rows].astype(np.float64) for key in reversed(keys)]
+        return rows[np.lexsort(columns)] if columns else rows
+
+    def by_species(self, keys=('score',)):
+        """ pokemon id -> row indices of that species, highest first by the given columns """
+        columns = [-self.rows[key].astype(np.float64) for key in reversed(keys)]
+        ordered = np.lexsort(columns + [self.rows['pokemon_id']])
+        species = self.rows['pokemon_id'][ordered]
+        bounds = np.flatnonzero(np.diff(species)) + 1
+        return OrderedDict((int(group_species[0]), group) for group_species, group
+                           in zip(np.split(species, bounds), np.split(ordered, bounds)) if len(group))
+
+    def get(self, row):
+        return self.pokemon_factory(self.pokemon_data[row])
+
+    def pokemon(self, rows):
+        return [self.get(row) for row in np.asarray(rows, dtype=np.intp).tolist()]
@@ -10,32 +10,75 @@ import zerorpc
 from time import time
 
 import gevent
-from gevent.coros import BoundedSemaphore
 from six import PY2
 
 from helper.utilities import dict_merge
 from helper.colorlogger import create_logger
+from helper.exceptions import ActionExpired
 from library import api
 from pgoapi.exceptions import AuthException
+from pgoapi.rate_limiter import DEFAULT_INTERVALS, RateLimiter
+from pgoapi.rpc_session import RpcSession
+from pgoapi.wire_debug import WireDebugger
 
 from .config import Config
 from .evolve import Evolve
 from .fort_walker import FortWalker
 from .incubate import Incubate
 from .inventory import Inventory
-from .location import get_location
+from .location import NEIGHBOR_COVERINGS, get_location
 from .map_objects import MapObjects
 from .player import Player as Player
 from .player_stats import PlayerStats
 from .poke_catcher import PokeCatcher
+from .poke_utils import json_default, to_plain
 from .release import Release
+from .scheduler import PRIORITY_INTERACTIVE, PRIORITY_MAIN_LOOP, ActionScheduler
 from .sniper import Sniper
 
+try:
+    import fcntl
+except ImportError:  # windows
+    fcntl = None
+
+# seconds a web listener request may wait for its turn
+WEB_ACTION_TIMEOUT = 60
+
+LISTENERS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), ".listeners")
+
+
+def free_port():
+    s = socket.socket()
+    s.bind(("", 0))  # let the kernel find a free port
+    sock_port = s.getsockname()[1]
+    s.close()
+    return sock_port
+
+
+def register_listeners(listeners):
+    """
+    tells web.py where to reach the bots, maps usernames to a port (or a supervisor entry),
+    the file is locked so the shards of pokesupervisor.py don't overwrite each other's entries
+    """
+    with open(LISTENERS_FILE, 'a+') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)  # released when the file is closed
+        f.seek(0)
+        data = f.read()
+        if PY2:
+            data = json.loads(data.encode() if len(data) > 0 else '{}')
+        else:
+            data = json.loads(data if len(data) > 0 else '{}')
+        data.update(listeners)
+        f.seek(0)
+        f.truncate()
+        f.write(json.dumps(data, indent=2))
+
 
 class Poketrainer(object):
     """ Public functions (without _**) are callable by the webservice! """
 
-    def __init__(self, args):
+    def __init__(self, args, open_socket=True):
 
         self.thread = None
         self.socket = None
@@ -59,7 +102,12 @@ class Poketrainer(object):
 
         self.log = create_logger(__name__, self.config.log_colors["poketrainer".upper()])
 
-        self._open_socket()
+        # every api call of the bot and the web listener runs through here
+        self.scheduler = ActionScheduler()
+
+        # the supervisor serves all of its accounts on one socket
+        if open_socket:
+            self._open_socket()
 
         self.player = Player({})
         self.player_stats = PlayerStats({})
@@ -74,39 +122,34 @@ class Poketrainer(object):
 
         self._origPosF = (0, 0, 0)
         self.api = None
+        # keep-alive connection pool, survives api reloads
+        self.api_session = RpcSession(pool_size=self.config.connection_pool_size,
+                                      max_reconnects=self.config.max_reconnects)
+        # spacing of the RPCs per request class, replaces the fixed sleeps before each call
+        self.rate_limiter = RateLimiter(
+            intervals=dict((request_class, self._scaled_interval(interval))
+                           for request_class, interval in DEFAULT_INTERVALS.items()),
+            sleep=gevent.sleep, checkpoint=self.scheduler.checkpoint)
+        # dumps of the RPC envelopes, survives api reloads as well
+        self.wire_debugger = None
         self._load_api()
 
         # config values that might be changed during runtime
         self.step_size = self.config.step_size
         self.should_catch_pokemon = self.config.should_catch_pokemon
 
-        # threading / locking
-        self.sem = BoundedSemaphore(1)  # gevent
-        self.persist_lock = False
-        self.locker = None
-
     def sleep(self, t):
         # eventlet.sleep(t * self.config.sleep_mult)
         gevent.sleep(t * self.config.sleep_mult)
+        # waiting anyway, let urgent requests of the web listener go first
+        self.scheduler.checkpoint()
+
+    def _scaled_interval(self, interval):
+        return (interval + self.config.extra_wait) * self.config.sleep_mult
 
     def _open_socket(self):
-        desc_file = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), ".listeners")
-        s = socket.socket()
-        s.bind(("", 0))  # let the kernel find a free port
-        sock_port = s.getsockname()[1]
-        s.close()
-        data = {}
-
-        if os.path.isfile(desc_file):
-            with open(desc_file, 'r+') as f:
-                data = f.read()
-                if PY2:
-                    data = json.loads(data.encode() if len(data) > 0 else '{}')
-                else:
-                    data = json.loads(data if len(data) > 0 else '{}')
-        data[self.config.username] = sock_port
-        with open(desc_file, "w+") as f:
-            f.write(json.dumps(data, indent=2))
+        sock_port = free_port()
+        register_listeners({self.config.username: sock_port})
 
         s = zerorpc.Server(self)
         s.bind("tcp://127.0.0.1:%i" % sock_port)  # the free port should still be the same
@@ -148,9 +191,24 @@ class Poketrainer(object):
         self.config = None
         return self._load_config()
 
+    def _load_wire_debugger(self):
+        # a reloaded config may have switched it off or to another file
+        if self.wire_debugger and (not self.config.wire_debug or self.wire_debugger.filename != self.config.wire_debug_file):
+            self._close_wire_debugger()
+        if self.config.wire_debug and self.wire_debugger is None:
+            self.wire_debugger = WireDebugger(self.config.wire_debug_file)
+            self.log.info('Wire debug mode enabled, dumping RPC envelopes to %s', self.config.wire_debug_file)
+        return self.wire_debugger
+
+    def _close_wire_debugger(self):
+        if self.wire_debugger:
+            self.wire_debugger.close()
+            self.wire_debugger = None
+
     def _load_api(self, prev_location=None):
         if self.api is None:
-            self.api = api.pgoapi.PGoApi()
+            self.api = api.pgoapi.PGoApi(session=self.api_session, response_views=self.config.response_views,
+                                         rate_limiter=self.rate_limiter, wire_debugger=self._load_wire_debugger())
             # set signature!
             self.api.activate_signature(
                 os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))), self.cli_args['encrypt_lib'])
@@ -165,6 +223,10 @@ class Poketrainer(object):
             if prev_location:
                 position = prev_location
             self.api.set_position(*position)
+            self.map_objects.load_knowledge(position)
+
+            # the login response has the full inventory
+            self.inventory.reset()
 
             # retry login every 30 seconds if any errors
             self.log.info('Starting Login process...')
@@ -182,33 +244,6 @@ class Poketrainer(object):
         self.api = None
         return self._load_api(prev_location)
 
-    '''
-    Blocking lock
-        - only locks if current thread (greenlet) doesn't own the lock
-        - persist=True will ensure the lock will not be released until the user
-          explicitly sets self.persist_lock=False.
-    '''
-    def thread_lock(self, persist=False):
-        if self.sem.locked():
-            if self.locker == id(gevent.getcurrent()):
-                self.log.debug("Locker is -- %s. No need to re-lock", id(gevent.getcurrent()))
-                return False
-            else:
-                self.log.debug("Already locked by %s. Greenlet %s will wait...", self.locker, id(gevent.getcurrent()))
-        self.sem.acquire()
-        self.persist_lock = persist
-        self.locker = id(gevent.getcurrent())
-        self.log.debug("%s acquired lock (persist=%s)!", self.locker, persist)
-        return True
-
-    '''
-    Releases the lock if needed and the user didn't persist it
-    '''
-    def thread_release(self):
-        if self.sem.locked() and self.locker == id(gevent.getcurrent()) and not self.persist_lock:
-            self.log.debug("%s is now releasing lock", id(gevent.getcurrent()))
-            self.sem.release()
-
     def _callback(self, gt):
         try:
             if not gt.exception:
@@ -219,12 +254,15 @@ class Poketrainer(object):
 
         self.log.exception('Error in main loop %s, restarting at location: %s',
                            gt.exception, self.get_position())
-        # restart after sleep
+        # restart after sleep, the login must not run between the rpcs of a web action
         self.sleep(30)
-        self.reload_config()
-        self.reload_api(self.get_position())
+        self.scheduler.run(self._restart, self.get_position(), priority=PRIORITY_MAIN_LOOP)
         self.start()
 
+    def _restart(self, position):
+        self.reload_config()
+        self.reload_api(position)
+
     def start(self):
         self.thread = gevent.spawn(self._main_loop)
 
@@ -233,6 +271,8 @@ class Poketrainer(object):
     def stop(self):
         if self.thread:
             self.thread.kill()
+        self.scheduler.stop()
+        self._close_wire_debugger()
 
     def _main_loop(self):
         if self.config.enable_caching and self.config.experimental:
@@ -242,18 +282,10 @@ class Poketrainer(object):
                 self.log.info('==== CACHING MODE: ROUTE+SPIN CACHED FORTS ====')
             self.fort_walker.setup_cache()
         while True:
-            # acquire lock for this thread
-            if self.thread_lock(persist=True):
-                try:
-                    self._heartbeat()
-                    self.fort_walker.loop()
-                    self.fort_walker.spin_nearest_fort()
-                    self.poke_catcher.catch_all()
-
-                finally:
-                    # after we're done, release lock
-                    self.persist_lock = False
-                    self.thread_release()
+            # one step at a time, requests of the web listener can go in between
+            for step in (self._heartbeat, self.fort_walker.loop, self.fort_walker.spin_nearest_fort,
+                         self.poke_catcher.catch_all):
+                self.scheduler.run(step, priority=PRIORITY_MAIN_LOOP)
             # self.log.info("COMPLETED A _main_loop")
             self.sleep(1.0)
 
@@ -270,15 +302,15 @@ class Poketrainer(object):
             req.get_player()
             if self._heartbeat_number % 10 == 0:
                 req.check_awarded_badges()
-                req.get_inventory()
+                req.get_inventory(**self.inventory.inventory_request())
             res = req.call()
             if not res or res.get("direction", -1) == 102:
                 self.log.error("There were a problem responses for api call: %s. Restarting!!!", res)
                 self.api.force_refresh_access_token()
                 raise AuthException("Token probably expired?")
 
-        self.log.debug(
-            'Response dictionary: \n\r{}'.format(json.dumps(res, indent=2, default=lambda obj: obj.decode('utf8'))))
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug('Response dictionary: \n\r{}'.format(json.dumps(res, indent=2, default=json_default)))
 
         responses = res.get('responses', {})
         if 'GET_PLAYER' in responses:
@@ -289,15 +321,16 @@ class Poketrainer(object):
 
             # update objects
             self.inventory.update_player_inventory(res=res)
-            for inventory_item in self.inventory.inventory_items:
-                if "player_stats" in inventory_item['inventory_item_data']:
-                    self.player_stats = PlayerStats(
-                        inventory_item['inventory_item_data']['player_stats'],
-                        self.pokemon_caught, self.start_time, self.exp_start
-                    )
-                    if self.exp_start is None:
-                        self.exp_start = self.player_stats.run_exp_start
-                    self.log.info("Player Stats: {}".format(self.player_stats))
+            player_stats = self.inventory.player_stats_data()
+            if player_stats is not None:
+                self.player_stats = PlayerStats(player_stats, self.pokemon_caught, self.start_time, self.exp_start)
+                if self.exp_start is None:
+                    self.exp_start = self.player_stats.run_exp_start
+                self.log.info("Player Stats: {}".format(self.player_stats))
+            self.log.debug("Connection stats: %s", self.api.get_connection_stats())
+            self.log.debug("Cell covering cache: %s", NEIGHBOR_COVERINGS.get_stats())
+            self.log.debug("RPC rate limiter: %s", self.rate_limiter.get_stats())
+            self.log.debug("Inventory syncs: %s", self.inventory.get_sync_stats())
             if self.config.list_inventory_before_cleanup:
                 self.log.info("Player Inventory: %s", self.inventory)
             if not login_response:
@@ -317,10 +350,11 @@ class Poketrainer(object):
             # save data dump
             with open("data_dumps/%s.json" % self.config.username, "w") as f:
                 posf = self.get_position()
-                responses['lat'] = posf[0]
-                responses['lng'] = posf[1]
-                responses['GET_PLAYER']['player_data']['hourly_exp'] = self.player_stats.run_hourly_exp
-                f.write(json.dumps(responses, indent=2, default=lambda obj: obj.decode('utf8')))
+                data_dump = dict((name, to_plain(response)) for name, response in responses.items())
+                data_dump['lat'] = posf[0]
+                data_dump['lng'] = posf[1]
+                data_dump['GET_PLAYER']['player_data']['hourly_exp'] = self.player_stats.run_hourly_exp
+                f.write(json.dumps(data_dump, indent=2, default=json_default))
 
             # Farm precon
             if self.config.farm_items_enabled:
@@ -358,6 +392,8 @@ class Poketrainer(object):
             get_map_objects_min_refresh_seconds = map_settings.get('get_map_objects_min_refresh_seconds', 0.0)  # std. 5.0
             if get_map_objects_min_refresh_seconds != self.map_objects.get_api_rate_limit():
                 self.map_objects.update_rate_limit(get_map_objects_min_refresh_seconds)
+                self.rate_limiter.set_interval('map_objects', max(get_map_objects_min_refresh_seconds,
+                                                                  self._scaled_interval(DEFAULT_INTERVALS['map_objects'])))
 
             """
             fort_settings = settings.get('fort_settings', {})
@@ -399,16 +435,12 @@ class Poketrainer(object):
     """ FOLLOWING ARE FUNCTIONS FOR THE WEB LISTENER """
 
     def release_pokemon_by_id(self, p_id):
-        # acquire lock for this thread
-        if self.thread_lock(persist=True):
-            try:
-                return self.release.do_release_pokemon_by_id(p_id)
-            finally:
-                # after we're done, release lock
-                self.persist_lock = False
-                self.thread_release()
-        else:
-            return 'Only one Simultaneous request allowed'
+        # a single release can go in between the rpcs of a main loop step
+        try:
+            return self.scheduler.run(self.release.do_release_pokemon_by_id, p_id, priority=PRIORITY_INTERACTIVE,
+                                      timeout=WEB_ACTION_TIMEOUT, interrupts=True)
+        except ActionExpired:
+            return 'The bot is busy, try again later'
 
     def current_location(self):
         self.log.info("Web got position: %s", self.get_position())
@@ -424,17 +456,18 @@ class Poketrainer(object):
         return self.player.to_json()
 
     def snipe_pokemon(self, lat, lng):
-        # acquire lock for this thread
-        if self.thread_lock(persist=True):
-            try:
-                return self.sniper.snipe_pokemon(float(lat), float(lng))
-            finally:
-                # after we're done, release lock
-                self.map_objects.wait_for_api_timer()
-                self.persist_lock = False
-                self.thread_release()
-        else:
-            return 'Only one Simultaneous request allowed'
+        # sniping moves the player, so it waits for the current main loop step to finish
+        try:
+            return self.scheduler.run(self._snipe_pokemon, float(lat), float(lng), priority=PRIORITY_INTERACTIVE,
+                                      timeout=WEB_ACTION_TIMEOUT)
+        except ActionExpired:
+            return 'The bot is busy, try again later'
+
+    def _snipe_pokemon(self, lat, lng):
+        try:
+            return self.sniper.snipe_pokemon(lat, lng)
+        finally:
+            self.map_objects.wait_for_api_timer()
 
     def ping(self):
         self.log.info("Responding to ping")
@@ -1,9 +1,12 @@
 from __future__ import absolute_import
 
+from functools import partial
+
 from six import iteritems
 
 from helper.colorlogger import create_logger
 
+from .batch import RequestBatch
 from .release_methods.base import ReleaseMethodFactory
 
 
@@ -20,27 +23,35 @@ class Release(object):
         status = release_res.get('result', -1)
         if not status:
             self.log.debug("Failed to release pokemon id %s, %s", p_id, release_res)
+        elif status == 1:
+            self.parent.inventory.remove_pokemon(int(p_id))
         return status
 
-    def do_release_pokemon(self, pokemon):
-        self.log.debug("Releasing pokemon: %s", pokemon)
-        self.parent.sleep(1.0 + self.parent.config.extra_wait)
-        if self.do_release_pokemon_by_id(pokemon.id):
+    def _released(self, pokemon, release_res):
+        if release_res.get('result', -1) == 1:
             self.log.info("Successfully Released Pokemon %s", pokemon)
+            self.parent.inventory.remove_pokemon(pokemon.id)
         else:
+            self.parent.inventory.mark_diverged(items=False)
+            self.log.debug("Failed to release pokemon id %s, %s", pokemon.id, release_res)
             self.log.info("Failed to release Pokemon %s", pokemon)
 
     def cleanup_pokemon(self):
-        caught_pokemon = self.parent.inventory.get_caught_pokemon_by_family()
+        self.parent.inventory.sync(pokemon=True)
+        pokemon_table = self.parent.inventory.get_pokemon_table()
         release_method = self.release_method_factory.get_release_method()
-        for pokemon_family_id, pokemon_list in iteritems(caught_pokemon):
-            pokemon_to_release, pokemon_to_keep = release_method.get_pokemon_to_release(pokemon_family_id, pokemon_list)
+        batch = RequestBatch(self.parent)
+        for pokemon_id, rows in iteritems(pokemon_table.by_species()):
+            rows_to_release, rows_to_keep = release_method.get_rows_to_release(pokemon_id, pokemon_table, rows)
 
+            # Pokemon objects only for the pokemon which are logged or released
             if self.parent.config.pokemon_cleanup_testing_mode:
-                for pokemon in pokemon_to_release:
+                for pokemon in pokemon_table.pokemon(rows_to_release):
                     self.log.info("(TESTING) Would release pokemon: %s", pokemon)
-                for pokemon in pokemon_to_keep:
+                for pokemon in pokemon_table.pokemon(rows_to_keep):
                     self.log.info("(TESTING) Would keep pokemon: %s", pokemon)
             else:
-                for pokemon in pokemon_to_release:
-                    self.do_release_pokemon(pokemon)
+                for pokemon in pokemon_table.pokemon(rows_to_release):
+                    self.log.debug("Releasing pokemon: %s", pokemon)
+                    batch.add('release_pokemon', partial(self._released, pokemon), pokemon_id=int(pokemon.id))
+        batch.flush()
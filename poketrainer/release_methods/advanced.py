@@ -1,6 +1,7 @@
-import base
 from library.api.pgoapi.protos.POGOProtos import Enums_pb2
 
+from . import base
+
 
 class ReleaseMethod(base.ReleaseMethod):
 
@@ -14,6 +15,9 @@ class ReleaseMethod(base.ReleaseMethod):
     def get_pokemon_to_release(self, pokemon_id, pokemons):
         pokemon_to_release = []
         pokemon_to_keep = []
+        # the inventory reuses its Pokemon objects, a pokemon kept before is not necessarily kept again
+        for pokemon in pokemons:
+            pokemon.try_keep = False
 
         if len(pokemons) > self.min_similar_pokemon:
             # sorting for CLASSIC method as default
@@ -74,3 +74,24 @@ class ReleaseMethod(object):
                 (list, list): first list is pokemon that are slated for transfer, second list is pokemon that are not to keep
         """
         raise NotImplemented("get_pokemon_to_release() must be implemented in all transfer helpers")
+
+    def get_rows_to_release(self, pokemon_id, pokemon_table, rows):
+        """Like get_pokemon_to_release, for the rows of a PokemonTable
+
+            Release methods which only need the table columns override this, so Pokemon objects are
+            only built for the pokemon actually released. This one builds them for every row.
+
+            Args:
+                pokemon_id   (int): integer pokemon id
+                pokemon_table (PokemonTable): the caught pokemon
+                rows        (array): row indices of all the caught pokemon of given pokemon id
+
+            Returns:
+                (list, list): first list is the rows of the pokemon to transfer, second the rows of those to keep
+        """
+        rows = rows.tolist()
+        pokemons = pokemon_table.pokemon(rows)
+        row_by_pokemon = dict((id(pokemon), row) for pokemon, row in zip(pokemons, rows))
+        pokemon_to_release, pokemon_to_keep = self.get_pokemon_to_release(pokemon_id, pokemons)
+        return [row_by_pokemon[id(pokemon)] for pokemon in pokemon_to_release], \
+            [row_by_pokemon[id(pokemon)] for pokemon in pokemon_to_keep]
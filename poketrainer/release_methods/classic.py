@@ -1,8 +1,9 @@
 import logging
 
-import base
 from library.api.pgoapi.protos.POGOProtos import Enums_pb2
 
+from . import base
+
 logger = logging.getLogger(__name__)
 
 
@@ -10,15 +11,16 @@ class ReleaseMethod(base.ReleaseMethod):
 
     def process_config(self, config):
         self.config = config
-        self.keep_pokemon_ids = map(lambda x: getattr(Enums_pb2, x), config.get("KEEP_POKEMON_NAMES", []))
-        self.throw_pokemon_ids = map(lambda x: getattr(Enums_pb2, x), config.get("THROW_POKEMON_NAMES", []))
+        self.keep_pokemon_ids = set(getattr(Enums_pb2, x) for x in config.get("KEEP_POKEMON_NAMES", []))
+        self.throw_pokemon_ids = set(getattr(Enums_pb2, x) for x in config.get("THROW_POKEMON_NAMES", []))
         self.keep_cp_over = self.config.get('RELEASE_METHOD_CLASSIC', {}).get('KEEP_CP_OVER', 0)
         self.keep_iv_over = self.config.get('RELEASE_METHOD_CLASSIC', {}).get('KEEP_IV_OVER', 0)
         self.prefer = self.config.get('RELEASE_METHOD_CLASSIC', {}).get('PREFER', 'CP')
         self.max_similar_pokemon = self.config.get('MAX_SIMILAR_POKEMON', 999)
         self.min_similar_pokemon = self.config.get('MIN_SIMILAR_POKEMON', 1)
 
-        self.sort_key = lambda x: (x.cp, x.iv) if self.prefer == 'CP' else lambda x: (x.iv, x.cp)
+        self.sort_keys = ('cp', 'iv') if self.prefer == 'CP' else ('iv', 'cp')
+        self.sort_key = lambda x: tuple(getattr(x, key) for key in self.sort_keys)
 
     def get_pokemon_to_release(self, pokemon_id, pokemons):
         pokemon_to_release = []
@@ -39,17 +41,39 @@ class ReleaseMethod(base.ReleaseMethod):
             pokemon_to_keep = pokemons
         return pokemon_to_release, pokemon_to_keep
 
+    def get_rows_to_release(self, pokemon_id, pokemon_table, rows):
+        # the same as get_pokemon_to_release, from the columns of the table
+        if len(rows) <= self.min_similar_pokemon:
+            return [], rows.tolist()
+        sorted_rows = pokemon_table.order(self.sort_keys, rows)
+        rows_to_release = []
+        rows_to_keep = sorted_rows[0:self.min_similar_pokemon].tolist()
+        kept_pokemon_of_type = self.min_similar_pokemon
+        candidates = pokemon_table.rows[sorted_rows[self.min_similar_pokemon:]]
+        for row, is_favorite, cp, iv in zip(sorted_rows[self.min_similar_pokemon:].tolist(), candidates['is_favorite'].tolist(),
+                                            candidates['cp'].tolist(), candidates['iv'].tolist()):
+            if self._is_eligible_for_transfer(pokemon_id, is_favorite, cp, iv, kept_pokemon_of_type):
+                rows_to_release.append(row)
+            else:
+                rows_to_keep.append(row)
+                kept_pokemon_of_type += 1
+        return rows_to_release, rows_to_keep
+
     def is_pokemon_eligible_for_transfer(self, pokemon, best_pokemon=None, kept_pokemon_of_type=0, kept_pokemon_of_type_high_iv=0):
+        return self._is_eligible_for_transfer(pokemon.pokemon_id, pokemon.is_favorite, pokemon.cp, pokemon.iv,
+                                              kept_pokemon_of_type)
+
+    def _is_eligible_for_transfer(self, pokemon_id, is_favorite, cp, iv, kept_pokemon_of_type):
         # never release favorites
-        if pokemon.is_favorite:
+        if is_favorite:
             return False
         # keep defined pokemon unless we are above MAX_SIMILAR_POKEMON
-        if pokemon.pokemon_id in self.keep_pokemon_ids and kept_pokemon_of_type <= self.max_similar_pokemon:
+        if pokemon_id in self.keep_pokemon_ids and kept_pokemon_of_type <= self.max_similar_pokemon:
             return False
         # release defined throwaway pokemons
-        if pokemon.pokemon_id in self.throw_pokemon_ids:
+        if pokemon_id in self.throw_pokemon_ids:
             return True
         # CLASSIC fallback method
-        if pokemon.cp > self.keep_cp_over or pokemon.iv > self.keep_iv_over:
+        if cp > self.keep_cp_over or iv > self.keep_iv_over:
             return False
         return True
@@ -3,9 +3,10 @@ import logging
 
 from six import iteritems
 
-import base
 from library.api.pgoapi.protos.POGOProtos import Enums_pb2
 
+from . import base
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,7 +40,7 @@ class ReleaseMethod(base.ReleaseMethod):
             self.handlers[poke_id] = self.release_method_factory.load_release_method(release_method, cfg)
 
     def get_pokemon_to_release(self, pokemon_id, pokemons):
-        if pokemon_id in self.handlers:
-            return self.handlers[pokemon_id].get_pokemon_to_release(pokemon_id, pokemons)
-        else:
-            return self.default_handler.get_pokemon_to_release(pokemon_id, pokemons)
+        return self.handlers.get(pokemon_id, self.default_handler).get_pokemon_to_release(pokemon_id, pokemons)
+
+    def get_rows_to_release(self, pokemon_id, pokemon_table, rows):
+        return self.handlers.get(pokemon_id, self.default_handler).get_rows_to_release(pokemon_id, pokemon_table, rows)
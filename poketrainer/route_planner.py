@@ -0,0 +1,151 @@
+from __future__ import absolute_import
+
+from time import time
+
+import gevent
+import numpy as np
+
+from . import geo
+
+# improvements smaller than this (in meters) are not worth another pass
+MIN_GAIN = 1e-3
+# segment lengths tried by or-opt
+OR_OPT_SEGMENTS = (1, 2, 3)
+# above this many points the distance matrix is kept in float32 (5k points: 100MB instead of 200MB)
+FLOAT32_THRESHOLD = 2000
+
+
+def plan_route(points, start=None, closed=True, time_budget=1.0, distance_mode=geo.HAVERSINE, max_points=None):
+    """
+    Orders (lat, lng) points to minimize the walking distance.
+
+    The route begins at the point nearest to start (the first point without start) and is
+    built greedily from nearest neighbours, then improved with 2-opt and or-opt moves until
+    no move helps or time_budget seconds are used. A closed route returns to its first point.
+    With max_points only the points nearest to start are planned, the others follow them
+    nearest first and are not part of the length.
+
+    The improvement passes yield to the other greenlets between moves.
+
+    Returns the point indices in walking order and the route length in meters.
+    """
+    if max_points is not None and start is not None and len(points) > max_points:
+        nearest = np.argsort(geo.distances_from(start, points, distance_mode), kind='mergesort')
+        planned = nearest[:max_points]
+        order, length = plan_route([points[i] for i in planned], start, closed, time_budget, distance_mode)
+        return planned[order].tolist() + nearest[max_points:].tolist(), length
+
+    if len(points) < 2:
+        return list(range(len(points))), 0.0
+
+    dtype = np.float32 if len(points) > FLOAT32_THRESHOLD else np.float64
+    distances = geo.distance_matrix(points, distance_mode, dtype=dtype)
+    first = 0 if start is None else int(np.argmin(geo.distances_from(start, points, distance_mode)))
+    tour = nearest_neighbor_tour(distances, first)
+
+    deadline = time() + time_budget
+    improved = True
+    while improved and time() < deadline:
+        improved = _two_opt(distances, tour, closed, deadline)
+        improved = _or_opt(distances, tour, closed, deadline) or improved
+    return tour.tolist(), route_length(distances, tour, closed)
+
+
+def nearest_neighbor_tour(distances, first=0):
+    n = len(distances)
+    tour = np.empty(n, dtype=np.intp)
+    tour[0] = first
+    unvisited = np.ones(n, dtype=bool)
+    unvisited[first] = False
+    for k in range(1, n):
+        row = np.where(unvisited, distances[tour[k - 1]], np.inf)
+        tour[k] = np.argmin(row)
+        unvisited[tour[k]] = False
+    return tour
+
+
+def route_length(distances, tour, closed=True):
+    length = float(distances[tour[:-1], tour[1:]].sum())
+    if closed and len(tour) > 1:
+        length += float(distances[tour[-1], tour[0]])
+    return length
+
+
+def _two_opt(distances, tour, closed, deadline):
+    # replace the edges (a, b) and (c, d) by (a, c) and (b, d), reversing the path from b to c;
+    # tour[0] never moves
+    n = len(tour)
+    improved = False
+    for i in range(n - 2):
+        if time() >= deadline:
+            break
+        gevent.sleep(0)
+        a, b = tour[i], tour[i + 1]
+        js = np.arange(i + 2, n)
+        c = tour[js]
+        if closed:
+            d = tour[(js + 1) % n]
+            delta = distances[a, c] + distances[b, d] - distances[a, b] - distances[c, d]
+            if i == 0:
+                # (c, d) would be the edge back to a
+                delta[-1] = np.inf
+        else:
+            # the last point has no outgoing edge, reversing the tail only changes (a, b)
+            d = tour[np.minimum(js + 1, n - 1)]
+            delta = distances[a, c] - distances[a, b]
+            delta[:-1] += distances[b, d[:-1]] - distances[c[:-1], d[:-1]]
+        best = int(np.argmin(delta))
+        if delta[best] < -MIN_GAIN:
+            j = js[best]
+            tour[i + 1:j + 1] = tour[i + 1:j + 1][::-1].copy()
+            improved = True
+    return improved
+
+
+def _or_opt(distances, tour, closed, deadline):
+    # move a short segment (possibly reversed) between two other neighbouring points;
+    # tour[0] never moves
+    n = len(tour)
+    improved = False
+    for length in OR_OPT_SEGMENTS:
+        i = 1
+        while i + length <= n and n - length >= 2:
+            if time() >= deadline:
+                return improved
+            gevent.sleep(0)
+            segment = tour[i:i + length]
+            s0, s1 = segment[0], segment[-1]
+            p = tour[i - 1]
+            rest = np.concatenate((tour[:i], tour[i + length:]))
+            if i + length < n or closed:
+                nx = tour[(i + length) % n]
+                removed = distances[p, s0] + distances[s1, nx] - distances[p, nx]
+            else:
+                removed = distances[p, s0]
+
+            c = rest
+            if closed:
+                d = np.roll(rest, -1)
+                forward = distances[c, s0] + distances[s1, d] - distances[c, d]
+                backward = distances[c, s1] + distances[s0, d] - distances[c, d]
+            else:
+                # inserting after the last point only adds an edge
+                d = np.append(rest[1:], rest[-1])
+                forward = distances[c, s0] + distances[s1, d] - distances[c, d]
+                backward = distances[c, s1] + distances[s0, d] - distances[c, d]
+                forward[-1] = distances[c[-1], s0]
+                backward[-1] = distances[c[-1], s1]
+            # inserting where it was removed changes nothing
+            forward[i - 1] = backward[i - 1] = np.inf
+
+            k_forward, k_backward = int(np.argmin(forward)), int(np.argmin(backward))
+            if forward[k_forward] <= backward[k_backward]:
+                k, cost, moved = k_forward, forward[k_forward], segment
+            else:
+                k, cost, moved = k_backward, backward[k_backward], segment[::-1]
+            if cost < removed - MIN_GAIN:
+                tour[:] = np.concatenate((rest[:k + 1], moved, rest[k + 1:]))
+                improved = True
+            else:
+                i += 1
+    return improved
@@ -0,0 +1,140 @@
+from __future__ import absolute_import
+
+import heapq
+import itertools
+from contextlib import contextmanager
+from time import time
+
+import gevent
+from gevent.event import AsyncResult, Event
+
+from helper.colorlogger import create_logger
+from helper.exceptions import ActionExpired
+
+# lower runs first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_MAINTENANCE = 5
+PRIORITY_MAIN_LOOP = 10
+
+
+class Action(object):
+    __slots__ = ('priority', 'deadline', 'interrupts', 'func', 'args', 'result', 'submitted', 'name')
+
+    def __init__(self, func, args, priority, deadline, interrupts):
+        self.func = func
+        self.args = args
+        self.priority = priority
+        self.deadline = deadline
+        self.interrupts = interrupts
+        self.result = AsyncResult()
+        self.submitted = time()
+        self.name = getattr(func, '__name__', repr(func))
+
+
+class ActionScheduler(object):
+    """
+    Executes the actions of one account one after another, most important first.
+
+    The main loop submits its steps (heartbeat, walk, spin, catch) one by one, so actions of the
+    web listener run between two steps instead of after a whole iteration. Actions submitted
+    with interrupts=True even run inside a step, at its next checkpoint (Poketrainer.sleep, and
+    the rate limiter before every RPC), except while the step is uninterrupted(). Actions not
+    started before their deadline fail with ActionExpired.
+    """
+
+    def __init__(self):
+        self.log = create_logger(__name__)
+        self._queue = []
+        self._counter = itertools.count()
+        self._ready = Event()
+        self._running = []
+        self._worker = None
+        self._uninterrupted = 0
+        self.executed = 0
+        self.expired = 0
+        self.max_wait = 0.0
+
+    def start(self):
+        if self._worker is None or self._worker.dead:
+            self._worker = gevent.spawn(self._work)
+
+    def stop(self):
+        running = list(self._running)
+        if self._worker is not None:
+            self._worker.kill()
+            self._worker = None
+        for action in running:
+            if not action.result.ready():
+                action.result.set_exception(ActionExpired('%s was cancelled, the scheduler stopped' % action.name))
+        self._running = []
+        while self._queue:
+            action = heapq.heappop(self._queue)[-1]
+            action.result.set_exception(ActionExpired('%s was cancelled, the scheduler stopped' % action.name))
+
+    def submit(self, func, *args, **kwargs):
+        """ queues func(*args), returns an AsyncResult. Options: priority, timeout (seconds), interrupts """
+        priority = kwargs.pop('priority', PRIORITY_MAIN_LOOP)
+        timeout = kwargs.pop('timeout', None)
+        interrupts = kwargs.pop('interrupts', False)
+        if kwargs:
+            raise TypeError('Unknown options %s' % ', '.join(kwargs))
+        action = Action(func, args, priority, time() + timeout if timeout is not None else None, interrupts)
+        heapq.heappush(self._queue, (priority, next(self._counter), action))
+        self._ready.set()
+        self.start()
+        return action.result
+
+    def run(self, func, *args, **kwargs):
+        """ like submit, but waits for and returns the result (or raises the exception) """
+        if gevent.getcurrent() is self._worker:
+            # an action scheduling another one would wait for itself
+            return func(*args)
+        return self.submit(func, *args, **kwargs).get()
+
+    def checkpoint(self):
+        """ runs the queued interrupting actions more important than the currently executed one """
+        if gevent.getcurrent() is not self._worker or not self._running or self._uninterrupted:
+            return
+        while self._queue:
+            priority, _, action = self._queue[0]
+            if not action.interrupts or priority >= self._running[-1].priority:
+                break
+            heapq.heappop(self._queue)
+            self._execute(action)
+
+    @contextmanager
+    def uninterrupted(self):
+        """ the checkpoints inside are skipped, for work based on state an interrupting action could change """
+        self._uninterrupted += 1
+        try:
+            yield
+        finally:
+            self._uninterrupted -= 1
+
+    def get_stats(self):
+        return {'queued': len(self._queue), 'executed': self.executed, 'expired': self.expired,
+                'max_wait': self.max_wait}
+
+    def _work(self):
+        while True:
+            if not self._queue:
+                self._ready.clear()
+                self._ready.wait()
+                continue
+            self._execute(heapq.heappop(self._queue)[-1])
+
+    def _execute(self, action):
+        now = time()
+        if action.deadline is not None and now > action.deadline:
+            self.expired += 1
+            action.result.set_exception(ActionExpired('%s was not started within its deadline' % action.name))
+            return
+        self.max_wait = max(self.max_wait, now - action.submitted)
+        self._running.append(action)
+        try:
+            action.result.set(action.func(*action.args))
+        except Exception as e:
+            action.result.set_exception(e)
+        finally:
+            self._running.pop()
+            self.executed += 1
@@ -3,7 +3,7 @@ from __future__ import absolute_import
 from helper.colorlogger import create_logger
 from helper.utilities import flat_map
 
-from .location import distance_in_meters
+from . import geo
 from .pokedex import pokedex
 from .pokemon import POKEMON_NAMES
 
@@ -44,12 +44,12 @@ class Sniper(object):
             pokemons = flat_map(lambda c: c.get('catchable_pokemons', []), map_cells)
 
             # catch first pokemon:
+            distances = geo.distances_from(self.parent.get_position(),
+                                           [(pokemon['latitude'], pokemon['longitude']) for pokemon in pokemons],
+                                           self.parent.config.distance_mode)
             pokemon_rarity_and_dist = [
-                (
-                    pokemon, pokedex.get_rarity_by_id(pokemon['pokemon_id']),
-                    distance_in_meters(self.parent.get_position(), (pokemon['latitude'], pokemon['longitude']))
-                )
-                for pokemon in pokemons]
+                (pokemon, pokedex.get_rarity_by_id(pokemon['pokemon_id']), float(distance))
+                for pokemon, distance in zip(pokemons, distances)]
             pokemon_rarity_and_dist.sort(key=lambda x: x[1], reverse=True)
 
             if pokemon_rarity_and_dist:
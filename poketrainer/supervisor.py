@@ -0,0 +1,129 @@
+from __future__ import absolute_import
+
+from time import time
+
+import gevent
+import zerorpc
+
+from helper.colorlogger import create_logger
+
+from .poketrainer import Poketrainer, free_port, register_listeners
+
+try:
+    import resource
+except ImportError:  # windows
+    resource = None
+
+# seconds to wait before an account that failed to start is tried again
+RESTART_DELAY = 60
+
+
+class Supervisor(object):
+    """
+    Runs the main loops of many accounts as greenlets of one process, with one RPC socket.
+
+    An account that fails to start is retried on its own, a crashing main loop is restarted
+    by its Poketrainer, the other accounts keep running either way.
+
+    Public functions (without _**) are callable by the webservice!
+    """
+
+    def __init__(self, args, config_indices):
+        self.args = args
+        self.config_indices = config_indices
+        self.log = create_logger(__name__, color='red')
+        self.start_time = time()
+        self.socket = None
+        self.sock_port = None
+        # config index -> Poketrainer, once logged in
+        self._bots = {}
+        self._usernames = {}
+        self._failures = dict((index, 0) for index in config_indices)
+        self._starters = {}
+
+    def start(self):
+        self._open_socket()
+        for index in self.config_indices:
+            self._starters[index] = gevent.spawn(self._start_account, index)
+
+    def stop(self):
+        gevent.killall(list(self._starters.values()))
+        for bot in self._bots.values():
+            bot.stop()
+        if self.socket:
+            self.socket.kill()
+
+    def _open_socket(self):
+        self.sock_port = free_port()
+        s = zerorpc.Server(self)
+        s.bind("tcp://127.0.0.1:%i" % self.sock_port)
+        self.socket = gevent.spawn(s.run)
+
+    def _start_account(self, index):
+        args = dict(self.args, config_index=index)
+        while True:
+            try:
+                bot = Poketrainer(args, open_socket=False)
+                break
+            except gevent.GreenletExit:
+                raise
+            except Exception as e:
+                self._failures[index] += 1
+                self.log.exception('Account %s could not be started (%s), retrying in %s seconds', index, e, RESTART_DELAY)
+                gevent.sleep(RESTART_DELAY)
+
+        self._bots[index] = bot
+        self._usernames[bot.config.username] = index
+        register_listeners({bot.config.username: {'port': self.sock_port, 'supervisor': True}})
+        bot.start()
+        self.log.info('Account %s (%s) is running', index, bot.config.username)
+
+    def _bot(self, username):
+        index = self._usernames.get(username)
+        if index is None:
+            raise ValueError("There is no bot running with username '%s'!" % username)
+        return self._bots[index]
+
+    def accounts(self):
+        return sorted(self._usernames)
+
+    def call(self, username, method, *args):
+        """ calls a public function of one account, like its own socket would """
+        if method.startswith('_'):
+            raise ValueError("%s is not a public function" % method)
+        return getattr(self._bot(username), method)(*args)
+
+    def metrics(self):
+        accounts = []
+        for index in self.config_indices:
+            bot = self._bots.get(index)
+            account = {'config_index': index, 'failures': self._failures[index], 'running': False}
+            if bot is not None:
+                account.update({
+                    'username': bot.config.username,
+                    'running': bool(bot.thread and not bot.thread.dead),
+                    'pokemon_caught': bot.pokemon_caught,
+                    'uptime': time() - bot.start_time,
+                })
+            accounts.append(account)
+
+        running = sum(1 for account in accounts if account['running'])
+        totals = {
+            'accounts': len(accounts),
+            'running': running,
+            'pokemon_caught': sum(account.get('pokemon_caught', 0) for account in accounts),
+            'uptime': time() - self.start_time,
+        }
+        if resource is not None:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            # ru_maxrss is in KB on linux
+            totals['max_rss_mb'] = usage.ru_maxrss / 1024.0
+            totals['cpu_seconds'] = usage.ru_utime + usage.ru_stime
+            if running:
+                totals['max_rss_mb_per_account'] = totals['max_rss_mb'] / running
+                totals['cpu_ms_per_account_second'] = totals['cpu_seconds'] * 1000 / running / totals['uptime']
+        return {'totals': totals, 'accounts': accounts}
+
+    def ping(self):
+        self.log.info("Responding to ping")
+        return "pong"
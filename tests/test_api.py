@@ -62,3 +62,19 @@ class TestPokemon(unittest.TestCase):
         self.assertEqual(round(p.max_cp), 675)
         self.assertEqual(p.score, 546)
         self.assertEqual(round(p.iv_normalized), 69)
+
+    def test_level_tables(self):
+        p = Pokemon(mock_caught_eevee, 22, 'CP', {})
+        for half_level in range(2, 81):
+            level = half_level / 2.0
+            self.assertEqual(p.get_level_by_cpm(p.get_cpm_by_level(level)), level)
+        self.assertAlmostEqual(p.get_cpm_by_level(0.5), 0.0665, places=4)
+        self.assertEqual(p.get_cpm_by_level(41), 0.0)
+        self.assertEqual(p.get_level_by_cpm(0.9), 0.0)
+
+    def test_to_dict(self):
+        p = Pokemon(mock_caught_eevee, 22, 'CP', {})
+        self.assertFalse(hasattr(p, '__dict__'))
+        self.assertNotIn('pokemon_data', p.to_dict())
+        self.assertEqual(p.to_dict()['level'], 19.0)
+        self.assertEqual(p.to_dict(('id', 'cp')), {'id': mock_caught_eevee['id'], 'cp': 546})
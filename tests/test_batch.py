@@ -0,0 +1,92 @@
+import unittest
+
+from poketrainer.batch import RequestBatch
+from poketrainer.scheduler import ActionScheduler
+
+
+class FakeRequest(object):
+
+    def __init__(self, api):
+        self.api = api
+        self.methods = []
+
+    def __getattr__(self, method):
+        def add(**kwargs):
+            self.methods.append((method, kwargs))
+        return add
+
+    def call(self):
+        self.api.envelopes.append(self.methods)
+        sub_responses = [{'result': 1, 'id': kwargs.get('pokemon_id')} for _, kwargs in self.methods]
+        return {'responses': {'GET_INVENTORY': {}}, 'sub_responses': sub_responses}
+
+
+class FakeApi(object):
+
+    def __init__(self):
+        self.envelopes = []
+
+    def create_request(self):
+        return FakeRequest(self)
+
+
+class FakeInventory(object):
+
+    def __init__(self):
+        self.updates = []
+
+    def inventory_request(self):
+        return {'last_timestamp_ms': 42}
+
+    def update_player_inventory(self, res=None):
+        self.updates.append(res)
+
+
+class FakeParent(object):
+
+    def __init__(self):
+        self.api = FakeApi()
+        self.inventory = FakeInventory()
+        self.scheduler = ActionScheduler()
+
+
+class TestRequestBatch(unittest.TestCase):
+
+    def test_flush_splits_envelopes_and_demultiplexes(self):
+        parent = FakeParent()
+        batch = RequestBatch(parent, max_size=3)
+        results = []
+        for pokemon_id in range(5):
+            batch.add('release_pokemon', results.append, pokemon_id=pokemon_id)
+
+        self.assertEqual(batch.flush(refresh_inventory=True), 2)
+        self.assertEqual(len(batch), 0)
+        # no envelope holds more than max_size sub-requests, the inventory included
+        self.assertEqual([len(envelope) for envelope in parent.api.envelopes], [3, 3])
+        # the inventory is fetched once, with the last envelope
+        self.assertEqual(parent.api.envelopes[-1][-1], ('get_inventory', {'last_timestamp_ms': 42}))
+        self.assertEqual(len(parent.inventory.updates), 1)
+        self.assertEqual([result['id'] for result in results], [0, 1, 2, 3, 4])
+
+    def test_inventory_gets_its_own_envelope_when_full(self):
+        parent = FakeParent()
+        batch = RequestBatch(parent, max_size=3)
+        for pokemon_id in range(3):
+            batch.add('release_pokemon', pokemon_id=pokemon_id)
+        self.assertEqual(batch.flush(refresh_inventory=True), 2)
+        self.assertEqual(parent.api.envelopes[-1], [('get_inventory', {'last_timestamp_ms': 42})])
+        self.assertEqual(len(parent.inventory.updates), 1)
+
+    def test_flush_without_inventory(self):
+        parent = FakeParent()
+        batch = RequestBatch(parent, max_size=3)
+        batch.add('recycle_inventory_item', item_id=1, count=2)
+        self.assertEqual(batch.flush(), 1)
+        self.assertEqual(parent.api.envelopes, [[('recycle_inventory_item', {'item_id': 1, 'count': 2})]])
+        self.assertEqual(parent.inventory.updates, [])
+
+    def test_empty_flush_sends_nothing(self):
+        parent = FakeParent()
+        self.assertEqual(RequestBatch(parent, max_size=3).flush(), 0)
+        self.assertEqual(parent.api.envelopes, [])
+        self.assertEqual(parent.inventory.updates, [])
@@ -0,0 +1,78 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from poketrainer.fort_cache import FortCacheStore
+
+
+def fort(fort_id):
+    return {'id': fort_id, 'latitude': 40.0, 'longitude': -73.0, 'type': 1, 'enabled': True}
+
+
+class TestFortCacheStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'cache', 'forts.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def lines(self):
+        with open(self.filename) as handle:
+            return handle.read().splitlines()
+
+    def test_appends_new_forts_only(self):
+        store = FortCacheStore(self.filename).load()
+        self.assertEqual(store.add([fort('a'), fort('b')]), 2)
+        self.assertEqual(store.add([fort('b'), fort('c')]), 1)
+        self.assertEqual(len(self.lines()), 3)
+        self.assertEqual(store.get('a'), {'id': 'a', 'latitude': 40.0, 'longitude': -73.0})
+
+        loaded = FortCacheStore(self.filename).load()
+        self.assertEqual([f['id'] for f in loaded.forts()], ['a', 'b', 'c'])
+
+    def test_compact_stores_order(self):
+        store = FortCacheStore(self.filename).load()
+        store.add([fort('a'), fort('b'), fort('c')])
+        store.compact(order=['c', 'a'])
+        self.assertEqual([f['id'] for f in store.forts()], ['c', 'a', 'b'])
+        self.assertEqual([f['id'] for f in FortCacheStore(self.filename).load().forts()], ['c', 'a', 'b'])
+        self.assertEqual(os.listdir(os.path.dirname(self.filename)), ['forts.jsonl'])
+
+    def test_load_skips_partial_lines_and_compacts_duplicates(self):
+        store = FortCacheStore(self.filename).load()
+        store.add([fort('a')])
+        with open(self.filename, 'a') as handle:
+            handle.write(FortCacheStore._dumps({'id': 'a', 'latitude': 41.0, 'longitude': -73.0}) * 3 + '{"id": "b", "lat')
+        loaded = FortCacheStore(self.filename, compact_garbage=2).load()
+        self.assertEqual(loaded.forts(), [{'id': 'a', 'latitude': 41.0, 'longitude': -73.0}])
+        self.assertEqual(len(self.lines()), 1)
+
+    def test_add_after_partial_line(self):
+        store = FortCacheStore(self.filename).load()
+        store.add([fort('a')])
+        with open(self.filename, 'a') as handle:
+            handle.write('{"id": "b", "lat')
+        loaded = FortCacheStore(self.filename).load()
+        self.assertEqual(loaded.add([fort('c'), fort('d')]), 2)
+        self.assertEqual([f['id'] for f in FortCacheStore(self.filename).load().forts()], ['a', 'c', 'd'])
+
+    def test_read_only_never_writes(self):
+        store = FortCacheStore(self.filename, read_only=True).load()
+        store.add([fort('a')])
+        store.compact()
+        self.assertIn('a', store)
+        self.assertFalse(os.path.exists(self.filename))
+
+    def test_import_pickle(self):
+        old_filename = os.path.join(self.directory, 'old')
+        with open(old_filename, 'wb') as handle:
+            pickle.dump([(fort('a'), 10.0), (fort('b'), 20.0)], handle)
+        store = FortCacheStore(self.filename).load()
+        self.assertEqual(store.import_pickle(old_filename), 2)
+        self.assertEqual(len(self.lines()), 2)
+        # only the forts which were not cached yet
+        self.assertEqual(store.import_pickle(old_filename), 0)
@@ -0,0 +1,51 @@
+import unittest
+
+from poketrainer.fort_index import FortIndex
+
+ORIGIN = (40.7589, -73.9851)
+CELL_A = 9926595690777296896
+CELL_B = 9926595695072264192
+NOW_MS = 1470000000000
+
+
+def fort(fort_id, lat_offset, cooldown=0, fort_type=1):
+    return {'id': fort_id, 'type': fort_type, 'enabled': True, 'latitude': ORIGIN[0] + lat_offset,
+            'longitude': ORIGIN[1], 'cooldown_complete_timestamp_ms': cooldown}
+
+
+class TestFortIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = FortIndex()
+        # ~111m per 0.001 degree latitude
+        self.index.update([
+            {'s2_cell_id': CELL_A, 'forts': [fort('a', 0.001), fort('b', 0.005), fort('gym', 0.002, fort_type=0)]},
+            {'s2_cell_id': CELL_B, 'forts': [fort('c', -0.02), fort('d', 0.1), fort('e', 0.003, cooldown=NOW_MS + 1)]},
+        ])
+
+    def test_within_radius(self):
+        forts = self.index.within(ORIGIN, 600)
+        self.assertEqual([f['id'] for f, _ in forts], ['a', 'gym', 'e', 'b'])
+        self.assertAlmostEqual(forts[0][1], 111, delta=1)
+        self.assertEqual(len(self.index.within(ORIGIN)), 6)
+
+    def test_nearest(self):
+        self.assertEqual([f['id'] for f, _ in self.index.nearest(ORIGIN, 2)], ['a', 'gym'])
+        self.assertEqual([f['id'] for f, _ in self.index.nearest(ORIGIN, 3, spinnable=True, now_ms=NOW_MS)],
+                         ['a', 'b', 'c'])
+        self.assertEqual(len(self.index.nearest(ORIGIN, 10)), 6)
+
+    def test_spinnable_within_proximity(self):
+        position = (ORIGIN[0] + 0.006, ORIGIN[1])
+        forts = self.index.spinnable(position, ORIGIN, 1000, now_ms=NOW_MS)
+        self.assertEqual([f['id'] for f, _ in forts], ['b', 'a'])
+        self.index.mark_visited({'id': 'b'})
+        self.index.set_cooldown('a', NOW_MS + 1)
+        self.assertEqual(self.index.spinnable(position, ORIGIN, 1000, now_ms=NOW_MS), [])
+        self.assertEqual([f['id'] for f, _ in self.index.spinnable(position, now_ms=NOW_MS)], ['c', 'd'])
+
+    def test_polled_cell_replaces_its_forts(self):
+        self.index.update([{'s2_cell_id': CELL_A, 'forts': [fort('a', 0.001)]},
+                           {'s2_cell_id': CELL_B, 'forts': [fort('c', -0.02)], 'deleted_objects': ['d']}])
+        self.assertEqual(sorted(f['id'] for f, _ in self.index.within(ORIGIN)), ['a', 'c'])
+        self.assertNotIn('b', self.index)
@@ -0,0 +1,51 @@
+import unittest
+import warnings
+
+from geopy.distance import great_circle, vincenty
+
+from poketrainer import geo
+
+# times square - statue of liberty, london - paris, sydney - tokyo, and the same point twice
+PAIRS = [
+    ((40.7589, -73.9851), (40.6892, -74.0445)),
+    ((51.5074, -0.1278), (48.8566, 2.3522)),
+    ((-33.8688, 151.2093), (35.6762, 139.6503)),
+    ((40.7589, -73.9851), (40.7589, -73.9851)),
+]
+# nearly antipodal, vincenty's formula does not converge
+ANTIPODAL = ((0.0, 0.0), (0.5, 179.7))
+
+
+class TestGeo(unittest.TestCase):
+
+    def setUp(self):
+        warnings.simplefilter('ignore', DeprecationWarning)
+
+    def test_haversine(self):
+        for p1, p2 in PAIRS:
+            expected = great_circle(p1, p2).meters
+            self.assertAlmostEqual(geo.distance(p1, p2), expected, delta=1e-6 * expected + 1e-6)
+            self.assertAlmostEqual(geo.distances_from(p1, [p2])[0], expected, delta=1e-6 * expected + 1e-6)
+
+    def test_vincenty(self):
+        for p1, p2 in PAIRS:
+            expected = vincenty(p1, p2).meters
+            self.assertAlmostEqual(geo.distance(p1, p2, geo.VINCENTY), expected, delta=1e-3)
+            self.assertAlmostEqual(geo.distances_from(p1, [p2], geo.VINCENTY)[0], expected, delta=1e-3)
+
+    def test_vincenty_antipodal(self):
+        self.assertRaises(ValueError, vincenty, *ANTIPODAL)
+        # falls back to haversine instead of failing
+        self.assertAlmostEqual(geo.distances_from(ANTIPODAL[0], [ANTIPODAL[1]], geo.VINCENTY)[0],
+                               geo.distance(*ANTIPODAL), delta=1e-3)
+
+    def test_distance_matrix(self):
+        points = [p1 for p1, _ in PAIRS] + [p2 for _, p2 in PAIRS]
+        for mode in geo.DISTANCE_MODES:
+            matrix = geo.distance_matrix(points, mode, chunk_size=3)
+            for i, row in enumerate(matrix):
+                self.assertTrue((abs(row - geo.distances_from(points[i], points, mode)) < 1e-6).all())
+
+    def test_check_distance_mode(self):
+        self.assertEqual(geo.check_distance_mode(geo.VINCENTY), geo.VINCENTY)
+        self.assertRaises(ValueError, geo.check_distance_mode, 'manhattan')
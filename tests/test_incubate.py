@@ -0,0 +1,45 @@
+import unittest
+
+from poketrainer.incubate import Incubate
+
+from .test_batch import FakeInventory, FakeParent
+
+
+class FakeConfig(object):
+    egg_incubation_enabled = True
+    use_disposable_incubators = True
+    incubate_big_eggs_first = False
+    max_batch_size = 2
+
+
+class FakePlayerStats(object):
+    km_walked = 10.0
+
+
+class EggInventory(FakeInventory):
+
+    def __init__(self):
+        super(EggInventory, self).__init__()
+        self.incubators_busy = [{'id': 'EggIncubatorProto-1', 'item_id': 901, 'start_km_walked': 2.0, 'target_km_walked': 4.0}]
+        self.incubators_available = [{'id': 'EggIncubatorProto-%s' % i, 'item_id': 902} for i in range(2, 6)]
+        self.eggs_available = [{'id': i, 'creation_time_ms': i, 'egg_km_walked_target': 5.0} for i in range(4)]
+        self.started = []
+
+    def start_incubation(self, egg, incubator):
+        self.started.append(egg['id'])
+
+
+class TestIncubate(unittest.TestCase):
+
+    def test_hatched_eggs_with_inventory_refresh(self):
+        parent = FakeParent()
+        parent.config = FakeConfig()
+        parent.player_stats = FakePlayerStats()
+        parent.inventory = EggInventory()
+        Incubate(parent).incubate_eggs()
+
+        self.assertEqual(parent.inventory.started, [0, 1, 2, 3])
+        self.assertEqual(len(parent.api.envelopes), 3)
+        # the hatched pokemon are looked up in the inventory which comes with the same response
+        self.assertEqual([method for method, _ in parent.api.envelopes[-1]], ['get_hatched_eggs', 'get_inventory'])
+        self.assertEqual(len(parent.inventory.updates), 1)
@@ -0,0 +1,186 @@
+import unittest
+
+from library.api.pgoapi.protobuf_to_dict import protobuf_to_dict
+from library.api.pgoapi.protos.POGOProtos.Inventory import Item_pb2 as Item_Enums
+from library.api.pgoapi.protos.POGOProtos.Networking.Responses_pb2 import GetInventoryResponse
+from poketrainer.inventory import Inventory
+from poketrainer.poke_utils import get_item_name
+
+from .test_api import mock_caught_eevee
+
+
+class FakeConfig(object):
+    inventory_resync_seconds = 300
+    max_batch_size = 10
+    min_items = {}
+    score_method = 'CP'
+    score_settings = {}
+    log_colors = {'INVENTORY': 'white'}
+    ball_priorities = [50, 50, 50, False]
+
+
+class FakeApi(object):
+
+    def __init__(self, inventory_items):
+        self.inventory_items = inventory_items
+        self.calls = []
+
+    def get_inventory(self, last_timestamp_ms=0):
+        self.calls.append(last_timestamp_ms)
+        # everything at first, nothing changed afterwards
+        inventory_items = [] if last_timestamp_ms else self.inventory_items
+        return delta_response(inventory_items, 1000 + len(self.calls))
+
+
+def delta_response(inventory_items, new_timestamp_ms):
+    delta = {'inventory_items': inventory_items, 'new_timestamp_ms': new_timestamp_ms}
+    return {'responses': {'GET_INVENTORY': {'inventory_delta': delta}}}
+
+
+class FakePlayerStats(object):
+    level = 20
+    km_walked = 0
+
+
+class FakeParent(object):
+
+    def __init__(self, inventory_items):
+        self.api = FakeApi(inventory_items)
+        self.config = FakeConfig()
+        self.player_stats = FakePlayerStats()
+
+
+class TestInventorySync(unittest.TestCase):
+
+    def setUp(self):
+        self.parent = FakeParent([
+            {'inventory_item_data': {'item': {'item_id': Item_Enums.ITEM_POKE_BALL, 'count': 5}}},
+            {'inventory_item_data': {'pokemon_data': mock_caught_eevee}},
+        ])
+        self.inventory = Inventory(self.parent, [])
+        self.inventory.update_player_inventory()
+        self.parent.api.calls = []
+
+    def test_local_deltas(self):
+        self.inventory.take_pokeball()
+        self.inventory.add_items(Item_Enums.ITEM_RAZZ_BERRY, 2)
+        self.assertEqual(self.inventory.poke_balls, 4)
+        self.assertTrue(self.inventory.has_berry())
+        self.assertEqual(self.inventory.item_counts[Item_Enums.ITEM_RAZZ_BERRY], 2)
+
+        self.assertEqual(len(list(self.inventory.get_caught_pokemon())), 1)
+        self.inventory.remove_pokemon(mock_caught_eevee['id'])
+        self.assertEqual(list(self.inventory.get_caught_pokemon()), [])
+
+    def test_sync_only_when_needed(self):
+        self.assertFalse(self.inventory.sync())
+        # a catch: the items are still right, the pokemon list is not
+        self.inventory.mark_changed(items=False)
+        self.assertFalse(self.inventory.sync())
+        self.assertTrue(self.inventory.sync(pokemon=True))
+        self.assertFalse(self.inventory.sync(pokemon=True))
+        # only the changes since the first inventory
+        self.assertEqual(self.parent.api.calls, [1001])
+        self.assertEqual(self.inventory.get_sync_stats(),
+                         {'full': 1, 'delta': 0, 'unchanged': 1, 'skipped': 3, 'items_received': 2})
+
+        self.parent.config.inventory_resync_seconds = -1
+        self.assertTrue(self.inventory.sync())
+
+    def test_sync_diverged(self):
+        # a ball the server did not take and a pokemon it did not release: the full inventory replaces the store
+        self.inventory.take_pokeball()
+        self.inventory.remove_pokemon(mock_caught_eevee['id'])
+        self.inventory.mark_diverged(pokemon=False)
+        self.assertTrue(self.inventory.sync())
+        self.assertEqual(self.parent.api.calls, [0])
+        self.assertEqual(self.inventory.poke_balls, 5)
+        self.assertEqual([pokemon.id for pokemon in self.inventory.get_caught_pokemon()], [mock_caught_eevee['id']])
+        self.assertEqual(self.inventory.get_sync_stats()['full'], 2)
+
+        # without diverging, the local changes are kept
+        self.inventory.take_pokeball()
+        self.parent.config.inventory_resync_seconds = -1
+        self.assertTrue(self.inventory.sync())
+        self.assertEqual(self.inventory.poke_balls, 4)
+
+    def test_merge_delta(self):
+        evolved = dict(mock_caught_eevee, id=2, pokemon_id=134)
+        self.inventory.update_player_inventory(delta_response([
+            {'inventory_item_data': {'item': {'item_id': Item_Enums.ITEM_POKE_BALL, 'count': 3}}},
+            {'inventory_item_data': {'pokemon_data': evolved}},
+            {'deleted_item_key': mock_caught_eevee['id']},
+        ], 2000))
+        self.assertEqual(self.inventory.last_timestamp_ms, 2000)
+        self.assertEqual(self.inventory.poke_balls, 3)
+        self.assertEqual([pokemon.id for pokemon in self.inventory.get_caught_pokemon()], [2])
+        self.assertEqual(len(self.inventory.inventory_items), 2)
+
+        # a full inventory replaces the store
+        self.inventory.reset()
+        self.inventory.update_player_inventory()
+        self.assertEqual(self.inventory.poke_balls, 5)
+        self.assertEqual([pokemon.id for pokemon in self.inventory.get_caught_pokemon()], [mock_caught_eevee['id']])
+
+    def test_delete_large_pokemon_id(self):
+        # ids are unsigned, deleted_item_key is signed: both parsed from the wire
+        pokemon_id = 2 ** 63 + 12345
+        caught = GetInventoryResponse(success=True)
+        caught.inventory_delta.new_timestamp_ms = 2000
+        caught.inventory_delta.inventory_items.add().inventory_item_data.pokemon_data.id = pokemon_id
+        released = GetInventoryResponse(success=True)
+        released.inventory_delta.new_timestamp_ms = 3000
+        released.inventory_delta.inventory_items.add(deleted_item_key=pokemon_id - 2 ** 64)
+
+        caught, released = [protobuf_to_dict(GetInventoryResponse.FromString(response.SerializeToString()))
+                            for response in (caught, released)]
+        self.assertLess(released['inventory_delta']['inventory_items'][0]['deleted_item_key'], 0)
+
+        self.inventory.update_player_inventory({'responses': {'GET_INVENTORY': caught}})
+        self.assertIn(pokemon_id, [pokemon.id for pokemon in self.inventory.get_caught_pokemon()])
+        self.inventory.update_player_inventory({'responses': {'GET_INVENTORY': released}})
+        self.assertNotIn(pokemon_id, [pokemon.id for pokemon in self.inventory.get_caught_pokemon()])
+
+    def test_pokemon_cache(self):
+        first = self.inventory.get_caught_pokemon()
+        self.assertIs(self.inventory.get_caught_pokemon()[0], first[0])
+        self.assertIs(self.inventory.get_caught_pokemon_by_family()[133][0], first[0])
+
+        # a new item only bumps the version, the pokemon are kept
+        self.inventory.update_player_inventory(delta_response([
+            {'inventory_item_data': {'item': {'item_id': Item_Enums.ITEM_POKE_BALL, 'count': 3}}},
+        ], 2000))
+        self.assertIs(self.inventory.get_caught_pokemon()[0], first[0])
+
+        # a powered up pokemon is built again
+        self.inventory.update_player_inventory(delta_response([
+            {'inventory_item_data': {'pokemon_data': dict(mock_caught_eevee, cp=600)}},
+        ], 3000))
+        powered_up = self.inventory.get_caught_pokemon()[0]
+        self.assertIsNot(powered_up, first[0])
+        self.assertEqual(powered_up.cp, 600)
+
+        self.inventory.remove_pokemon(mock_caught_eevee['id'])
+        self.assertEqual(self.inventory.get_caught_pokemon(), [])
+        self.assertEqual(self.inventory.get_caught_pokemon_by_family(), {})
+
+    def test_indexes(self):
+        egg = {'id': 7, 'is_egg': True, 'egg_km_walked_target': 5.0}
+        incubator = {'id': 'EggIncubatorProto-1', 'item_id': 901}
+        self.inventory.update_player_inventory(delta_response([
+            {'inventory_item_data': {'pokemon_data': egg}},
+            {'inventory_item_data': {'candy': {'family_id': 133, 'candy': 25}}},
+            {'inventory_item_data': {'egg_incubators': {'egg_incubator': [incubator]}}},
+        ], 2000))
+        self.assertEqual(self.inventory.pokemon_candy[133], 25)
+        self.assertEqual(self.inventory.get_pokemon(mock_caught_eevee['id']).cp, mock_caught_eevee['cp'])
+        self.assertIsNone(self.inventory.get_pokemon(egg['id']))
+        self.assertEqual(self.inventory.eggs_available, [egg])
+
+        self.inventory.start_incubation(egg, incubator)
+        self.assertEqual(self.inventory.eggs_available, [])
+        self.assertEqual(self.inventory.incubators_available, [])
+        self.assertEqual(self.inventory.incubators_busy[0]['pokemon_id'], egg['id'])
+
+        self.assertEqual(get_item_name(Item_Enums.ITEM_RAZZ_BERRY), 'RAZZ_BERRY')
+        self.assertEqual(get_item_name(-1), 'Unknown')
@@ -0,0 +1,80 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from poketrainer.knowledge import KnowledgeStore
+
+CELL_A = 9926595690777296896
+CELL_B = 9926595695072264192
+NOW = 1470000000.0
+NOW_MS = int(NOW * 1000)
+
+
+class TestKnowledgeStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'knowledge.sqlite')
+        self.store = KnowledgeStore(self.filename)
+        self.store.record_map_cells([
+            {'s2_cell_id': CELL_A,
+             'forts': [{'id': 'a', 'latitude': 40.001, 'longitude': -73.0, 'type': 1, 'enabled': True,
+                        'cooldown_complete_timestamp_ms': NOW_MS + 1}],
+             'spawn_points': [{'latitude': 40.002, 'longitude': -73.0}],
+             'catchable_pokemons': [{'encounter_id': 18446744073709551615, 'spawn_point_id': '89c25b', 'pokemon_id': 16,
+                                     'latitude': 40.002, 'longitude': -73.0,
+                                     'expiration_timestamp_ms': NOW_MS + 125 * 1000}]},
+            {'s2_cell_id': CELL_B,
+             'forts': [{'id': 'b', 'latitude': 40.05, 'longitude': -73.0}]},
+        ], now=NOW)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.directory)
+
+    def test_shared_between_connections(self):
+        other = KnowledgeStore(self.filename)
+        try:
+            self.assertEqual(other.forts_in_cells([CELL_A]),
+                             [{'id': 'a', 'latitude': 40.001, 'longitude': -73.0, 'type': 1, 'enabled': True}])
+            self.assertEqual(other.spawn_points_in_cells([CELL_A, CELL_B]), [{'latitude': 40.002, 'longitude': -73.0}])
+        finally:
+            other.close()
+
+    def test_skips_writes_while_locked(self):
+        other = sqlite3.connect(self.filename)
+        try:
+            other.execute('BEGIN IMMEDIATE')
+            started = time.time()
+            self.assertFalse(self.store.record_map_cells([{'s2_cell_id': CELL_B, 'forts': [
+                {'id': 'c', 'latitude': 40.06, 'longitude': -73.0}]}], now=NOW))
+            self.assertLess(time.time() - started, 1.0)
+            other.rollback()
+        finally:
+            other.close()
+        self.assertEqual([fort['id'] for fort in self.store.forts_in_cells([CELL_B])], ['b'])
+
+    def test_deletes_old_sightings(self):
+        later = NOW + self.store.sightings_retention + 1
+        self.assertTrue(self.store.record_map_cells([{'s2_cell_id': CELL_A, 'wild_pokemons': [
+            {'encounter_id': 7, 'spawn_point_id': '89c25b', 'latitude': 40.002, 'longitude': -73.0,
+             'last_modified_timestamp_ms': int(later * 1000), 'time_till_hidden_ms': 125 * 1000,
+             'pokemon_data': {'pokemon_id': 19}}]}], now=later))
+        self.assertEqual([s['encounter_id'] for s in self.store.sightings_in_cells([CELL_A])], ['7'])
+
+    def test_forts_near(self):
+        self.assertEqual([fort['id'] for fort in self.store.forts_near((40.0, -73.0), 1000)], ['a'])
+        self.assertEqual(sorted(fort['id'] for fort in self.store.forts_near((40.0, -73.0), 10000)), ['a', 'b'])
+
+    def test_spawn_times(self):
+        self.store.record_map_cells([{'s2_cell_id': CELL_A, 'wild_pokemons': [
+            {'encounter_id': 7, 'spawn_point_id': '89c25b', 'latitude': 40.002, 'longitude': -73.0,
+             'last_modified_timestamp_ms': NOW_MS + 3600 * 1000, 'time_till_hidden_ms': 125 * 1000,
+             'pokemon_data': {'pokemon_id': 19}}]}], now=NOW + 3600)
+        self.assertEqual(self.store.spawn_times('89c25b'), [(NOW_MS // 1000 + 125) % 3600])
+        sightings = self.store.sightings_in_cells([CELL_A])
+        self.assertEqual([(s['encounter_id'], s['pokemon_id']) for s in sightings],
+                         [('18446744073709551615', 16), ('7', 19)])
@@ -0,0 +1,94 @@
+import unittest
+
+from poketrainer.map_cells import MapCellCache
+
+CELL_A = 9970561120513919632
+CELL_B = 9970561120513919633
+NOW = 1470000000.0
+
+
+def fort(fort_id, cooldown=0):
+    return {'id': fort_id, 'latitude': 40.0, 'longitude': -73.0, 'cooldown_complete_timestamp_ms': cooldown}
+
+
+def catchable(encounter_id, expires_ms):
+    return {'encounter_id': encounter_id, 'pokemon_id': 16, 'expiration_timestamp_ms': expires_ms,
+            'latitude': 40.0, 'longitude': -73.0}
+
+
+class TestMapCellCache(unittest.TestCase):
+
+    def test_since_timestamps(self):
+        cache = MapCellCache()
+        cells = [CELL_A, CELL_B]
+        self.assertEqual(cache.since_timestamps(cells), [0, 0])
+        cache.merge(cells, [0, 0], [{'s2_cell_id': CELL_A, 'current_timestamp_ms': 1000}], now=NOW)
+        self.assertEqual(cache.since_timestamps(cells), [1000, 0])
+        self.assertEqual(MapCellCache(incremental=False).since_timestamps(cells), [0, 0])
+
+    def test_delta_merge(self):
+        cache = MapCellCache()
+        cells = [CELL_A]
+        cache.merge(cells, [0], [{'s2_cell_id': CELL_A, 'current_timestamp_ms': 1000,
+                                  'forts': [fort('a'), fort('b')]}], now=NOW)
+        cache.merge(cells, [1000], [{'s2_cell_id': CELL_A, 'current_timestamp_ms': 2000,
+                                     'forts': [fort('b', cooldown=5)], 'deleted_objects': ['a']}], now=NOW)
+        map_cells = cache.map_cells(cells, now=NOW)
+        self.assertEqual(len(map_cells), 1)
+        self.assertEqual(map_cells[0]['current_timestamp_ms'], 2000)
+        self.assertEqual(map_cells[0]['forts'], [fort('b', cooldown=5)])
+
+    def test_full_poll_replaces_cell(self):
+        cache = MapCellCache()
+        cache.merge([CELL_A], [0], [{'s2_cell_id': CELL_A, 'forts': [fort('a')]}], now=NOW)
+        cache.merge([CELL_A], [0], [{'s2_cell_id': CELL_A, 'forts': [fort('b')]}], now=NOW)
+        self.assertEqual(cache.map_cells([CELL_A], now=NOW)[0]['forts'], [fort('b')])
+
+    def test_pokemon_expire(self):
+        cache = MapCellCache()
+        now_ms = int(NOW * 1000)
+        cache.merge([CELL_A], [0], [{'s2_cell_id': CELL_A, 'current_timestamp_ms': now_ms,
+                                     'catchable_pokemons': [catchable(1, now_ms + 1000), catchable(2, now_ms + 60000)]}],
+                    now=NOW)
+        pokemons = cache.map_cells([CELL_A], now=NOW + 10)[0]['catchable_pokemons']
+        self.assertEqual([pokemon['encounter_id'] for pokemon in pokemons], [2])
+        self.assertNotIn('catchable_pokemons', cache.map_cells([CELL_A], now=NOW + 120)[0])
+
+    def test_expiry_per_kind(self):
+        cache = MapCellCache()
+        now_ms = int(NOW * 1000)
+        wild = {'encounter_id': 1, 'time_till_hidden_ms': 60000, 'latitude': 40.0, 'longitude': -73.0}
+        cache.merge([CELL_A], [0], [{'s2_cell_id': CELL_A, 'current_timestamp_ms': now_ms,
+                                     'catchable_pokemons': [catchable(1, now_ms + 1000)], 'wild_pokemons': [wild]}],
+                    now=NOW)
+        # the same encounter as a wild pokemon outlives the catchable one
+        cell = cache.map_cells([CELL_A], now=NOW + 10)[0]
+        self.assertNotIn('catchable_pokemons', cell)
+        self.assertEqual(cell['wild_pokemons'], [wild])
+
+        cache.merge([CELL_A], [now_ms], [{'s2_cell_id': CELL_A, 'current_timestamp_ms': now_ms + 1,
+                                          'deleted_objects': ['1']}], now=NOW + 10)
+        self.assertEqual(cache._cells[CELL_A].expires_ms, {})
+
+    def test_deleted_pokemon(self):
+        cache = MapCellCache()
+        now_ms = int(NOW * 1000)
+        encounter_id = 2 ** 63 + 12345
+        wild = {'encounter_id': encounter_id, 'time_till_hidden_ms': 600000, 'latitude': 40.0, 'longitude': -73.0}
+        cache.merge([CELL_A], [0], [{'s2_cell_id': CELL_A, 'current_timestamp_ms': now_ms, 'wild_pokemons': [wild],
+                                     'catchable_pokemons': [catchable(encounter_id, now_ms + 600000)]}], now=NOW)
+        self.assertEqual(cache.map_cells([CELL_A], now=NOW + 10)[0]['wild_pokemons'], [wild])
+
+        # despawned before its time
+        cache.merge([CELL_A], [now_ms], [{'s2_cell_id': CELL_A, 'current_timestamp_ms': now_ms + 1,
+                                          'deleted_objects': [str(encounter_id)]}], now=NOW + 10)
+        cell = cache.map_cells([CELL_A], now=NOW + 10)[0]
+        self.assertNotIn('wild_pokemons', cell)
+        self.assertNotIn('catchable_pokemons', cell)
+        self.assertEqual(cache._cells[CELL_A].expires_ms, {})
+
+    def test_unrequested_cells_are_dropped(self):
+        cache = MapCellCache(cell_ttl=60)
+        cache.merge([CELL_A], [0], [{'s2_cell_id': CELL_A, 'current_timestamp_ms': 1000}], now=NOW)
+        cache.merge([CELL_B], [0], [{'s2_cell_id': CELL_B, 'current_timestamp_ms': 1000}], now=NOW + 120)
+        self.assertEqual(cache.since_timestamps([CELL_A, CELL_B]), [0, 1000])
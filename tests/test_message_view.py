@@ -0,0 +1,128 @@
+import copy
+import operator
+import unittest
+
+from library import api  # noqa: F401, puts pgoapi on the path
+from pgoapi.message_view import MessageView
+from pgoapi.protobuf_to_dict import protobuf_to_dict
+from pgoapi.rpc_api import RpcApi
+from POGOProtos.Networking.Envelopes_pb2 import ResponseEnvelope
+from POGOProtos.Networking.Requests_pb2 import RequestType
+from POGOProtos.Networking.Responses_pb2 import GetInventoryResponse, GetMapObjectsResponse, GetPlayerResponse
+
+REQUESTS = [
+    RequestType.Value('GET_PLAYER'),
+    {RequestType.Value('GET_INVENTORY'): {'last_timestamp_ms': 0}},
+    RequestType.Value('GET_MAP_OBJECTS'),
+]
+
+
+class FakeHttpResponse(object):
+    status_code = 200
+
+    def __init__(self, content):
+        self.content = content
+
+
+def player_response():
+    player = GetPlayerResponse(success=True)
+    player.player_data.username = 'ash'
+    player.player_data.team = 2
+    # repeated enum and repeated message
+    player.player_data.tutorial_state.extend([0, 1, 3])
+    player.player_data.currencies.add(name='STARDUST', amount=1000)
+    player.player_data.currencies.add(name='POKECOIN')
+    return player
+
+
+def inventory_response():
+    inventory = GetInventoryResponse(success=True)
+    inventory.inventory_delta.new_timestamp_ms = 1470000000000
+    pokemon = inventory.inventory_delta.inventory_items.add().inventory_item_data.pokemon_data
+    pokemon.id = 10000000000000000001
+    pokemon.pokemon_id = 133
+    pokemon.cp = 546
+    pokemon.height_m = 0.25
+    egg = inventory.inventory_delta.inventory_items.add().inventory_item_data.pokemon_data
+    egg.id = 10000000000000000002
+    egg.is_egg = True
+    egg.egg_km_walked_target = 5.0
+    incubators = inventory.inventory_delta.inventory_items.add().inventory_item_data.egg_incubators
+    incubators.egg_incubator.add(id='EggIncubatorProto-1', item_id=901)
+    incubators.egg_incubator.add(id='EggIncubatorProto-2', item_id=902, pokemon_id=10000000000000000002)
+    return inventory
+
+
+def map_objects_response():
+    map_objects = GetMapObjectsResponse(status=1)
+    for c in range(2):
+        cell = map_objects.map_cells.add(s2_cell_id=9970561120513919632 + c, current_timestamp_ms=1470000000000)
+        cell.forts.add(id='fort%s' % c, latitude=40.0, longitude=-73.0, type=1, enabled=True)
+        wild = cell.wild_pokemons.add(encounter_id=c + 1, spawn_point_id='abc', latitude=40.0, longitude=-73.0)
+        wild.pokemon_data.pokemon_id = 16
+    return map_objects
+
+
+class TestMessageView(unittest.TestCase):
+
+    def setUp(self):
+        self.player = player_response()
+        self.inventory = inventory_response()
+        self.map_objects = map_objects_response()
+
+    def test_equals_protobuf_to_dict(self):
+        for message in (self.player, self.inventory, self.map_objects):
+            view = MessageView(message)
+            expected = protobuf_to_dict(message)
+            self.assertEqual(view, expected)
+            self.assertEqual(view.to_dict(), expected)
+            self.assertEqual(sorted(view), sorted(expected))
+            self.assertEqual(len(view), len(expected))
+
+    def test_equals_parsed_response(self):
+        envelope = ResponseEnvelope(status_code=1, request_id=1)
+        envelope.returns.extend([self.player.SerializeToString(), self.inventory.SerializeToString(),
+                                 self.map_objects.SerializeToString()])
+        http_response = FakeHttpResponse(envelope.SerializeToString())
+
+        dicts = RpcApi(None)._parse_main_response(http_response, REQUESTS)
+        views = RpcApi(None, response_views=True)._parse_main_response(http_response, REQUESTS)
+        self.assertEqual(sorted(views['responses']), ['GET_INVENTORY', 'GET_MAP_OBJECTS', 'GET_PLAYER'])
+        for name, response in dicts['responses'].items():
+            self.assertIsInstance(views['responses'][name], MessageView)
+            self.assertEqual(views['responses'][name], response)
+            self.assertEqual(views['responses'][name].to_dict(), response)
+
+    def test_nested_repeated_fields_and_enums(self):
+        player_data = MessageView(self.player)['player_data']
+        self.assertEqual(player_data['team'], 2)
+        self.assertEqual(player_data['tutorial_state'], [0, 1, 3])
+        self.assertEqual([currency.get('amount', 0) for currency in player_data['currencies']], [1000, 0])
+
+        items = MessageView(self.inventory)['inventory_delta']['inventory_items']
+        self.assertEqual(items[0]['inventory_item_data']['pokemon_data']['pokemon_id'], 133)
+        self.assertNotIn('is_egg', items[0]['inventory_item_data']['pokemon_data'])
+        incubators = items[2]['inventory_item_data']['egg_incubators']['egg_incubator']
+        self.assertEqual([incubator.get('pokemon_id') for incubator in incubators], [None, 10000000000000000002])
+
+        cells = MessageView(self.map_objects)['map_cells']
+        self.assertEqual([cell['wild_pokemons'][0]['pokemon_data']['pokemon_id'] for cell in cells], [16, 16])
+        self.assertEqual([cell['forts'][0]['id'] for cell in cells], ['fort0', 'fort1'])
+
+    def test_missing_fields(self):
+        view = MessageView(self.player)
+        self.assertRaises(KeyError, operator.getitem, view, 'player_data_missing')
+        self.assertRaises(KeyError, operator.getitem, view['player_data'], 'avatar')
+        self.assertEqual(view['player_data'].get('max_pokemon_storage', 250), 250)
+
+    def test_writes_raise(self):
+        view = MessageView(self.inventory)
+        self.assertRaises(TypeError, operator.setitem, view, 'success', False)
+        self.assertRaises(TypeError, operator.delitem, view, 'success')
+        self.assertRaises(AttributeError, setattr, view, 'success', False)
+        self.assertFalse(hasattr(view, 'update'))
+        self.assertFalse(hasattr(view, 'pop'))
+        # copies are plain dicts which can be changed
+        plain = copy.deepcopy(view)
+        plain['success'] = False
+        self.assertTrue(view['success'])
@@ -0,0 +1,37 @@
+import unittest
+
+from poketrainer.pokemon import Pokemon
+from poketrainer.pokemon_table import PokemonTable
+
+from .test_api import mock_caught_eevee, mock_wild_spearow
+
+
+class TestPokemonTable(unittest.TestCase):
+
+    def setUp(self):
+        self.pokemon_data = [mock_wild_spearow, mock_caught_eevee, dict(mock_caught_eevee, id=2, cp=700),
+                             dict(mock_caught_eevee, id=3, cp=100, favorite=1), {'id': 4, 'pokemon_id': 0}]
+
+    def test_columns_match_pokemon(self):
+        for score_method in ("CP", "IV", "CP*IV", "CP+IV", "FANCY"):
+            table = PokemonTable(self.pokemon_data, 22, score_method, {})
+            for row, pokemon_data in zip(table.rows, self.pokemon_data):
+                pokemon = Pokemon(pokemon_data, 22, score_method, {})
+                self.assertEqual(row['level'], pokemon.level)
+                self.assertEqual(row['level_wild'], pokemon.level_wild)
+                self.assertEqual(row['max_cp'], pokemon.max_cp)
+                self.assertEqual(row['iv_normalized'], pokemon.iv_normalized)
+                self.assertEqual(row['is_favorite'], pokemon.is_favorite)
+                self.assertEqual(row['score'], pokemon.score)
+
+    def test_by_species(self):
+        table = PokemonTable(self.pokemon_data, 22, pokemon_factory=lambda pokemon_data: pokemon_data['id'])
+        by_species = table.by_species(('cp', 'iv'))
+        self.assertEqual(list(by_species), [0, 21, 133])
+        self.assertEqual(table.pokemon(by_species[133]), [2, mock_caught_eevee['id'], 3])
+        self.assertEqual(table.order(('cp',)).tolist(), [2, 1, 3, 0, 4])
+
+    def test_empty(self):
+        table = PokemonTable([])
+        self.assertEqual(len(table), 0)
+        self.assertEqual(table.by_species(), {})
@@ -0,0 +1,84 @@
+import unittest
+
+from google.protobuf.descriptor import FieldDescriptor
+
+from library import api  # noqa: F401, puts pgoapi on the path
+from pgoapi import protobuf_to_dict as module
+from pgoapi.protobuf_to_dict import EXTENSION_CONTAINER, TYPE_CALLABLE_MAP, enum_label_name, protobuf_to_dict, repeated
+from POGOProtos.Networking.Envelopes_pb2 import ResponseEnvelope
+
+from .test_message_view import inventory_response, map_objects_response, player_response
+
+
+def legacy_field_value_adaptor(field, type_callable_map, use_enum_labels):
+    if field.type == FieldDescriptor.TYPE_MESSAGE:
+        return lambda pb: legacy_protobuf_to_dict(pb, type_callable_map, use_enum_labels)
+    if use_enum_labels and field.type == FieldDescriptor.TYPE_ENUM:
+        return lambda value: enum_label_name(field, value)
+    return type_callable_map[field.type]
+
+
+def legacy_protobuf_to_dict(pb, type_callable_map=TYPE_CALLABLE_MAP, use_enum_labels=False):
+    """ the converter as it was before the compiled plans, builds an adaptor per field per message """
+    result_dict = {}
+    extensions = {}
+    for field, value in pb.ListFields():
+        if field.message_type and field.message_type.has_options and field.message_type.GetOptions().map_entry:
+            result_dict[field.name] = dict(value)
+            continue
+        type_callable = legacy_field_value_adaptor(field, type_callable_map, use_enum_labels)
+        if field.label == field.LABEL_REPEATED:
+            type_callable = repeated(type_callable)
+
+        if field.is_extension:
+            extensions[str(field.number)] = type_callable(value)
+            continue
+
+        result_dict[field.name] = type_callable(value)
+
+    if extensions:
+        result_dict[EXTENSION_CONTAINER] = extensions
+    return result_dict
+
+
+class TestProtobufToDict(unittest.TestCase):
+
+    def setUp(self):
+        self.envelope = ResponseEnvelope(status_code=1, request_id=1, api_url='pgorelease.nianticlabs.com/plfe/1')
+        self.envelope.returns.extend([player_response().SerializeToString()])
+        self.messages = [player_response(), inventory_response(), map_objects_response(), self.envelope]
+
+    def test_same_as_legacy(self):
+        for message in self.messages:
+            self.assertEqual(protobuf_to_dict(message), legacy_protobuf_to_dict(message))
+            self.assertEqual(protobuf_to_dict(message, use_enum_labels=True), legacy_protobuf_to_dict(message, use_enum_labels=True))
+
+    def test_skip_fields(self):
+        expected = legacy_protobuf_to_dict(self.envelope)
+        del expected['returns']
+        skip_fields = {ResponseEnvelope.DESCRIPTOR.full_name: ['returns']}
+        self.assertEqual(protobuf_to_dict(self.envelope, skip_fields=skip_fields), expected)
+
+    def test_plans_keyed_by_contents(self):
+        descriptor = ResponseEnvelope.DESCRIPTOR
+        plan = module._get_plan(descriptor, dict(TYPE_CALLABLE_MAP), False, {descriptor.full_name: ['returns']})
+        # maps built per call share the plan
+        self.assertIs(module._get_plan(descriptor, dict(TYPE_CALLABLE_MAP), False, {descriptor.full_name: {'returns'}}), plan)
+
+        type_callable_map = dict(TYPE_CALLABLE_MAP)
+        type_callable_map[FieldDescriptor.TYPE_STRING] = lambda value: value.upper()
+        changed = module._get_plan(descriptor, type_callable_map, False, {descriptor.full_name: ['returns']})
+        self.assertIsNot(changed, plan)
+        self.assertEqual(protobuf_to_dict(self.envelope, type_callable_map)['api_url'], 'PGORELEASE.NIANTICLABS.COM/PLFE/1')
+        self.assertIsNot(module._get_plan(descriptor, dict(TYPE_CALLABLE_MAP), False, None), plan)
+
+    def test_custom_type_callable_map(self):
+        type_callable_map = dict(TYPE_CALLABLE_MAP)
+        type_callable_map[FieldDescriptor.TYPE_UINT64] = str
+        type_callable_map[FieldDescriptor.TYPE_INT32] = float
+        type_callable_map[FieldDescriptor.TYPE_ENUM] = str
+        for message in self.messages:
+            self.assertEqual(protobuf_to_dict(message, type_callable_map), legacy_protobuf_to_dict(message, type_callable_map))
+        converted = protobuf_to_dict(self.envelope, type_callable_map)
+        self.assertEqual((converted['request_id'], converted['status_code']), ('1', 1.0))
+        self.assertEqual(protobuf_to_dict(player_response(), type_callable_map)['player_data']['team'], '2')
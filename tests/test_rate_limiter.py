@@ -0,0 +1,68 @@
+import unittest
+
+from library import api  # noqa: F401, puts pgoapi on the path
+from pgoapi.rate_limiter import RateLimiter
+from pgoapi.rpc_api import REQUEST_NAMES
+
+REQUEST_IDS = dict((name, request_id) for request_id, name in REQUEST_NAMES.items())
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 100.0
+        self.slept = []
+        self.limiter = RateLimiter(intervals={'catch': 0.5, 'fort': 0.2}, sleep=self.sleep, clock=self.clock)
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+    def wait(self, *names):
+        return self.limiter.wait([{REQUEST_IDS[name]: {}} for name in names])
+
+    def test_unlimited_requests_do_not_wait(self):
+        self.assertEqual(self.wait('GET_PLAYER'), 0.0)
+        self.assertEqual(self.wait('GET_PLAYER'), 0.0)
+        self.assertEqual(self.slept, [])
+        self.assertEqual(self.limiter.get_stats(), {})
+
+    def test_waits_only_for_the_rest_of_the_interval(self):
+        self.assertEqual(self.wait('CATCH_POKEMON'), 0.0)
+        self.assertAlmostEqual(self.wait('CATCH_POKEMON'), 0.5)
+        # time spent elsewhere counts towards the interval
+        self.now += 0.3
+        self.assertAlmostEqual(self.wait('CATCH_POKEMON'), 0.2)
+        self.now += 1.0
+        self.assertEqual(self.wait('CATCH_POKEMON'), 0.0)
+
+        stats = self.limiter.get_stats()['catch']
+        self.assertEqual(stats['calls'], 4)
+        self.assertAlmostEqual(stats['waited'], 0.7)
+        self.assertEqual(stats['histogram'], {'<=0.0': 2, '<=0.25': 1, '<=0.5': 1})
+
+    def test_classes_are_independent(self):
+        self.wait('CATCH_POKEMON')
+        self.assertEqual(self.wait('FORT_SEARCH'), 0.0)
+        # a request with several classes waits for the slowest
+        self.assertAlmostEqual(self.wait('CATCH_POKEMON', 'FORT_SEARCH'), 0.5)
+
+    def test_set_interval(self):
+        self.limiter.set_interval('map_objects', 5.0)
+        self.wait('GET_MAP_OBJECTS')
+        self.assertAlmostEqual(self.wait('GET_MAP_OBJECTS'), 5.0)
+        self.limiter.set_interval('map_objects', 0)
+        self.assertEqual(self.wait('GET_MAP_OBJECTS'), 0.0)
+
+    def test_checkpoint_before_every_request(self):
+        checkpoints = []
+        self.limiter = RateLimiter(intervals={'catch': 0.5}, sleep=self.sleep, clock=self.clock,
+                                   checkpoint=lambda: checkpoints.append(self.now))
+        self.wait('GET_PLAYER')
+        self.wait('CATCH_POKEMON')
+        # before the request and after the sleep
+        self.wait('CATCH_POKEMON')
+        self.assertEqual(checkpoints, [100.0, 100.0, 100.0, 100.5])
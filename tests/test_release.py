@@ -0,0 +1,97 @@
+import random
+import unittest
+
+from poketrainer.inventory import Inventory
+from poketrainer.pokemon import Pokemon
+from poketrainer.pokemon_table import PokemonTable
+from poketrainer.release_methods.base import ReleaseMethodFactory
+
+from .test_api import mock_caught_eevee, mock_wild_spearow
+from .test_inventory import FakeParent, delta_response
+
+
+def synthetic_pokemon(count):
+    rand = random.Random(count)
+    pokemon_data = []
+    for i in range(count):
+        base = mock_caught_eevee if i % 2 else mock_wild_spearow
+        pokemon_data.append(dict(base, id=i + 1, cp=rand.choice((10, 200, 546, 700, 2100)),
+                                 individual_attack=rand.randint(0, 15), individual_defense=rand.randint(0, 15),
+                                 individual_stamina=rand.randint(0, 15), favorite=1 if i % 7 == 0 else -1))
+    return pokemon_data
+
+
+class TestClassicRelease(unittest.TestCase):
+
+    def setUp(self):
+        self.built = []
+        self.table = PokemonTable(synthetic_pokemon(60), 22, pokemon_factory=self.build)
+
+    def build(self, pokemon_data):
+        self.built.append(pokemon_data['id'])
+        return Pokemon(pokemon_data, 22)
+
+    def release_method(self, **options):
+        config = {'POKEMON_CLEANUP': dict({'RELEASE_METHOD': 'CLASSIC', 'MIN_SIMILAR_POKEMON': 2,
+                                           'RELEASE_METHOD_CLASSIC': {'KEEP_CP_OVER': 600, 'KEEP_IV_OVER': 80}},
+                                          **options)}
+        return ReleaseMethodFactory(config).get_release_method()
+
+    def assert_same_as_pokemon(self, release_method):
+        released = 0
+        for pokemon_id, rows in self.table.by_species().items():
+            pokemons = self.table.pokemon(rows)
+            to_release, to_keep = release_method.get_pokemon_to_release(pokemon_id, pokemons)
+            rows_to_release, rows_to_keep = release_method.get_rows_to_release(pokemon_id, self.table, rows)
+            self.assertEqual([pokemon.id for pokemon in self.table.pokemon(rows_to_release)], [p.id for p in to_release])
+            self.assertEqual([pokemon.id for pokemon in self.table.pokemon(rows_to_keep)], [p.id for p in to_keep])
+            released += len(rows_to_release)
+        self.assertTrue(released)
+
+    def test_rows_match_pokemon(self):
+        self.assert_same_as_pokemon(self.release_method())
+        self.assert_same_as_pokemon(self.release_method(RELEASE_METHOD_CLASSIC={'KEEP_CP_OVER': 600, 'KEEP_IV_OVER': 80, 'PREFER': 'IV'}))
+        self.assert_same_as_pokemon(self.release_method(KEEP_POKEMON_NAMES=['EEVEE'], MAX_SIMILAR_POKEMON=5,
+                                                        THROW_POKEMON_NAMES=['SPEAROW']))
+
+    def test_only_released_pokemon_are_built(self):
+        release_method = self.release_method()
+        released = []
+        for pokemon_id, rows in self.table.by_species().items():
+            rows_to_release, _ = release_method.get_rows_to_release(pokemon_id, self.table, rows)
+            released.extend(pokemon.id for pokemon in self.table.pokemon(rows_to_release))
+        self.assertEqual(self.built, released)
+
+    def test_default_uses_pokemon(self):
+        config = {'POKEMON_CLEANUP': {'RELEASE_METHOD': 'DUPLICATES', 'MIN_SIMILAR_POKEMON': 1,
+                                      'RELEASE_METHOD_DUPLICATES': {'RELEASE_DUPLICATES_MAX_SCORE': 600}}}
+        release_method = ReleaseMethodFactory(config).get_release_method()
+        for pokemon_id, rows in self.table.by_species().items():
+            rows_to_release, rows_to_keep = release_method.get_rows_to_release(pokemon_id, self.table, rows)
+            self.assertEqual(sorted(rows_to_release + rows_to_keep), sorted(rows.tolist()))
+            self.assertTrue(all(self.table.rows['cp'][row] < 600 for row in rows_to_release))
+
+
+def eevee(pokemon_id, cp, iv):
+    return {'inventory_item_data': {'pokemon_data': dict(mock_caught_eevee, id=pokemon_id, cp=cp, favorite=-1, individual_attack=iv,
+                                                         individual_defense=iv, individual_stamina=iv)}}
+
+
+class TestAdvancedRelease(unittest.TestCase):
+
+    def test_cleanup_twice(self):
+        # the best cp and the best iv eevee are kept, until a better one is caught
+        config = {'POKEMON_CLEANUP': {'RELEASE_METHOD': 'ADVANCED', 'MIN_SIMILAR_POKEMON': 1, 'RELEASE_METHOD_ADVANCED': {
+            'KEEP_CP_OVER': 5000, 'KEEP_IV_OVER': 100, 'BEST_IV': {'MAX_AMOUNT': 1}, 'BEST_CP': {'MAX_AMOUNT': 1}}}}
+        release_method = ReleaseMethodFactory(config).get_release_method()
+        inventory = Inventory(FakeParent([eevee(1, 500, 5), eevee(2, 400, 10)]), [])
+        inventory.update_player_inventory()
+
+        def cleanup():
+            table = inventory.get_pokemon_table()
+            rows_to_release, _ = release_method.get_rows_to_release(133, table, table.by_species()[133])
+            return sorted(pokemon.id for pokemon in table.pokemon(rows_to_release))
+
+        self.assertEqual(cleanup(), [])
+        inventory.update_player_inventory(delta_response([eevee(3, 600, 15)], 2000))
+        self.assertEqual(cleanup(), [1, 2])
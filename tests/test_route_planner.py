@@ -0,0 +1,44 @@
+import unittest
+
+from poketrainer.location import get_fort_route
+from poketrainer.route_planner import plan_route
+
+# corners of a ~1km square, listed crosswise
+SQUARE = [(40.0, -73.0), (40.009, -72.988), (40.009, -73.0), (40.0, -72.988)]
+
+
+class TestRoutePlanner(unittest.TestCase):
+
+    def test_closed_loop_walks_around_the_square(self):
+        order, length = plan_route(SQUARE)
+        self.assertEqual(order[0], 0)
+        self.assertIn(order, ([0, 2, 1, 3], [0, 3, 1, 2]))
+        self.assertAlmostEqual(length, 4 * 1010, delta=40)
+
+    def test_open_route_begins_nearest_to_start(self):
+        order, length = plan_route(SQUARE, start=(40.0095, -72.9875), closed=False)
+        self.assertEqual(order[0], 1)
+        self.assertEqual(sorted(order), [0, 1, 2, 3])
+        self.assertAlmostEqual(length, 3 * 1010, delta=30)
+
+    def test_max_points_plans_the_nearest(self):
+        points = SQUARE + [(40.1, -73.0), (40.05, -73.0)]
+        order, length = plan_route(points, start=(40.0, -73.0), closed=False, max_points=4)
+        self.assertEqual(order[0], 0)
+        self.assertEqual(sorted(order[:4]), [0, 1, 2, 3])
+        self.assertEqual(order[4:], [5, 4])
+        self.assertAlmostEqual(length, 3 * 1010, delta=30)
+
+    def test_trivial_routes(self):
+        self.assertEqual(plan_route([]), ([], 0.0))
+        self.assertEqual(plan_route([(40.0, -73.0)]), ([0], 0.0))
+
+
+class TestFortRoute(unittest.TestCase):
+
+    def test_route_through_all_forts(self):
+        route = get_fort_route((40.0, -73.0, 0), SQUARE[1:], step_size=200)
+        self.assertEqual(set(route), {'steps', 'total_distance'})
+        self.assertAlmostEqual(route['total_distance'], 3 * 1010, delta=30)
+        self.assertAlmostEqual(sum(step['distance'] for step in route['steps']), route['total_distance'], delta=5)
+        self.assertTrue(all(step['distance'] <= 200 for step in route['steps']))
@@ -0,0 +1,70 @@
+import threading
+import time
+import unittest
+
+from six.moves import BaseHTTPServer, socketserver
+
+from library import api  # noqa: F401, puts pgoapi on the path
+from pgoapi.rpc_session import RpcSession
+
+
+class KeepAliveHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.server.clients.add(self.client_address)
+        time.sleep(0.01)
+        close = self.path == '/close'
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        if close:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(b'ok')
+        self.close_connection = close
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class TestRpcSession(unittest.TestCase):
+
+    def setUp(self):
+        self.server = Server(('127.0.0.1', 0), KeepAliveHandler)
+        self.server.clients = set()
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,))
+        self.thread.daemon = True
+        self.thread.start()
+        self.endpoint = 'http://127.0.0.1:%s/rpc' % self.server.server_address[1]
+        self.session = RpcSession(pool_size=2)
+
+    def tearDown(self):
+        self.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_reused_connections(self):
+        for _ in range(3):
+            self.session.post(self.endpoint, b'data')
+        self.session.post(self.endpoint.replace('/rpc', '/close'), b'data')
+        self.session.post(self.endpoint, b'data')
+        self.assertEqual(self.session.get_stats(self.endpoint), {'handshakes': 2, 'reused': 2, 'resets': 0})
+        self.assertEqual(len(self.server.clients), 2)
+
+    def test_concurrent_requests(self):
+        def post():
+            for _ in range(5):
+                self.session.post(self.endpoint, b'data')
+        threads = [threading.Thread(target=post) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = self.session.get_stats(self.endpoint)
+        self.assertEqual(stats['handshakes'] + stats['reused'], 10)
+        self.assertEqual(stats['handshakes'], len(self.server.clients))
@@ -0,0 +1,61 @@
+import unittest
+
+import gevent
+
+from helper.exceptions import ActionExpired
+from poketrainer.scheduler import PRIORITY_INTERACTIVE, PRIORITY_MAIN_LOOP, ActionScheduler
+
+
+class TestActionScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = ActionScheduler()
+        self.executed = []
+
+    def tearDown(self):
+        self.scheduler.stop()
+
+    def step(self, name, rpcs=1):
+        for _ in range(rpcs):
+            self.executed.append(name)
+            gevent.sleep(0.001)
+            self.scheduler.checkpoint()
+        return name
+
+    def test_priorities_between_steps(self):
+        first = self.scheduler.submit(self.step, 'walk')
+        gevent.sleep(0)
+        later = self.scheduler.submit(self.step, 'catch')
+        urgent = self.scheduler.submit(self.step, 'snipe', priority=PRIORITY_INTERACTIVE)
+        self.assertEqual([first.get(), later.get(), urgent.get()], ['walk', 'catch', 'snipe'])
+        self.assertEqual(self.executed, ['walk', 'snipe', 'catch'])
+
+    def test_interrupting_actions_run_at_checkpoints(self):
+        step = self.scheduler.submit(self.step, 'walk', 3, priority=PRIORITY_MAIN_LOOP)
+        gevent.sleep(0)
+        release = self.scheduler.submit(self.step, 'release', priority=PRIORITY_INTERACTIVE, interrupts=True)
+        self.assertEqual(release.get(), 'release')
+        step.get()
+        self.assertEqual(self.executed, ['walk', 'release', 'walk', 'walk'])
+
+    def test_uninterrupted_work(self):
+        def batch():
+            with self.scheduler.uninterrupted():
+                return self.step('release batch', 3)
+
+        step = self.scheduler.submit(batch)
+        gevent.sleep(0)
+        release = self.scheduler.submit(self.step, 'release', priority=PRIORITY_INTERACTIVE, interrupts=True)
+        self.assertEqual(release.get(), 'release')
+        step.get()
+        self.assertEqual(self.executed, ['release batch'] * 3 + ['release'])
+
+    def test_exceptions_and_deadlines(self):
+        def fail():
+            raise ValueError('no')
+
+        with self.assertRaises(ValueError):
+            self.scheduler.run(fail)
+        self.scheduler.submit(self.step, 'walk', 5)
+        self.assertRaises(ActionExpired, self.scheduler.run, self.step, 'late', timeout=0.001)
+        self.assertEqual(self.scheduler.get_stats()['expired'], 1)
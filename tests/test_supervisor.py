@@ -0,0 +1,118 @@
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import gevent
+
+from poketrainer import poketrainer as poketrainer_module
+from poketrainer import supervisor as supervisor_module
+from poketrainer.poketrainer import register_listeners
+from poketrainer.supervisor import Supervisor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+# two accounts whose main loops block in time.sleep, run by the supervisor after pokesupervisor.py was imported
+CONCURRENT_ACCOUNTS = """
+import time
+import gevent
+import pokesupervisor
+from poketrainer import poketrainer, supervisor
+from tests.test_supervisor import FakeBot
+
+poketrainer.LISTENERS_FILE = {listeners!r}
+FakeBot.step = staticmethod(lambda: time.sleep(0.2))
+supervisor.Poketrainer = FakeBot
+s = supervisor.Supervisor({{'debug': False}}, [0, 1])
+started = time.time()
+s.start()
+gevent.joinall(list(s._starters.values()))
+gevent.joinall([bot.thread for bot in s._bots.values()])
+print(time.time() - started)
+s.stop()
+"""
+
+
+class FakeConfig(object):
+
+    def __init__(self, username):
+        self.username = username
+
+
+class FakeBot(object):
+    steps = []
+    step = staticmethod(lambda: gevent.sleep(0.01))
+
+    def __init__(self, args, open_socket=True):
+        self.config = FakeConfig('account{0}'.format(args['config_index']))
+        self.thread = None
+        self.pokemon_caught = 0
+        self.start_time = 0
+
+    def start(self):
+        self.thread = gevent.spawn(self._main_loop)
+
+    def stop(self):
+        self.thread.kill()
+
+    def _main_loop(self):
+        for _ in range(3):
+            FakeBot.steps.append(self.config.username)
+            self.pokemon_caught += 1
+            self.step()
+
+
+def register(first):
+    register_listeners(dict(('account{0}'.format(i), i) for i in range(first, first + 20)))
+
+
+class TestSupervisor(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.listeners_file = poketrainer_module.LISTENERS_FILE
+        self.bot_class = supervisor_module.Poketrainer
+        poketrainer_module.LISTENERS_FILE = os.path.join(self.directory, '.listeners')
+        supervisor_module.Poketrainer = FakeBot
+        FakeBot.steps = []
+
+    def tearDown(self):
+        poketrainer_module.LISTENERS_FILE = self.listeners_file
+        supervisor_module.Poketrainer = self.bot_class
+        shutil.rmtree(self.directory)
+
+    def read_listeners(self):
+        with open(poketrainer_module.LISTENERS_FILE) as f:
+            return json.load(f)
+
+    def test_accounts_run_concurrently(self):
+        supervisor = Supervisor({'debug': False}, [0, 1])
+        supervisor.start()
+        gevent.joinall(list(supervisor._starters.values()))
+        gevent.joinall([bot.thread for bot in supervisor._bots.values()])
+        try:
+            # both main loops advance before either one is done
+            self.assertEqual(sorted(FakeBot.steps[:2]), ['account0', 'account1'])
+            self.assertEqual(supervisor.accounts(), ['account0', 'account1'])
+            self.assertEqual(supervisor.metrics()['totals']['pokemon_caught'], 6)
+            self.assertEqual(self.read_listeners()['account1'], {'port': supervisor.sock_port, 'supervisor': True})
+        finally:
+            supervisor.stop()
+
+    def test_blocking_calls_yield_to_other_accounts(self):
+        script = CONCURRENT_ACCOUNTS.format(listeners=poketrainer_module.LISTENERS_FILE)
+        output = subprocess.check_output([sys.executable, '-c', script], cwd=ROOT, stderr=subprocess.STDOUT)
+        # 3 sleeps of 0.2s per account, one after another would take 1.2s
+        self.assertLess(float(output.decode().strip().splitlines()[-1]), 1.0)
+
+    def test_shards_register_concurrently(self):
+        processes = [multiprocessing.Process(target=register, args=(first,)) for first in range(0, 160, 20)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        self.assertEqual(len(self.read_listeners()), 160)
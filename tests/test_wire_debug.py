@@ -0,0 +1,48 @@
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+from library import api  # noqa: F401, puts pgoapi on the path
+from pgoapi.pgoapi import PGoApi
+from pgoapi.wire_debug import WireDebugger
+from POGOProtos.Networking.Envelopes_pb2 import ResponseEnvelope
+
+
+class TestWireDebugger(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'wire.log')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_close(self):
+        debugger = WireDebugger(self.filename, use_protoc=False)
+        debugger.submit('ResponseEnvelope', ResponseEnvelope, ResponseEnvelope(status_code=1).SerializeToString())
+        debugger.close()
+        self.assertFalse(debugger._worker.is_alive())
+        self.assertEqual(debugger._dump_log.handlers, [])
+        self.assertNotIn(debugger._dump_log.name, logging.Logger.manager.loggerDict)
+        with open(self.filename) as f:
+            self.assertIn('status_code: 1', f.read())
+        # closing twice does nothing
+        debugger.close()
+
+    def test_shared_between_api_objects(self):
+        debugger = WireDebugger(self.filename, use_protoc=False)
+        try:
+            apis = [PGoApi(wire_debugger=debugger) for _ in range(3)]
+            self.assertTrue(all(api_.get_wire_debugger() is debugger for api_ in apis))
+        finally:
+            debugger.close()
+
+        # enabling it again replaces the api's own debugger
+        api_ = PGoApi()
+        api_.enable_wire_debug(self.filename, use_protoc=False)
+        first = api_.get_wire_debugger()
+        api_.enable_wire_debug(self.filename, use_protoc=False)
+        self.assertFalse(first._worker.is_alive())
+        api_.get_wire_debugger().close()
@@ -119,6 +119,17 @@ def set_columns_to_ignore(columns_to_ignore):
             options['ignore_transfer'] = 'display: none;'
 
 
+class SupervisedAccount(object):
+    """ calls the functions of one account through the socket of its supervisor """
+
+    def __init__(self, client, username):
+        self._client = client
+        self._username = username
+
+    def __getattr__(self, name):
+        return lambda *args: self._client.call(self._username, name, *args)
+
+
 def get_api_rpc(username):
     desc_file = os.path.join(os.path.dirname(os.path.realpath(__file__)), ".listeners")
     sock_port = 0
@@ -129,7 +140,13 @@ def get_api_rpc(username):
             # FIXME Use logger instead of print statements!
             print("There is no bot running with username '%s'!" % username)
             return None
-        sock_port = int(data[username])
+        listener = data[username]
+        if isinstance(listener, dict):
+            # account of a supervisor, which serves all of its accounts on one socket
+            c = zerorpc.Client()
+            c.connect("tcp://127.0.0.1:%i" % int(listener['port']))
+            return SupervisedAccount(c, username)
+        sock_port = int(listener)
 
     c = zerorpc.Client()
     c.connect("tcp://127.0.0.1:%i" % sock_port)